@@ -1,8 +1,9 @@
 from backend.dataflow.cfg import CFG
 from backend.dataflow.cfgbuilder import CFGBuilder
 from backend.dataflow.livenessanalyzer import LivenessAnalyzer
-from backend.reg.bruteregalloc import BruteRegAlloc
+from backend.reg.regalloc import RegAlloc
 from backend.riscv.riscvasmemitter import RiscvAsmEmitter
+from utils.passtimer import timer
 from utils.tac.tacprog import TACProg
 
 """
@@ -10,7 +11,7 @@ Asm: we use it to generate all the asm code for the program
 """
 
 class Asm:
-    def __init__(self, emitter: RiscvAsmEmitter, regAlloc: BruteRegAlloc) -> None:
+    def __init__(self, emitter: RiscvAsmEmitter, regAlloc: RegAlloc) -> None:
         self.emitter = emitter
         self.regAlloc = regAlloc
 
@@ -18,10 +19,16 @@ class Asm:
         analyzer = LivenessAnalyzer()
 
         for func in prog.funcs:
-            pair = self.emitter.selectInstr(func)
-            builder = CFGBuilder()
-            cfg: CFG = builder.buildFrom(pair[0])
-            analyzer.accept(cfg)
-            self.regAlloc.accept(cfg, pair[1])
+            name = func.entry.name
+            with timer.phase("selectInstr", name):
+                pair = self.emitter.selectInstr(func)
+            with timer.phase("buildCFG", name):
+                builder = CFGBuilder()
+                cfg: CFG = builder.buildFrom(pair[0])
+            with timer.phase("liveness", name):
+                analyzer.accept(cfg)
+            # including the emission of the function
+            with timer.phase("regalloc", name):
+                self.regAlloc.accept(cfg, pair[1])
 
         return self.emitter.emitEnd()
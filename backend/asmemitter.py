@@ -1,4 +1,5 @@
 from abc import ABC, abstractmethod
+from typing import Optional, TextIO
 
 from utils.asmcodeprinter import AsmCodePrinter
 from utils.tac.reg import Reg
@@ -12,6 +13,7 @@ AsmEmitter: emit asm code
         printer: use it to output the asm code
 allocatableRegs: all the regs that can used in reg alloc
  callerSaveRegs: all the caller save regs that used in reg alloc
+           sink: if given, the asm code of each function is written to it as soon as it is finished
 
         selectInstr: select asm Instr according to the TAC
      emitSubroutine: return a new asmEmitter that used for emitting the asm code for a new fuction
@@ -19,10 +21,15 @@ allocatableRegs: all the regs that can used in reg alloc
 
 
 class AsmEmitter(ABC):
-    def __init__(self, allocatableRegs: list[Reg], callerSaveRegs: list[Reg]) -> None:
+    def __init__(
+        self,
+        allocatableRegs: list[Reg],
+        callerSaveRegs: list[Reg],
+        sink: Optional[TextIO] = None,
+    ) -> None:
         self.allocatableRegs = allocatableRegs
         self.callerSaveRegs = callerSaveRegs
-        self.printer = AsmCodePrinter()
+        self.printer = AsmCodePrinter(sink)
 
     @abstractmethod
     def selectInstr(self, func: TACFunc) -> tuple[list[str], SubroutineInfo]:
@@ -6,6 +6,7 @@ CFG: Control Flow Graph
 nodes: sequence of basicblock
 edges: sequence of edge(u,v), which represents after block u is executed, block v may be executed
 links: links[u][0] represent the Prev of u, links[u][1] represent the Succ of u,
+reachable: reachable[u] is True if basic block u can be reached from basic block 0
 """
 
 
@@ -27,6 +28,13 @@ class CFG:
         You can start from basic block 0 and do a DFS traversal of the CFG
         to find all the reachable basic blocks.
         """
+        self.reachable = [False] * len(nodes)
+        stack = [0] if nodes else []
+        while stack:
+            u = stack.pop()
+            if not self.reachable[u]:
+                self.reachable[u] = True
+                stack.extend(self.links[u][1])
 
     def getBlock(self, id):
         return self.nodes[id]
@@ -43,5 +51,8 @@ class CFG:
     def getOutDegree(self, id):
         return len(self.links[id][1])
 
+    def isReachable(self, id):
+        return self.reachable[id]
+
     def iterator(self):
         return iter(self.nodes)
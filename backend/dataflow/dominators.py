@@ -0,0 +1,123 @@
+from typing import Optional
+
+from backend.dataflow.cfg import CFG
+
+"""
+DominatorTree: the dominators of the basic blocks reachable from block 0
+
+Block a dominates block b if every path from block 0 to b goes through a.
+The immediate dominators are computed by the iterative algorithm of Cooper, Harvey & Kennedy
+("A Simple, Fast Dominance Algorithm"), which visits the blocks in reverse postorder and usually
+converges in two or three rounds.
+The dominance frontier of a is the set of blocks b such that a dominates a predecessor of b
+but does not strictly dominate b, i.e. where the blocks dominated by a meet the other paths.
+
+    order: the reachable blocks in reverse postorder (block 0 first)
+     idom: map from a block id to the id of its immediate dominator (None for block 0 and unreachable blocks)
+ children: map from a block id to the blocks it immediately dominates
+ frontier: map from a block id to its dominance frontier
+"""
+
+
+class DominatorTree:
+    def __init__(self, graph: CFG) -> None:
+        self.graph = graph
+        n = len(graph.nodes)
+        self.order = self.reversePostorder(graph)
+        rank = [n] * n
+        for i, id in enumerate(self.order):
+            rank[id] = i
+
+        idom: list[Optional[int]] = [None] * n
+        if self.order:
+            idom[0] = 0
+        changed = True
+        while changed:
+            changed = False
+            for id in self.order[1:]:
+                new = None
+                for prev in graph.getPrev(id):
+                    if idom[prev] is None:
+                        continue
+                    new = prev if new is None else self.intersect(idom, rank, prev, new)
+                if idom[id] != new:
+                    idom[id] = new
+                    changed = True
+        if self.order:
+            idom[0] = None
+        self.idom = idom
+
+        self.children: list[list[int]] = [[] for _ in range(n)]
+        for id in self.order[1:]:
+            self.children[idom[id]].append(id)
+
+        self.frontier: list[set[int]] = [set() for _ in range(n)]
+        for id in self.order:
+            prevs = [prev for prev in graph.getPrev(id) if graph.isReachable(prev)]
+            if len(prevs) < 2:
+                continue
+            for prev in prevs:
+                runner = prev
+                while runner is not None and runner != idom[id]:
+                    self.frontier[runner].add(id)
+                    runner = idom[runner]
+
+        # the interval of each block in a preorder walk of the tree, for dominates
+        self.enter = [-1] * n
+        self.exit = [-1] * n
+        time = 0
+        for id, leaving in self.walk():
+            if leaving:
+                self.exit[id] = time
+            else:
+                self.enter[id] = time
+            time += 1
+
+    @staticmethod
+    def reversePostorder(graph: CFG) -> list[int]:
+        if not graph.nodes:
+            return []
+        order = []
+        visited = [False] * len(graph.nodes)
+        visited[0] = True
+        stack = [(0, iter(sorted(graph.getSucc(0))))]
+        while stack:
+            id, succs = stack[-1]
+            for next in succs:
+                if not visited[next]:
+                    visited[next] = True
+                    stack.append((next, iter(sorted(graph.getSucc(next)))))
+                    break
+            else:
+                stack.pop()
+                order.append(id)
+        order.reverse()
+        return order
+
+    @staticmethod
+    def intersect(idom: list[Optional[int]], rank: list[int], a: int, b: int) -> int:
+        while a != b:
+            while rank[a] > rank[b]:
+                a = idom[a]
+            while rank[b] > rank[a]:
+                b = idom[b]
+        return a
+
+    # walk the tree from block 0 without recursion, yield (id, False) when entering a block
+    # and (id, True) when leaving it (after all the blocks it dominates)
+    def walk(self):
+        if not self.order:
+            return
+        stack = [(0, False)]
+        while stack:
+            id, leaving = stack.pop()
+            yield id, leaving
+            if not leaving:
+                stack.append((id, True))
+                for child in reversed(self.children[id]):
+                    stack.append((child, False))
+
+    def dominates(self, a: int, b: int) -> bool:
+        if self.enter[a] < 0 or self.enter[b] < 0:
+            return False
+        return self.enter[a] <= self.enter[b] and self.exit[b] <= self.exit[a]
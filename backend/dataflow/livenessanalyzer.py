@@ -1,60 +1,99 @@
+from collections import deque
+
 from backend.dataflow.basicblock import BasicBlock
 from backend.dataflow.cfg import CFG
+from backend.dataflow.liveset import LiveSet, TempNumbering
 from utils.tac.temp import Temp
 
 """
 LivenessAnalyzer: do the liveness analysis according to the CFG
+
+The temps are numbered densely and every live set is a bitmask (see LiveSet).
+Since liveness is a backward problem, the worklist starts with the blocks in postorder,
+so that a block is usually visited after its successors, and a block is only revisited
+when the liveIn of one of its successors changes.
+
+numbering: the TempNumbering of the last analyzed function
 """
 
 
 class LivenessAnalyzer:
     def __init__(self) -> None:
-        pass
+        self.numbering = TempNumbering()
 
     def accept(self, graph: CFG):
-        for bb in graph.nodes:
-            self.computeDefAndLiveUseFor(bb)
-            bb.liveIn = set()
-            bb.liveIn.update(bb.liveUse)
-            bb.liveOut = set()
+        self.numbering = TempNumbering()
 
-        changed = True
-        while changed:
-            changed = False
-            for bb in graph.nodes:
-                for next in graph.getSucc(bb.id):
-                    bb.liveOut.update(graph.getBlock(next).liveIn)
+        # for each block, the (read, written) masks of its locs
+        masks = [self.computeDefAndLiveUseFor(bb) for bb in graph.nodes]
 
-                liveOut = bb.liveOut.copy()
-                for v in bb.define:
-                    liveOut.discard(v)
+        liveIn = [bb.liveUse.mask for bb in graph.nodes]
+        liveOut = [0] * len(graph.nodes)
 
-                before = len(bb.liveIn)
-                bb.liveIn.update(liveOut)
-                after = len(bb.liveIn)
+        worklist = deque(self.postorder(graph))
+        inWorklist = [True] * len(graph.nodes)
+        while worklist:
+            id = worklist.popleft()
+            inWorklist[id] = False
+            bb = graph.getBlock(id)
 
-                if before != after:
-                    changed = True
+            out = 0
+            for next in graph.getSucc(id):
+                out |= liveIn[next]
+            liveOut[id] = out
 
-        for bb in graph.nodes:
-            self.analyzeLivenessForEachLocIn(bb)
+            live = bb.liveUse.mask | (out & ~bb.define.mask)
+            if live != liveIn[id]:
+                liveIn[id] = live
+                for prev in graph.getPrev(id):
+                    if not inWorklist[prev]:
+                        inWorklist[prev] = True
+                        worklist.append(prev)
 
-    def computeDefAndLiveUseFor(self, bb: BasicBlock):
-        bb.define = set()
-        bb.liveUse = set()
-        for loc in bb.iterator():
-            for read in loc.instr.getRead():
-                if not read in bb.define:
-                    bb.liveUse.add(read)
-            bb.define.update(loc.instr.getWritten())
+        for bb in graph.nodes:
+            bb.liveIn = LiveSet(liveIn[bb.id], self.numbering)
+            bb.liveOut = LiveSet(liveOut[bb.id], self.numbering)
+            self.analyzeLivenessForEachLocIn(bb, masks[bb.id])
 
-    def analyzeLivenessForEachLocIn(self, bb: BasicBlock):
-        liveOut = bb.liveOut.copy()
-        for loc in bb.backwardIterator():
-            loc.liveOut = liveOut.copy()
+    # blocks reachable from block 0 in postorder, followed by the unreachable ones
+    def postorder(self, graph: CFG) -> list[int]:
+        order = []
+        visited = [False] * len(graph.nodes)
+        for root in range(len(graph.nodes)):
+            if visited[root]:
+                continue
+            visited[root] = True
+            stack = [(root, iter(graph.getSucc(root)))]
+            while stack:
+                id, succs = stack[-1]
+                for next in succs:
+                    if not visited[next]:
+                        visited[next] = True
+                        stack.append((next, iter(graph.getSucc(next))))
+                        break
+                else:
+                    stack.pop()
+                    order.append(id)
+        return order
 
-            for v in loc.instr.getWritten():
-                liveOut.discard(v)
+    def computeDefAndLiveUseFor(self, bb: BasicBlock) -> list[tuple[int, int]]:
+        maskOf = self.numbering.maskOf
+        define = 0
+        liveUse = 0
+        masks = []
+        for loc in bb.iterator():
+            read = maskOf(loc.instr.getRead())
+            written = maskOf(loc.instr.getWritten())
+            masks.append((read, written))
+            liveUse |= read & ~define
+            define |= written
+        bb.define = LiveSet(define, self.numbering)
+        bb.liveUse = LiveSet(liveUse, self.numbering)
+        return masks
 
-            liveOut.update(loc.instr.getRead())
-            loc.liveIn = liveOut.copy()
+    def analyzeLivenessForEachLocIn(self, bb: BasicBlock, masks: list[tuple[int, int]]):
+        live = bb.liveOut.mask
+        for loc, (read, written) in zip(reversed(bb.locs), reversed(masks)):
+            loc.liveOut = LiveSet(live, self.numbering)
+            live = (live & ~written) | read
+            loc.liveIn = LiveSet(live, self.numbering)
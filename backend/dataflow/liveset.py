@@ -0,0 +1,68 @@
+from typing import Iterable, Iterator
+
+"""
+TempNumbering: number the temps of a function densely (0, 1, 2, ...), so that a set of temps can be a bitmask
+
+ bits: map from temp.index to its bit
+temps: map from bit to temp.index
+"""
+
+
+class TempNumbering:
+    def __init__(self) -> None:
+        self.bits: dict[int, int] = {}
+        self.temps: list[int] = []
+
+    def bitOf(self, index: int) -> int:
+        bit = self.bits.get(index)
+        if bit is None:
+            bit = len(self.temps)
+            self.bits[index] = bit
+            self.temps.append(index)
+        return bit
+
+    def maskOf(self, indices: Iterable[int]) -> int:
+        mask = 0
+        for index in indices:
+            mask |= 1 << self.bitOf(index)
+        return mask
+
+    def __len__(self) -> int:
+        return len(self.temps)
+
+
+"""
+LiveSet: a read-only set of temp indexes stored as a bitmask over a TempNumbering
+
+It can be used like the set[int] it replaces (in, iteration, len),
+and mask can be used directly for fast set operations.
+"""
+
+
+class LiveSet:
+    __slots__ = ("mask", "numbering")
+
+    def __init__(self, mask: int, numbering: TempNumbering) -> None:
+        self.mask = mask
+        self.numbering = numbering
+
+    def __contains__(self, index: int) -> bool:
+        bit = self.numbering.bits.get(index)
+        return bit is not None and (self.mask >> bit) & 1 == 1
+
+    def __iter__(self) -> Iterator[int]:
+        mask = self.mask
+        temps = self.numbering.temps
+        while mask:
+            low = mask & -mask
+            yield temps[low.bit_length() - 1]
+            mask ^= low
+
+    def __len__(self) -> int:
+        return bin(self.mask).count("1")
+
+    def __bool__(self) -> bool:
+        return self.mask != 0
+
+    def __str__(self) -> str:
+        return "{" + ", ".join(map(str, sorted(self))) + "}"
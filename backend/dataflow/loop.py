@@ -0,0 +1,63 @@
+from backend.dataflow.cfg import CFG
+from backend.dataflow.dominators import DominatorTree
+
+"""
+Loop: a natural loop of the CFG
+
+An edge u -> h is a back edge if h dominates u. The natural loop of h is h and all the blocks which can reach
+the source of one of its back edges without going through h (the back edges to the same h make one loop).
+Two natural loops with different headers are either disjoint or one contains the other.
+
+header: the id of the header block, the only block of the loop which is entered from outside
+  body: the ids of the blocks of the loop (including the header)
+ exits: the edges (u, v) leaving the loop, u in body and v not in body
+ inner: the loops directly inside this one
+ depth: 1 for an outermost loop, 2 for a loop directly inside it, ...
+
+findLoops returns the loops of a CFG, the inner loops before the outer ones.
+"""
+
+
+class Loop:
+    def __init__(self, header: int, body: set[int], graph: CFG) -> None:
+        self.header = header
+        self.body = body
+        self.exits = [(u, v) for u in sorted(body) for v in sorted(graph.getSucc(u)) if v not in body]
+        self.inner: list["Loop"] = []
+        self.depth = 1
+
+    def contains(self, other: "Loop") -> bool:
+        return other is not self and other.header in self.body
+
+
+def findLoops(graph: CFG, domTree: DominatorTree) -> list[Loop]:
+    latches: dict[int, list[int]] = {}
+    for u in domTree.order:
+        for h in graph.getSucc(u):
+            if domTree.dominates(h, u):
+                latches.setdefault(h, []).append(u)
+
+    loops = []
+    for header in sorted(latches):
+        body = {header}
+        stack = [u for u in latches[header] if u not in body]
+        body.update(stack)
+        while stack:
+            u = stack.pop()
+            for prev in graph.getPrev(u):
+                if prev not in body and graph.isReachable(prev):
+                    body.add(prev)
+                    stack.append(prev)
+        loops.append(Loop(header, body, graph))
+
+    loops.sort(key=lambda loop: len(loop.body))
+    for i, loop in enumerate(loops):
+        # the smallest loop containing this one is its parent
+        for outer in loops[i + 1 :]:
+            if outer.contains(loop):
+                outer.inner.append(loop)
+                break
+    for loop in reversed(loops):
+        for inner in loop.inner:
+            inner.depth = loop.depth + 1
+    return loops
@@ -0,0 +1,102 @@
+from backend.dataflow.cfg import CFG
+from backend.dataflow.dominators import DominatorTree
+from backend.dataflow.livenessanalyzer import LivenessAnalyzer
+from backend.dataflow.loc import Loc
+from utils.tac.tacfunc import TACFunc
+from utils.tac.tacinstr import Phi, TACInstr
+from utils.tac.temp import Temp
+
+"""
+SSABuilder: put the CFG of a function into (pruned) SSA form, Cytron et al.
+
+1. placePhis：对每个被定值的 Temp，在其定值所在基本块的支配边界（迭代）上放置 Phi，
+   只在该 Temp 在基本块入口活跃时才放置（pruned SSA，避免大量无用的 Phi）
+2. rename：沿支配树先序遍历，每次定值都换成一个新的 Temp，使用换成当前可见的版本，
+   并填写后继基本块中 Phi 对应本前驱的参数
+
+A temp which is read before any of its defs (e.g. an uninitialized variable) keeps its old name for that value,
+every def gets a new temp, so the old name is never assigned again.
+The blocks which can not be reached are left as they are (SSADestructor drops them).
+Both steps are linear in the size of the function and the number of phis.
+"""
+
+
+class SSABuilder:
+    def build(self, func: TACFunc, graph: CFG) -> DominatorTree:
+        domTree = DominatorTree(graph)
+        LivenessAnalyzer().accept(graph)
+        self.placePhis(graph, domTree)
+        self.rename(func, graph, domTree)
+        return domTree
+
+    def placePhis(self, graph: CFG, domTree: DominatorTree) -> None:
+        defSites: dict[int, list[int]] = {}
+        temps: dict[int, Temp] = {}
+        for id in domTree.order:
+            for loc in graph.getBlock(id).iterator():
+                for dst in loc.instr.dsts:
+                    temps[dst.index] = dst
+                    sites = defSites.setdefault(dst.index, [])
+                    if not sites or sites[-1] != id:
+                        sites.append(id)
+
+        phis: list[list[Phi]] = [[] for _ in graph.nodes]
+        hasPhi: dict[int, int] = {}
+        inWorklist: dict[int, int] = {}
+        for index in sorted(defSites):
+            worklist = list(defSites[index])
+            for id in worklist:
+                inWorklist[id] = index
+            while worklist:
+                id = worklist.pop()
+                for join in domTree.frontier[id]:
+                    if hasPhi.get(join) == index or index not in graph.getBlock(join).liveIn:
+                        continue
+                    hasPhi[join] = index
+                    preds = sorted(prev for prev in graph.getPrev(join) if graph.isReachable(prev))
+                    phis[join].append(Phi(temps[index], [temps[index]] * len(preds), preds))
+                    if inWorklist.get(join) != index:
+                        inWorklist[join] = index
+                        worklist.append(join)
+
+        for bb in graph.iterator():
+            if phis[bb.id]:
+                bb.locs = [Loc(phi) for phi in phis[bb.id]] + bb.locs
+
+    def rename(self, func: TACFunc, graph: CFG, domTree: DominatorTree) -> None:
+        # the current version of each temp, and the versions pushed by each block to pop when leaving it
+        stacks: dict[int, list[Temp]] = {}
+        pushed: dict[int, list[int]] = {}
+
+        for id, leaving in domTree.walk():
+            if leaving:
+                for index in pushed.pop(id):
+                    stacks[index].pop()
+                continue
+
+            pushed[id] = []
+            for loc in graph.getBlock(id).iterator():
+                instr = loc.instr
+                if not isinstance(instr, Phi):
+                    self.replaceReads(instr, stacks)
+                subst = {}
+                for dst in instr.dsts:
+                    subst[dst.index] = func.freshTemp()
+                    stacks.setdefault(dst.index, []).append(subst[dst.index])
+                    pushed[id].append(dst.index)
+                instr.replaceDsts(subst)
+
+            for next in graph.getSucc(id):
+                for loc in graph.getBlock(next).iterator():
+                    if not isinstance(loc.instr, Phi):
+                        break
+                    phi = loc.instr
+                    i = phi.preds.index(id)
+                    stack = stacks.get(phi.srcs[i].index)
+                    if stack:
+                        phi.srcs[i] = stack[-1]
+
+    def replaceReads(self, instr: TACInstr, stacks: dict[int, list[Temp]]) -> None:
+        subst = {src.index: stacks[src.index][-1] for src in instr.srcs if stacks.get(src.index)}
+        if subst:
+            instr.replaceSrcs(subst)
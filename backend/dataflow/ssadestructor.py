@@ -0,0 +1,101 @@
+from backend.dataflow.basicblock import BlockKind
+from backend.dataflow.cfg import CFG
+from utils.tac.tacfunc import TACFunc
+from utils.tac.tacinstr import *
+
+"""
+SSADestructor: take the CFG of a function out of SSA form, and write it back to the function
+
+The phis at the start of a block become copies on its incoming edges, dst = src for every phi, all done at once.
+1. if the predecessor has only one successor, the copies go to its end (before its jump, if any)
+2. if the predecessor ends with a CondBranch, the edge is split:
+   on the branch target, the CondBranch jumps to a new block with the copies and a branch to the old target
+   (the new blocks are put after the function); on the fall-through, the copies are put right after the CondBranch
+The copies of one edge are a parallel copy, sequentialize turns them into Assigns in a safe order,
+with a new temp to break each cycle (e.g. a swap: a, b = b, a).
+
+The blocks which can not be reached are dropped.
+"""
+
+
+class SSADestructor:
+    def destruct(self, func: TACFunc, graph: CFG) -> None:
+        seq: list[TACInstr] = [Mark(func.entry)]
+        splitBlocks: list[TACInstr] = []
+
+        for bb in graph.iterator():
+            if not graph.isReachable(bb.id):
+                continue
+            if bb.label is not None:
+                seq.append(Mark(bb.label))
+            body = [loc.instr for loc in bb.iterator() if not isinstance(loc.instr, Phi)]
+
+            if bb.kind is BlockKind.END_BY_COND_JUMP:
+                branch = body[-1]
+                seq.extend(body[:-1])
+                target = self.targetOf(graph, bb.id, branch.label)
+                copies = self.copiesFor(func, graph, bb.id, target)
+                if copies:
+                    label = func.freshLabel()
+                    seq.append(CondBranch(branch.op, branch.cond, label))
+                    splitBlocks.append(Mark(label))
+                    splitBlocks.extend(copies)
+                    splitBlocks.append(Branch(branch.label))
+                else:
+                    seq.append(branch)
+                if bb.id + 1 in graph.getSucc(bb.id):
+                    seq.extend(self.copiesFor(func, graph, bb.id, bb.id + 1))
+                continue
+
+            succs = list(graph.getSucc(bb.id))
+            copies = self.copiesFor(func, graph, bb.id, succs[0]) if len(succs) == 1 else []
+            if bb.kind is BlockKind.END_BY_JUMP:
+                seq.extend(body[:-1] + copies + body[-1:])
+            else:
+                seq.extend(body + copies)
+
+        func.instrSeq = seq + splitBlocks
+
+    def targetOf(self, graph: CFG, id: int, label: Label) -> int:
+        for next in graph.getSucc(id):
+            if graph.getBlock(next).label is label:
+                return next
+        raise ValueError("no successor is labelled %s" % label)
+
+    # the copies for the phis of block next, on the edge from block id
+    def copiesFor(self, func: TACFunc, graph: CFG, id: int, next: int) -> list[TACInstr]:
+        copies = []
+        for loc in graph.getBlock(next).iterator():
+            if not isinstance(loc.instr, Phi):
+                break
+            copies.append((loc.instr.dst, loc.instr.srcFrom(id)))
+        return self.sequentialize(func, copies)
+
+    # turn the parallel copy [(dst, src), ...] into a sequence of Assigns
+    def sequentialize(self, func: TACFunc, copies: list[tuple[Temp, Temp]]) -> list[TACInstr]:
+        # pending: map from dst.index to (dst, src) of the copies not emitted yet
+        pending = {dst.index: (dst, src) for dst, src in copies if dst.index != src.index}
+        readers: dict[int, int] = {}
+        for _, src in pending.values():
+            readers[src.index] = readers.get(src.index, 0) + 1
+
+        seq: list[TACInstr] = []
+        ready = [index for index in pending if readers.get(index, 0) == 0]
+        while pending:
+            while ready:
+                dst, src = pending.pop(ready.pop())
+                seq.append(Assign(dst, src))
+                readers[src.index] -= 1
+                if readers[src.index] == 0 and src.index in pending:
+                    ready.append(src.index)
+            if pending:
+                # only cycles are left: save the value of one dst, and let its readers read the copy
+                index = next(iter(pending))
+                saved = func.freshTemp()
+                seq.append(Assign(saved, pending[index][0]))
+                for other, (dst, src) in pending.items():
+                    if src.index == index:
+                        pending[other] = (dst, saved)
+                readers[saved.index] = readers.pop(index)
+                ready.append(index)
+        return seq
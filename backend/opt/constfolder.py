@@ -0,0 +1,55 @@
+from utils.tac.tacop import TacBinaryOp, TacUnaryOp
+
+"""
+ConstFolder: evaluate the TAC operations on constants, with the 32-bit semantics of the generated RISC-V code
+
+The results are wrapped to signed 32-bit integers, and division follows the RISC-V div / rem instructions:
+it rounds towards zero, x / 0 = -1, x % 0 = x, and INT_MIN / -1 = INT_MIN, INT_MIN % -1 = 0.
+"""
+
+
+class ConstFolder:
+    @staticmethod
+    def wrap(x: int) -> int:
+        x &= 0xFFFF_FFFF
+        return x - (1 << 32) if x & 0x8000_0000 else x
+
+    @staticmethod
+    def unary(op: TacUnaryOp, x: int) -> int:
+        if op == TacUnaryOp.NEG:
+            return ConstFolder.wrap(-x)
+        if op == TacUnaryOp.BITNOT:
+            return ConstFolder.wrap(~x)
+        return int(x == 0)
+
+    @staticmethod
+    def binary(op: TacBinaryOp, x: int, y: int) -> int:
+        wrap = ConstFolder.wrap
+        if op == TacBinaryOp.ADD:
+            return wrap(x + y)
+        if op == TacBinaryOp.SUB:
+            return wrap(x - y)
+        if op == TacBinaryOp.MUL:
+            return wrap(x * y)
+        if op == TacBinaryOp.DIV:
+            if y == 0:
+                return -1
+            q = abs(x) // abs(y)
+            return wrap(q if (x < 0) == (y < 0) else -q)
+        if op == TacBinaryOp.MOD:
+            if y == 0:
+                return x
+            r = abs(x) % abs(y)
+            return r if x >= 0 else -r
+        return int(
+            {
+                TacBinaryOp.EQU: x == y,
+                TacBinaryOp.NEQ: x != y,
+                TacBinaryOp.SLT: x < y,
+                TacBinaryOp.SGT: x > y,
+                TacBinaryOp.LEQ: x <= y,
+                TacBinaryOp.GEQ: x >= y,
+                TacBinaryOp.LAND: x != 0 and y != 0,
+                TacBinaryOp.LOR: x != 0 or y != 0,
+            }[op]
+        )
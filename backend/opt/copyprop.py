@@ -0,0 +1,83 @@
+from collections import deque
+from typing import Optional
+
+from backend.dataflow.basicblock import BasicBlock
+from backend.dataflow.cfg import CFG
+from backend.opt.tacpass import TACPass
+from utils.stats import stats
+from utils.tac.tacfunc import TACFunc
+from utils.tac.tacinstr import *
+
+"""
+CopyPropagation: replace the uses of a copy (x = y) by its source, as long as the copy is available
+
+A copy x = y is available at a point if it is executed on every path to the point,
+and neither x nor y is assigned after it on any of these paths.
+The copies are a forward "must" problem over the CFG: a state maps x (temp.index) to y (Temp),
+and the state at the entry of a block is the common copies of the states at the end of its predecessors
+(the predecessors which have not been visited yet are ignored, as if every copy were available there).
+
+The copies themselves are left to DCE, which removes them once their dsts are no longer read.
+"""
+
+
+class CopyPropagation(TACPass):
+    name = "copyprop"
+
+    def transformFunc(self, func: TACFunc) -> None:
+        graph = self.buildCFG(func)
+        if not graph.nodes:
+            return
+
+        outStates: list[Optional[dict[int, Temp]]] = [None] * len(graph.nodes)
+        worklist = deque(range(len(graph.nodes)))
+        inWorklist = [True] * len(graph.nodes)
+        while worklist:
+            id = worklist.popleft()
+            inWorklist[id] = False
+
+            state = self.transfer(graph.getBlock(id), self.inStateOf(graph, id, outStates), False)
+            if state == outStates[id]:
+                continue
+            outStates[id] = state
+            for next in sorted(graph.getSucc(id)):
+                if not inWorklist[next]:
+                    inWorklist[next] = True
+                    worklist.append(next)
+
+        for bb in graph.iterator():
+            self.transfer(bb, self.inStateOf(graph, bb.id, outStates), True)
+
+    def inStateOf(self, graph: CFG, id: int, outStates: list[Optional[dict[int, Temp]]]) -> dict[int, Temp]:
+        # nothing is available at the entry of the function
+        if id == 0:
+            return {}
+        state = None
+        for prev in sorted(graph.getPrev(id)):
+            prevState = outStates[prev]
+            if prevState is None:
+                continue
+            if state is None:
+                state = dict(prevState)
+            else:
+                state = {index: src for index, src in state.items() if prevState.get(index) is src}
+        return state or {}
+
+    # the copies available at the end of bb, the srcs of the instrs are replaced if rewrite is set
+    def transfer(self, bb: BasicBlock, state: dict[int, Temp], rewrite: bool) -> dict[int, Temp]:
+        for loc in bb.iterator():
+            instr = loc.instr
+            if rewrite and any(src.index in state for src in instr.srcs):
+                stats.add(self.name, "uses replaced", sum(1 for src in instr.srcs if src.index in state))
+                instr.replaceSrcs(state)
+
+            for dst in instr.dsts:
+                state.pop(dst.index, None)
+                for index in [index for index, src in state.items() if src.index == dst.index]:
+                    del state[index]
+            if isinstance(instr, Assign):
+                # the src is already replaced by its own copy source (if any), so there is no chain of copies
+                src = state.get(instr.src.index, instr.src)
+                if src.index != instr.dst.index:
+                    state[instr.dst.index] = src
+        return state
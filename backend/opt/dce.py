@@ -0,0 +1,58 @@
+from backend.dataflow.livenessanalyzer import LivenessAnalyzer
+from backend.opt.tacpass import TACPass
+from utils.stats import stats
+from utils.tac.tacfunc import TACFunc
+from utils.tac.tacinstr import *
+
+"""
+DCE: dead code elimination
+
+1. the blocks which can not be reached from the entry block are removed
+2. with the liveness of the temps, Assign / LoadImm4 / Unary / Binary whose dst is dead are removed
+   (they have no side effect: even a division by zero does not trap on RISC-V)
+
+Removing an instr can make the instrs computing its srcs dead, in the same block (which is handled by
+walking the block backwards) or in other blocks, so the pass is repeated until nothing changes.
+"""
+
+
+class DCE(TACPass):
+    name = "dce"
+
+    def transformFunc(self, func: TACFunc) -> None:
+        analyzer = LivenessAnalyzer()
+        while True:
+            graph = self.buildCFG(func)
+            analyzer.accept(graph)
+            maskOf = analyzer.numbering.maskOf
+
+            removedBlocks = 0
+            removedInstrs = 0
+            for bb in graph.iterator():
+                if not graph.isReachable(bb.id):
+                    # CFGBuilder makes an empty block without label after each jump, it is not worth counting
+                    if bb.label is not None or not bb.isEmpty():
+                        removedBlocks += 1
+                    continue
+
+                live = bb.liveOut.mask
+                locs = []
+                for loc in bb.backwardIterator():
+                    instr = loc.instr
+                    written = maskOf(instr.getWritten())
+                    if self.isPure(instr) and written & live == 0:
+                        removedInstrs += 1
+                        continue
+                    live = (live & ~written) | maskOf(instr.getRead())
+                    locs.append(loc)
+                locs.reverse()
+                bb.locs = locs
+
+            stats.add(self.name, "unreachable blocks removed", removedBlocks)
+            stats.add(self.name, "dead instrs removed", removedInstrs)
+            if removedBlocks == 0 and removedInstrs == 0:
+                return
+            self.flatten(func, graph, graph.reachable)
+
+    def isPure(self, instr: TACInstr) -> bool:
+        return isinstance(instr, (Assign, LoadImm4, Unary, Binary))
@@ -0,0 +1,163 @@
+import copy
+
+from backend.dataflow.dominators import DominatorTree
+from backend.dataflow.loop import findLoops
+from backend.opt.tacpass import TACPass
+from utils.label.label import Label
+from utils.stats import stats
+from utils.tac.tacfunc import TACFunc
+from utils.tac.tacinstr import *
+from utils.tac.tacprog import TACProg
+
+"""
+Inliner: replace a call by a copy of the body of the callee
+
+1. 调用图：按 Tarjan 算法求强连通分量，被调用者先于调用者处理，所以内联进来的代码已经内联过它自己的调用；
+   同一个强连通分量中的函数（以及调用自身的函数）构成递归，它们之间的调用不内联
+2. 代价模型：被调用者的大小（不计标号和注释）不超过 threshold 时内联；调用点每在一层循环中，
+   允许的大小乘以 LOOP_BONUS（越热的调用点越值得内联）；调用者超过 MAX_CALLER 条指令后不再内联
+3. 复制：被调用者的每个 temp 换成调用者的新 temp，每个标号换成调用者的新标号（TACFunc.freshLabel），
+   参数先赋给被调用者的前 numArgs 个 temp，return v 变为 dst = v 并跳到调用之后
+
+The inliner runs before the other passes, which clean up the copies of the args and the jumps to the end.
+"""
+
+
+class Inliner(TACPass):
+    name = "inline"
+    THRESHOLD = 40
+    LOOP_BONUS = 2
+    MAX_CALLER = 2000
+
+    def __init__(self, threshold: int = THRESHOLD) -> None:
+        self.threshold = threshold
+
+    def transform(self, prog: TACProg) -> TACProg:
+        self.funcs = {func.entry.func: func for func in prog.funcs}
+        for scc in self.bottomUp(self.funcs):
+            self.recursive = set(scc) if len(scc) > 1 or scc[0] in self.calleesOf(self.funcs[scc[0]]) else set()
+            for name in scc:
+                self.transformFunc(self.funcs[name])
+        return prog
+
+    def calleesOf(self, func: TACFunc) -> list[str]:
+        return [instr.func.func for instr in func.instrSeq if isinstance(instr, Call)]
+
+    # the strongly connected components of the call graph, the callees before the callers
+    def bottomUp(self, funcs: dict[str, TACFunc]) -> list[list[str]]:
+        index: dict[str, int] = {}
+        low: dict[str, int] = {}
+        stack: list[str] = []
+        onStack: set[str] = set()
+        sccs: list[list[str]] = []
+
+        for root in funcs:
+            if root in index:
+                continue
+            # (function, iterator over its callees), instead of recursion
+            work = [(root, iter(self.calleesOf(funcs[root])))]
+            index[root] = low[root] = len(index)
+            stack.append(root)
+            onStack.add(root)
+            while work:
+                name, callees = work[-1]
+                callee = next((c for c in callees if c in funcs), None)
+                if callee is not None:
+                    if callee not in index:
+                        index[callee] = low[callee] = len(index)
+                        stack.append(callee)
+                        onStack.add(callee)
+                        work.append((callee, iter(self.calleesOf(funcs[callee]))))
+                    elif callee in onStack:
+                        low[name] = min(low[name], index[callee])
+                    continue
+                work.pop()
+                if work:
+                    caller = work[-1][0]
+                    low[caller] = min(low[caller], low[name])
+                if low[name] == index[name]:
+                    scc = []
+                    while True:
+                        member = stack.pop()
+                        onStack.discard(member)
+                        scc.append(member)
+                        if member == name:
+                            break
+                    sccs.append(scc)
+        return sccs
+
+    # self.funcs and self.recursive (the functions calling each other with func) are set by transform
+    def transformFunc(self, func: TACFunc) -> None:
+        depths = self.loopDepths(func)
+        size = self.sizeOf(func)
+        seq: list[TACInstr] = []
+        for instr in func.instrSeq:
+            callee = self.funcs.get(instr.func.func) if isinstance(instr, Call) else None
+            if callee is None or callee.entry.func in self.recursive:
+                seq.append(instr)
+                continue
+            calleeSize = self.sizeOf(callee)
+            allowed = self.threshold * self.LOOP_BONUS ** depths.get(id(instr), 0)
+            if calleeSize > allowed or size + calleeSize > self.MAX_CALLER:
+                stats.add(self.name, "calls not inlined")
+                seq.append(instr)
+                continue
+            stats.add(self.name, "calls inlined")
+            size += calleeSize
+            seq += self.inlined(func, instr, callee)
+        func.instrSeq = seq
+
+    # map from id(call) to the loop depth of its block
+    def loopDepths(self, func: TACFunc) -> dict[int, int]:
+        graph = self.buildCFG(func)
+        if not graph.nodes:
+            return {}
+        depths: dict[int, int] = {}
+        # the loops are sorted inner first, so the depth of the innermost loop is kept
+        for loop in reversed(findLoops(graph, DominatorTree(graph))):
+            for block in loop.body:
+                for loc in graph.getBlock(block).iterator():
+                    if isinstance(loc.instr, Call):
+                        depths[id(loc.instr)] = loop.depth
+        return depths
+
+    def sizeOf(self, func: TACFunc) -> int:
+        return sum(1 for instr in func.instrSeq if not isinstance(instr, (Mark, Memo)))
+
+    # the instrs replacing call in func
+    def inlined(self, func: TACFunc, call: Call, callee: TACFunc) -> list[TACInstr]:
+        temps: dict[int, Temp] = {}
+        labels: dict[Label, Label] = {}
+
+        def tempOf(temp: Temp) -> Temp:
+            if temp.index not in temps:
+                temps[temp.index] = func.freshTemp()
+            return temps[temp.index]
+
+        def labelOf(label: Label) -> Label:
+            if label not in labels:
+                labels[label] = func.freshLabel()
+            return labels[label]
+
+        exit = func.freshLabel()
+        seq: list[TACInstr] = [Assign(tempOf(Temp(i)), arg) for i, arg in enumerate(call.args)]
+        for instr in callee.instrSeq:
+            if isinstance(instr, Mark):
+                if not instr.label.isFunc():
+                    seq.append(Mark(labelOf(instr.label)))
+            elif isinstance(instr, Return):
+                if instr.value is not None and call.dst is not None:
+                    seq.append(Assign(call.dst, tempOf(instr.value)))
+                seq.append(Branch(exit))
+            elif isinstance(instr, Branch):
+                seq.append(Branch(labelOf(instr.target)))
+            elif isinstance(instr, CondBranch):
+                seq.append(CondBranch(instr.op, tempOf(instr.cond), labelOf(instr.target)))
+            else:
+                clone = copy.copy(instr)
+                clone.replaceSrcs({src.index: tempOf(src) for src in instr.srcs})
+                clone.replaceDsts({dst.index: tempOf(dst) for dst in instr.dsts})
+                seq.append(clone)
+        seq.append(Mark(exit))
+        return seq
+
@@ -0,0 +1,235 @@
+from typing import Optional
+
+from backend.dataflow.basicblock import BlockKind
+from backend.dataflow.cfg import CFG
+from backend.dataflow.dominators import DominatorTree
+from backend.dataflow.loop import findLoops
+from backend.opt.tacpass import TACPass
+from utils.label.label import Label
+from utils.stats import stats
+from utils.tac.tacfunc import TACFunc
+from utils.tac.tacinstr import *
+
+"""
+BlockLayout: reorder the basic blocks of a function so that the likely successor of a block comes right after it
+
+1. threading：跳转到只含一条 branch 的基本块（或空基本块）时，直接跳到最终的目标
+2. weights：估计每条边被执行的次数：循环每深一层，基本块的次数乘以 LOOP_WEIGHT；
+   条件跳转的两条边中，留在循环内的一条占 LOOP_STAY 的概率，否则各占一半。
+   若给出了 profile，则用 profile 中的次数（profile 中没有的边为 0）
+3. chains：按权重从大到小考虑每条边 u -> v，若 u 是某条链的末尾、v 是另一条链的开头，就把两条链接起来
+   （v 将紧跟在 u 之后）；入口所在的链放在最前，其余的链按原来的顺序排列
+4. emit：紧跟在后面的基本块不再需要 branch，条件跳转的目标紧跟在后面时反转条件，
+   两个后继都不紧跟在后面时补上一个 branch
+
+profile: map from a function name to the weights of its edges, {"from -> to": weight}, where a block is named by
+its label (e.g. _L3), or by the last label before it (the function name for the first blocks) and how many blocks
+after that label it is (e.g. _L3+1, main+2). The blocks which can not be reached are dropped.
+"""
+
+
+class BlockLayout(TACPass):
+    name = "layout"
+    LOOP_WEIGHT = 10
+    LOOP_STAY = 0.9
+
+    def __init__(self, profile: Optional[dict[str, dict[str, float]]] = None) -> None:
+        self.profile = profile or {}
+
+    def transformFunc(self, func: TACFunc) -> None:
+        graph = self.buildCFG(func)
+        if not graph.nodes:
+            return
+
+        succs = [self.successorsOf(graph, id) for id in range(len(graph.nodes))]
+        forward = self.forwarding(graph, succs)
+        for id, targets in enumerate(succs):
+            threaded = [forward[next] for next in targets]
+            stats.add(self.name, "jumps threaded", sum(1 for old, new in zip(targets, threaded) if old != new))
+            succs[id] = threaded
+        entry = forward[0]
+
+        reachable = self.reachableFrom(entry, succs)
+        weights = self.edgeWeights(func, graph, succs, forward, reachable)
+        order = self.chainBlocks(entry, succs, weights, reachable)
+        self.emit(func, graph, order, succs)
+
+    # the successors of a block: [target] for a jump, [target, fall-through] for a conditional jump,
+    # [next block] for a block which falls through, [] for a return
+    def successorsOf(self, graph: CFG, id: int) -> list[int]:
+        bb = graph.getBlock(id)
+        fallThrough = [id + 1] if id + 1 < len(graph.nodes) else []
+        if bb.kind is BlockKind.END_BY_RETURN:
+            return []
+        if bb.kind is BlockKind.CONTINUOUS:
+            return fallThrough
+        target = self.blockOf(graph, id, bb.getLastInstr().label)
+        if bb.kind is BlockKind.END_BY_JUMP:
+            return [target]
+        return [target] + fallThrough
+
+    def blockOf(self, graph: CFG, id: int, label: Label) -> int:
+        for next in graph.getSucc(id):
+            if graph.getBlock(next).label is label:
+                return next
+        raise ValueError("no successor is labelled %s" % label)
+
+    # forward[id] is where the control really goes when it reaches block id:
+    # a block which only jumps (or only falls through) forwards to its successor
+    def forwarding(self, graph: CFG, succs: list[list[int]]) -> list[int]:
+        forward = list(range(len(graph.nodes)))
+        for id in range(len(graph.nodes)):
+            seen = {id}
+            target = id
+            while self.isForwarding(graph, target, succs) and succs[target][0] not in seen:
+                target = succs[target][0]
+                seen.add(target)
+            forward[id] = target
+        return forward
+
+    def isForwarding(self, graph: CFG, id: int, succs: list[list[int]]) -> bool:
+        bb = graph.getBlock(id)
+        if len(succs[id]) != 1:
+            return False
+        return bb.isEmpty() or (bb.kind is BlockKind.END_BY_JUMP and len(bb.locs) == 1)
+
+    def reachableFrom(self, entry: int, succs: list[list[int]]) -> list[bool]:
+        reachable = [False] * len(succs)
+        stack = [entry]
+        while stack:
+            id = stack.pop()
+            if not reachable[id]:
+                reachable[id] = True
+                stack.extend(succs[id])
+        return reachable
+
+    # map from an edge (u, v) to how often it is expected to be taken
+    def edgeWeights(
+        self,
+        func: TACFunc,
+        graph: CFG,
+        succs: list[list[int]],
+        forward: list[int],
+        reachable: list[bool],
+    ) -> dict[tuple[int, int], float]:
+        weights: dict[tuple[int, int], float] = {}
+        profile = self.profile.get(func.entry.func)
+        if profile is not None:
+            names = self.blockNames(func, graph)
+            ids = {name: id for id, name in enumerate(names)}
+            for key, weight in profile.items():
+                u, _, v = (part.strip() for part in key.partition("->"))
+                if u in ids and v in ids:
+                    edge = (ids[u], forward[ids[v]])
+                    weights[edge] = weights.get(edge, 0) + weight
+            return weights
+
+        domTree = DominatorTree(graph)
+        loops = findLoops(graph, domTree)
+        # the innermost loop of each block (loops are sorted inner first)
+        innermost = {}
+        for loop in reversed(loops):
+            for id in loop.body:
+                innermost[id] = loop
+        for u, targets in enumerate(succs):
+            if not reachable[u] or not targets:
+                continue
+            loop = innermost.get(u)
+            freq = float(self.LOOP_WEIGHT ** loop.depth) if loop is not None else 1.0
+            if len(targets) == 1 or targets[0] == targets[1]:
+                probs = [1.0] * len(targets)
+            elif loop is not None and (targets[0] in loop.body) != (targets[1] in loop.body):
+                stay = self.LOOP_STAY
+                probs = [stay, 1 - stay] if targets[0] in loop.body else [1 - stay, stay]
+            else:
+                probs = [0.5, 0.5]
+            for v, prob in zip(targets, probs):
+                weights[(u, v)] = weights.get((u, v), 0) + freq * prob
+        return weights
+
+    # the names of the blocks used by the profile
+    def blockNames(self, func: TACFunc, graph: CFG) -> list[str]:
+        names = []
+        last, count = func.entry.func, -1
+        for bb in graph.iterator():
+            if bb.label is not None:
+                last, count = bb.label.name, 0
+                names.append(last)
+            else:
+                count += 1
+                names.append(last if count == 0 else "%s+%d" % (last, count))
+        return names
+
+    def chainBlocks(
+        self,
+        entry: int,
+        succs: list[list[int]],
+        weights: dict[tuple[int, int], float],
+        reachable: list[bool],
+    ) -> list[int]:
+        chainOf = {id: [id] for id in range(len(succs)) if reachable[id]}
+        # heavier edges first, then the edges which already fall through, then the original order
+        edges = sorted(
+            {(u, v) for u in chainOf for v in succs[u]},
+            key=lambda edge: (-weights.get(edge, 0), edge[1] != edge[0] + 1, edge),
+        )
+        for u, v in edges:
+            head, tail = chainOf[v], chainOf[u]
+            if v == entry or head is tail or tail[-1] != u or head[0] != v:
+                continue
+            tail.extend(head)
+            for id in head:
+                chainOf[id] = tail
+
+        chains = []
+        seen = set()
+        for id in [entry] + sorted(chainOf):
+            chain = chainOf[id]
+            if chain[0] not in seen:
+                seen.add(chain[0])
+                chains.append(chain)
+        return [id for chain in chains for id in chain]
+
+    def emit(self, func: TACFunc, graph: CFG, order: list[int], succs: list[list[int]]) -> None:
+        labels: dict[int, Label] = {}
+
+        def labelOf(id: int) -> Label:
+            if id not in labels:
+                labels[id] = graph.getBlock(id).label or func.freshLabel()
+            return labels[id]
+
+        # the instrs of each block, with the jumps at its end decided by what comes next
+        bodies: dict[int, list[TACInstr]] = {}
+        jumps = 0
+        for i, id in enumerate(order):
+            bb = graph.getBlock(id)
+            next = order[i + 1] if i + 1 < len(order) else None
+            body = [loc.instr for loc in bb.iterator()]
+            targets = succs[id]
+            if bb.kind in (BlockKind.END_BY_JUMP, BlockKind.END_BY_COND_JUMP):
+                last = body.pop()
+                jumps += 1
+            if bb.kind is BlockKind.END_BY_COND_JUMP and targets[0] != targets[1]:
+                target, fallThrough = targets
+                if next == target:
+                    body.append(CondBranch(self.inverted(last.op), last.cond, labelOf(fallThrough)))
+                else:
+                    body.append(CondBranch(last.op, last.cond, labelOf(target)))
+                    if next != fallThrough:
+                        body.append(Branch(labelOf(fallThrough)))
+            elif targets and bb.kind is not BlockKind.END_BY_RETURN and next != targets[0]:
+                body.append(Branch(labelOf(targets[0])))
+            bodies[id] = body
+            jumps -= sum(1 for instr in body if isinstance(instr, (Branch, CondBranch)))
+        stats.add(self.name, "jumps removed", jumps)
+
+        seq: list[TACInstr] = [Mark(func.entry)]
+        for id in order:
+            if id in labels or graph.getBlock(id).label is not None:
+                seq.append(Mark(labelOf(id)))
+            seq += bodies[id]
+        func.instrSeq = seq
+
+    @staticmethod
+    def inverted(op: CondBranchOp) -> CondBranchOp:
+        return CondBranchOp.BNE if op == CondBranchOp.BEQ else CondBranchOp.BEQ
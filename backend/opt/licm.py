@@ -0,0 +1,157 @@
+from backend.dataflow.basicblock import BasicBlock, BlockKind
+from backend.dataflow.cfg import CFG
+from backend.dataflow.dominators import DominatorTree
+from backend.dataflow.livenessanalyzer import LivenessAnalyzer
+from backend.dataflow.loop import Loop, findLoops
+from backend.opt.tacpass import TACPass
+from utils.label.label import Label
+from utils.stats import stats
+from utils.tac.tacfunc import TACFunc
+from utils.tac.tacinstr import *
+
+"""
+LICM: loop-invariant code motion
+
+The invariant instrs of a loop are moved to a new preheader block, which is executed once before the loop
+(every edge entering the header from outside the loop goes to the preheader, which falls through
+or jumps to the header). A pure instr (Assign / LoadImm4 / Unary / Binary) d = op(srcs) is invariant if
+1. every src is not assigned in the loop, or is the dst of an invariant instr
+2. d is assigned only by this instr in the loop (the temps are not in SSA form, a variable may be assigned many times)
+3. d is not live at the entry of the header, i.e. no use in the loop reads a d from before the loop or
+   from the last iteration
+4. if d is live where the control leaves the loop, the instr dominates the block which leaves
+   (so d is the same after the loop whether it is computed inside or before the loop)
+The instrs have no side effect (a division by zero does not trap on RISC-V), so they may be executed
+even if the loop would not have executed them.
+
+The inner loops are handled first, so an instr moved to the preheader of an inner loop
+(which is in the outer loop) may be moved out of the outer loop later.
+Each round handles the loops whose inner loops are all done, and rebuilds the CFG.
+"""
+
+
+class LICM(TACPass):
+    name = "licm"
+
+    def transformFunc(self, func: TACFunc) -> None:
+        # the headers of the loops which have been handled (labels survive rebuilding the CFG)
+        done: set[Label] = set()
+        while True:
+            graph = self.buildCFG(func)
+            if not graph.nodes:
+                return
+            domTree = DominatorTree(graph)
+            loops = [loop for loop in findLoops(graph, domTree) if graph.getBlock(loop.header).label is not None]
+            ready = [
+                loop
+                for loop in loops
+                if graph.getBlock(loop.header).label not in done
+                and all(graph.getBlock(inner.header).label in done for inner in loop.inner)
+            ]
+            if not ready:
+                return
+
+            LivenessAnalyzer().accept(graph)
+            preheaders = {}
+            for loop in ready:
+                done.add(graph.getBlock(loop.header).label)
+                hoisted = self.hoist(graph, domTree, loop)
+                if hoisted:
+                    preheaders[loop.header] = (loop, hoisted)
+            if preheaders:
+                self.insertPreheaders(func, graph, preheaders)
+
+    # take the invariant instrs out of the blocks of the loop, in an order in which they can be executed
+    def hoist(self, graph: CFG, domTree: DominatorTree, loop: Loop) -> list[TACInstr]:
+        blocks = [graph.getBlock(id) for id in sorted(loop.body)]
+        defCounts: dict[int, int] = {}
+        for bb in blocks:
+            for loc in bb.iterator():
+                for index in loc.instr.getWritten():
+                    defCounts[index] = defCounts.get(index, 0) + 1
+
+        header = graph.getBlock(loop.header)
+        # the temps live where the control leaves the loop, with the blocks it leaves from
+        exitLive: dict[int, list[int]] = {}
+        for u, v in loop.exits:
+            for index in graph.getBlock(v).liveIn:
+                exitLive.setdefault(index, []).append(u)
+
+        hoisted: list[TACInstr] = []
+        invariant: set[int] = set()
+        changed = True
+        while changed:
+            changed = False
+            for bb in blocks:
+                locs = []
+                for loc in bb.iterator():
+                    instr = loc.instr
+                    if self.isInvariant(instr, bb.id, defCounts, invariant, header, exitLive, domTree):
+                        hoisted.append(instr)
+                        invariant.add(instr.dsts[0].index)
+                        changed = True
+                    else:
+                        locs.append(loc)
+                bb.locs = locs
+
+        stats.add(self.name, "instrs hoisted", len(hoisted))
+        return hoisted
+
+    def isInvariant(
+        self,
+        instr: TACInstr,
+        id: int,
+        defCounts: dict[int, int],
+        invariant: set[int],
+        header: BasicBlock,
+        exitLive: dict[int, list[int]],
+        domTree: DominatorTree,
+    ) -> bool:
+        if not isinstance(instr, (Assign, LoadImm4, Unary, Binary)):
+            return False
+        dst = instr.dst.index
+        if defCounts[dst] != 1 or dst in header.liveIn:
+            return False
+        if any(src.index in defCounts and src.index not in invariant for src in instr.srcs):
+            return False
+        return all(domTree.dominates(id, u) for u in exitLive.get(dst, []))
+
+    def insertPreheaders(self, func: TACFunc, graph: CFG, preheaders: dict[int, tuple[Loop, list[TACInstr]]]) -> None:
+        before: dict[int, list[TACInstr]] = {}
+        after: list[TACInstr] = []
+        retarget: dict[int, dict[Label, Label]] = {}
+        for header, (loop, hoisted) in preheaders.items():
+            headerLabel = graph.getBlock(header).label
+            label = func.freshLabel()
+            stats.add(self.name, "preheaders inserted")
+
+            # if a block of the loop falls through to the header, the preheader can not be put right before it
+            prev = header - 1
+            if prev in loop.body and header in graph.getSucc(prev) and graph.getBlock(prev).kind in (
+                BlockKind.CONTINUOUS,
+                BlockKind.END_BY_COND_JUMP,
+            ):
+                after += [Mark(label)] + hoisted + [Branch(headerLabel)]
+            else:
+                before[header] = [Mark(label)] + hoisted
+
+            for u in graph.getPrev(header):
+                if u not in loop.body:
+                    retarget.setdefault(u, {})[headerLabel] = label
+
+        seq: list[TACInstr] = [Mark(func.entry)]
+        for bb in graph.iterator():
+            if bb.id in before:
+                seq += before[bb.id]
+            if bb.label is not None:
+                seq.append(Mark(bb.label))
+            for loc in bb.iterator():
+                seq.append(self.retargeted(loc.instr, retarget.get(bb.id, {})))
+        func.instrSeq = seq + after
+
+    def retargeted(self, instr: TACInstr, labels: dict[Label, Label]) -> TACInstr:
+        if isinstance(instr, Branch) and instr.target in labels:
+            return Branch(labels[instr.target])
+        if isinstance(instr, CondBranch) and instr.target in labels:
+            return CondBranch(instr.op, instr.cond, labels[instr.target])
+        return instr
@@ -0,0 +1,116 @@
+from typing import Optional
+
+from backend.dataflow.basicblock import BasicBlock
+from backend.opt.tacpass import TACPass
+from utils.stats import stats
+from utils.tac.tacfunc import TACFunc
+from utils.tac.tacinstr import *
+
+"""
+LocalValueNumbering: find the computations in a basic block which have already been done, and reuse their results
+
+Every value gets a number, and a computation is identified by its operation and the numbers of its operands:
+("imm", value) for LoadImm4, ("unary", op, x) for Unary and ("binary", op, x, y) for Binary.
+The operands of the commutative operations are sorted, and a > b / a >= b are written as b < a / b <= a.
+If the same computation is found again, it is replaced by a copy (Assign) from a temp which still holds its result
+(or removed, if its dst already holds it). The copies are cleaned up by CopyPropagation and DCE.
+
+valueOf: map from temp.index to the number of the value it holds now
+holders: map from a value number to the temps which held it (a temp which has been assigned again is skipped)
+"""
+
+
+class LocalValueNumbering(TACPass):
+    name = "lvn"
+
+    COMMUTATIVE = {
+        TacBinaryOp.ADD,
+        TacBinaryOp.MUL,
+        TacBinaryOp.EQU,
+        TacBinaryOp.NEQ,
+        TacBinaryOp.LAND,
+        TacBinaryOp.LOR,
+    }
+    # a op b == b swapped[op] a
+    SWAPPED = {
+        TacBinaryOp.SGT: TacBinaryOp.SLT,
+        TacBinaryOp.GEQ: TacBinaryOp.LEQ,
+    }
+
+    def transformFunc(self, func: TACFunc) -> None:
+        graph = self.buildCFG(func)
+        for bb in graph.iterator():
+            self.numberBlock(bb)
+        self.flatten(func, graph, [True] * len(graph.nodes))
+
+    def numberBlock(self, bb: BasicBlock) -> None:
+        self.valueOf: dict[int, int] = {}
+        self.holders: dict[int, list[Temp]] = {}
+        self.table: dict[tuple, int] = {}
+        self.nextValue = 0
+
+        locs = []
+        for loc in bb.iterator():
+            instr = loc.instr
+            key = self.keyOf(instr)
+            if key is None:
+                if isinstance(instr, Assign):
+                    self.assign(instr.dst, self.numberOf(instr.src))
+                else:
+                    for dst in instr.dsts:
+                        self.assign(dst, self.newValue())
+                locs.append(loc)
+                continue
+
+            value = self.table.get(key)
+            holder = self.holderOf(value) if value is not None else None
+            if holder is None:
+                value = self.newValue()
+                self.table[key] = value
+                self.assign(instr.dst, value)
+                locs.append(loc)
+            elif self.valueOf.get(instr.dst.index) == value:
+                stats.add(self.name, "computations removed")
+            else:
+                stats.add(self.name, "computations replaced by copies")
+                loc.instr = Assign(instr.dst, holder)
+                self.assign(instr.dst, value)
+                locs.append(loc)
+        bb.locs = locs
+
+    def keyOf(self, instr: TACInstr):
+        if isinstance(instr, LoadImm4):
+            return ("imm", instr.value)
+        if isinstance(instr, Unary):
+            return ("unary", instr.op, self.numberOf(instr.operand))
+        if isinstance(instr, Binary):
+            op = instr.op
+            lhs = self.numberOf(instr.lhs)
+            rhs = self.numberOf(instr.rhs)
+            if op in self.SWAPPED:
+                op, lhs, rhs = self.SWAPPED[op], rhs, lhs
+            elif op in self.COMMUTATIVE and lhs > rhs:
+                lhs, rhs = rhs, lhs
+            return ("binary", op, lhs, rhs)
+        return None
+
+    def newValue(self) -> int:
+        self.nextValue += 1
+        return self.nextValue
+
+    # the number of the value in temp (a temp not assigned in the block yet gets a new number)
+    def numberOf(self, temp: Temp) -> int:
+        if temp.index not in self.valueOf:
+            self.assign(temp, self.newValue())
+        return self.valueOf[temp.index]
+
+    def assign(self, temp: Temp, value: int) -> None:
+        self.valueOf[temp.index] = value
+        self.holders.setdefault(value, []).append(temp)
+
+    # a temp which holds the value now
+    def holderOf(self, value: int) -> Optional[Temp]:
+        for temp in self.holders.get(value, []):
+            if self.valueOf.get(temp.index) == value:
+                return temp
+        return None
@@ -0,0 +1,44 @@
+from typing import Optional
+
+from backend.opt.copyprop import CopyPropagation
+from backend.opt.dce import DCE
+from backend.opt.inliner import Inliner
+from backend.opt.layout import BlockLayout
+from backend.opt.licm import LICM
+from backend.opt.lvn import LocalValueNumbering
+from backend.opt.sccp import SCCP
+from backend.opt.tacpass import TACPass
+from backend.opt.tailrec import TailRecursion
+from utils.passtimer import timer
+from utils.tac.tacprog import TACProg
+
+"""
+Optimizer: run the TAC passes one after another, between TACGen and Asm
+"""
+
+
+class Optimizer:
+    def __init__(self, passes: list[TACPass]) -> None:
+        self.passes = passes
+
+    # profile: the edge weights for BlockLayout, inlineThreshold: the size threshold of Inliner
+    @staticmethod
+    def default(profile: Optional[dict] = None, inlineThreshold: int = Inliner.THRESHOLD) -> "Optimizer":
+        return Optimizer(
+            [
+                TailRecursion(),
+                Inliner(inlineThreshold),
+                SCCP(),
+                LocalValueNumbering(),
+                CopyPropagation(),
+                LICM(),
+                DCE(),
+                BlockLayout(profile),
+            ]
+        )
+
+    def transform(self, prog: TACProg) -> TACProg:
+        for tacPass in self.passes:
+            with timer.phase(tacPass.name):
+                prog = tacPass.transform(prog)
+        return prog
@@ -0,0 +1,148 @@
+from collections import deque
+from typing import Optional
+
+from backend.dataflow.basicblock import BasicBlock, BlockKind
+from backend.dataflow.cfg import CFG
+from backend.opt.constfolder import ConstFolder
+from backend.opt.tacpass import TACPass
+from utils.stats import stats
+from utils.tac.tacfunc import TACFunc
+from utils.tac.tacinstr import *
+
+"""
+SCCP: conditional constant propagation (Wegman & Zadeck) over the CFG of a function
+
+The temps are not in SSA form (a variable is assigned many times), so the facts are kept per block:
+a state maps temp.index to its constant value, and a temp which is not in the state is not a constant.
+The state at the entry of a block is the meet (the common constants) of the states at the end of
+its predecessors whose edges are executable. Only the edges which may be taken are made executable,
+e.g. only one edge of a branch on a constant, so the constants of the arms which can not run are ignored.
+
+After the fixed point:
+1. Assign / Unary / Binary whose results are constant become LoadImm4
+2. CondBranch on a constant becomes a Branch, or is removed if it is never taken
+3. the blocks which can never be executed are removed
+"""
+
+
+class SCCP(TACPass):
+    name = "sccp"
+
+    def transformFunc(self, func: TACFunc) -> None:
+        graph = self.buildCFG(func)
+        if not graph.nodes:
+            return
+
+        outStates: list[Optional[dict[int, int]]] = [None] * len(graph.nodes)
+        executable: set[tuple[int, int]] = set()
+
+        worklist = deque([0])
+        inWorklist = [False] * len(graph.nodes)
+        inWorklist[0] = True
+        while worklist:
+            id = worklist.popleft()
+            inWorklist[id] = False
+
+            state = self.transfer(graph.getBlock(id), self.inStateOf(graph, id, outStates, executable))
+            if state == outStates[id]:
+                continue
+            outStates[id] = state
+
+            for next in self.takenSuccs(graph, graph.getBlock(id), state):
+                executable.add((id, next))
+                if not inWorklist[next]:
+                    inWorklist[next] = True
+                    worklist.append(next)
+
+        keep = [state is not None for state in outStates]
+        stats.add(self.name, "unreachable blocks removed", keep.count(False))
+        for bb in graph.iterator():
+            if keep[bb.id]:
+                self.rewrite(graph, bb, self.inStateOf(graph, bb.id, outStates, executable))
+        self.flatten(func, graph, keep)
+
+    def inStateOf(
+        self,
+        graph: CFG,
+        id: int,
+        outStates: list[Optional[dict[int, int]]],
+        executable: set[tuple[int, int]],
+    ) -> dict[int, int]:
+        # nothing is known at the entry of the function
+        if id == 0:
+            return {}
+        state = None
+        for prev in sorted(graph.getPrev(id)):
+            if (prev, id) not in executable:
+                continue
+            if state is None:
+                state = dict(outStates[prev])
+            else:
+                prevState = outStates[prev]
+                state = {index: value for index, value in state.items() if prevState.get(index) == value}
+        return state or {}
+
+    def transfer(self, bb: BasicBlock, state: dict[int, int]) -> dict[int, int]:
+        for loc in bb.iterator():
+            self.evaluate(loc.instr, state)
+        return state
+
+    # update state with the effect of instr, and return the value of its dst if it is a constant
+    def evaluate(self, instr: TACInstr, state: dict[int, int]) -> Optional[int]:
+        value = None
+        if isinstance(instr, LoadImm4) and isinstance(instr.value, int):
+            value = ConstFolder.wrap(instr.value)
+        elif isinstance(instr, Assign):
+            value = state.get(instr.src.index)
+        elif isinstance(instr, Unary):
+            operand = state.get(instr.operand.index)
+            if operand is not None:
+                value = ConstFolder.unary(instr.op, operand)
+        elif isinstance(instr, Binary):
+            lhs = state.get(instr.lhs.index)
+            rhs = state.get(instr.rhs.index)
+            if lhs is not None and rhs is not None:
+                value = ConstFolder.binary(instr.op, lhs, rhs)
+
+        for dst in instr.dsts:
+            if value is None:
+                state.pop(dst.index, None)
+            else:
+                state[dst.index] = value
+        return value
+
+    # the successors of bb which may be executed after it
+    def takenSuccs(self, graph: CFG, bb: BasicBlock, state: dict[int, int]) -> list[int]:
+        succs = sorted(graph.getSucc(bb.id))
+        if bb.kind is not BlockKind.END_BY_COND_JUMP:
+            return succs
+        instr = bb.getLastInstr()
+        cond = state.get(instr.cond.index)
+        if cond is None:
+            return succs
+        if self.isTaken(instr, cond):
+            return [id for id in succs if graph.getBlock(id).label is instr.target]
+        return [id for id in succs if id == bb.id + 1]
+
+    def isTaken(self, instr: CondBranch, cond: int) -> bool:
+        return (cond == 0) == (instr.op == CondBranchOp.BEQ)
+
+    def rewrite(self, graph: CFG, bb: BasicBlock, state: dict[int, int]) -> None:
+        locs = []
+        for loc in bb.iterator():
+            instr = loc.instr
+            if isinstance(instr, CondBranch) and instr.cond.index in state:
+                stats.add(self.name, "branches folded")
+                if self.isTaken(instr, state[instr.cond.index]):
+                    loc.instr = Branch(instr.target)
+                    bb.kind = BlockKind.END_BY_JUMP
+                else:
+                    bb.kind = BlockKind.CONTINUOUS
+                    continue
+            else:
+                value = self.evaluate(instr, state)
+                if value is not None and isinstance(instr, (Assign, Unary, Binary)):
+                    stats.add(self.name, "instrs folded")
+                    loc.instr = LoadImm4(instr.dst, value)
+            locs.append(loc)
+        bb.locs = locs
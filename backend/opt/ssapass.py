@@ -0,0 +1,30 @@
+from abc import abstractmethod
+
+from backend.dataflow.cfg import CFG
+from backend.dataflow.dominators import DominatorTree
+from backend.dataflow.ssabuilder import SSABuilder
+from backend.dataflow.ssadestructor import SSADestructor
+from backend.opt.tacpass import TACPass
+from utils.tac.tacfunc import TACFunc
+
+"""
+SSAPass: a TACPass which works on the SSA form of a function
+
+transformFunc puts the CFG of the function into SSA form, calls transformSSA,
+and takes the CFG out of SSA form again (writing it back to the function).
+In transformSSA every temp has exactly one def, so a fact about a temp holds wherever the temp is read.
+"""
+
+
+class SSAPass(TACPass):
+    def transformFunc(self, func: TACFunc) -> None:
+        graph = self.buildCFG(func)
+        if not graph.nodes:
+            return
+        domTree = SSABuilder().build(func, graph)
+        self.transformSSA(func, graph, domTree)
+        SSADestructor().destruct(func, graph)
+
+    @abstractmethod
+    def transformSSA(self, func: TACFunc, graph: CFG, domTree: DominatorTree) -> None:
+        raise NotImplementedError
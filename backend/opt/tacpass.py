@@ -0,0 +1,45 @@
+from abc import ABC, abstractmethod
+
+from backend.dataflow.cfg import CFG
+from backend.dataflow.cfgbuilder import CFGBuilder
+from utils.tac.tacfunc import TACFunc
+from utils.tac.tacinstr import Mark, TACInstr
+from utils.tac.tacprog import TACProg
+
+"""
+TACPass: a abstract class for the optimizations on the three-address code
+
+A pass transforms every function of a TACProg in place.
+Most passes work on the CFG of a function: buildCFG groups the TAC instrs of a function into basic blocks
+(in the same order), and flatten writes the blocks back to the function.
+"""
+
+
+class TACPass(ABC):
+    # the name of the pass (used by --time-passes)
+    name = "pass"
+
+    def transform(self, prog: TACProg) -> TACProg:
+        for func in prog.funcs:
+            self.transformFunc(func)
+        return prog
+
+    @abstractmethod
+    def transformFunc(self, func: TACFunc) -> None:
+        raise NotImplementedError
+
+    def buildCFG(self, func: TACFunc) -> CFG:
+        return CFGBuilder().buildFrom(func.getInstrSeq())
+
+    # write the blocks back to func in their order, dropping the blocks which are not kept
+    # (the order is kept, so a block still falls through to the next block)
+    def flatten(self, func: TACFunc, graph: CFG, keep: list[bool]) -> None:
+        seq: list[TACInstr] = [Mark(func.entry)]
+        for bb in graph.iterator():
+            if not keep[bb.id]:
+                continue
+            if bb.label is not None:
+                seq.append(Mark(bb.label))
+            for loc in bb.iterator():
+                seq.append(loc.instr)
+        func.instrSeq = seq
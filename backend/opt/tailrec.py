@@ -0,0 +1,65 @@
+from typing import Optional
+
+from backend.opt.tacpass import TACPass
+from utils.stats import stats
+from utils.tac.tacfunc import TACFunc
+from utils.tac.tacinstr import *
+
+"""
+TailRecursion: turn the calls of a function to itself in tail position into jumps
+
+A call is in tail position if the function returns its value right after it:
+    d = call f(args)           d = call f(args)          call f(args)
+    return d                   x = d                     return
+                               return x
+(only copies of the value and Memo may come between, and no label, since the return would be reached from elsewhere).
+A tail call of f to itself assigns the args to the params (through new temps, since an arg may be a param)
+and jumps to a new label right after the entry, so the recursion becomes a loop running in one frame.
+
+The pass runs before Inliner: the function is then no longer recursive, and it may be inlined into its callers.
+The calls to other functions in tail position are left as they are, since the RISC-V backend does not emit calls yet.
+"""
+
+
+class TailRecursion(TACPass):
+    name = "tailrec"
+
+    def transformFunc(self, func: TACFunc) -> None:
+        seq = func.instrSeq
+        start = None
+        out: list[TACInstr] = []
+        i = 0
+        while i < len(seq):
+            instr = seq[i]
+            end = self.tailEnd(seq, i) if isinstance(instr, Call) and instr.func.func == func.entry.func else None
+            if end is None:
+                out.append(instr)
+                i += 1
+                continue
+            if start is None:
+                start = func.freshLabel()
+            stats.add(self.name, "tail calls replaced by jumps")
+            temps = [func.freshTemp() for _ in instr.args[: func.numArgs]]
+            out += [Assign(temp, arg) for temp, arg in zip(temps, instr.args)]
+            out += [Assign(Temp(index), temp) for index, temp in enumerate(temps)]
+            out.append(Branch(start))
+            i = end + 1
+        if start is not None:
+            func.instrSeq = out[:1] + [Mark(start)] + out[1:]
+
+    # the index of the return after the call at seq[i] if the call is in tail position
+    def tailEnd(self, seq: list[TACInstr], i: int) -> Optional[int]:
+        holder = seq[i].dst
+        for j in range(i + 1, len(seq)):
+            instr = seq[j]
+            if isinstance(instr, Memo):
+                continue
+            if isinstance(instr, Assign) and holder is not None and instr.src.index == holder.index:
+                holder = instr.dst
+                continue
+            if isinstance(instr, Return) and (
+                instr.value is None or (holder is not None and instr.value.index == holder.index)
+            ):
+                return j
+            return None
+        return None
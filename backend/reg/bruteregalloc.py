@@ -1,4 +1,5 @@
-import random
+from bisect import bisect_left
+from typing import Optional, TextIO
 
 from backend.dataflow.basicblock import BasicBlock, BlockKind
 from backend.dataflow.cfg import CFG
@@ -24,26 +25,94 @@ because we can remove all the GlobalTemp in selectInstr process
 3. unbind：将一个 Temp 与相应寄存器解绑定
 4. localAlloc：根据数据流对一个 BasicBlock 内的指令进行寄存器分配
 5. allocForLoc：每一条指令进行寄存器分配
-6. allocRegFor：根据数据流决定为当前 Temp 分配哪一个寄存器
+6. allocRegFor：根据数据流决定为当前 Temp 分配哪一个寄存器，
+   没有空闲寄存器时，换出下一次使用最远的 Temp（Belady）
+7. coalesceMove：mv 的源操作数在此之后不再活跃时，目的操作数直接接管它的寄存器，省去这条 mv
+8. assignHomes：（全局模式）为跨基本块活跃的 Temp 分配在整个函数中固定的寄存器
+
+In the global mode (globalAlloc), the temps which are live across blocks get a home register
+for the whole function (two temps live at the same time never share one), so they are never
+stored to or loaded from the stack at the block boundaries. At least LOCAL_REGS registers
+are left for the temps which live inside one block and for the temps without a home.
+
+homes: map from temp.index to its home Reg
+ uses: map from temp.index to the positions (in the current block) of the locs reading it
+   pos: the position of the current loc in the current block
 """
 
 class BruteRegAlloc(RegAlloc):
-    def __init__(self, emitter: RiscvAsmEmitter) -> None:
-        super().__init__(emitter)
+    LOCAL_REGS = 6
+
+    def __init__(
+        self,
+        emitter: RiscvAsmEmitter,
+        globalAlloc: bool = False,
+        spillLog: Optional[TextIO] = None,
+    ) -> None:
+        super().__init__(emitter, spillLog)
         self.bindings = {}
         for reg in emitter.allocatableRegs:
             reg.used = False
+        self.globalAlloc = globalAlloc
+        self.homes: dict[int, Reg] = {}
+        self.localRegs: list[Reg] = emitter.allocatableRegs
+        self.uses: dict[int, list[int]] = {}
+        self.pos = 0
 
     def accept(self, graph: CFG, info: SubroutineInfo) -> None:
+        self.info = info
         subEmitter = self.emitter.emitSubroutine(info)
+        if self.globalAlloc:
+            self.assignHomes(graph)
         for bb in graph.iterator():
-            # you need to think more here
-            # maybe we don't need to alloc regs for all the basic blocks
+            # the blocks which can not be reached are not emitted at all
+            if not graph.isReachable(bb.id):
+                continue
             if bb.label is not None:
                 subEmitter.emitLabel(bb.label)
             self.localAlloc(bb, subEmitter)
         subEmitter.emitEnd()
 
+    def assignHomes(self, graph: CFG) -> None:
+        crossing: dict[int, int] = {}
+        for bb in graph.iterator():
+            for index in bb.liveIn:
+                if index >= 0:
+                    crossing[index] = 0
+        if not crossing:
+            self.homes = {}
+            self.localRegs = self.emitter.allocatableRegs
+            return
+
+        neighbors: dict[int, set[int]] = {index: set() for index in crossing}
+        entryLive = [index for index in graph.getBlock(0).liveIn if index in crossing]
+        for index in entryLive:
+            neighbors[index].update(entryLive)
+        for bb in graph.iterator():
+            for loc in bb.iterator():
+                for temp in loc.instr.srcs + loc.instr.dsts:
+                    if temp.index in crossing:
+                        crossing[temp.index] += 1
+                for dst in loc.instr.dsts:
+                    if dst.index in crossing:
+                        for index in loc.liveOut:
+                            if index in crossing:
+                                neighbors[dst.index].add(index)
+                                neighbors[index].add(dst.index)
+
+        # the most used temps pick their registers first
+        candidates = self.emitter.allocatableRegs[: len(self.emitter.allocatableRegs) - self.LOCAL_REGS]
+        self.homes = {}
+        for index in sorted(crossing, key=lambda index: (-crossing[index], index)):
+            taken = {self.homes[other] for other in neighbors[index] if other != index and other in self.homes}
+            for reg in candidates:
+                if reg not in taken:
+                    self.homes[index] = reg
+                    reg.used = True
+                    break
+        homeRegs = set(self.homes.values())
+        self.localRegs = [reg for reg in self.emitter.allocatableRegs if reg not in homeRegs]
+
     def bind(self, temp: Temp, reg: Reg):
         reg.used = True
         self.bindings[temp.index] = reg
@@ -57,24 +126,33 @@ class BruteRegAlloc(RegAlloc):
 
     def localAlloc(self, bb: BasicBlock, subEmitter: SubroutineEmitter):
         self.bindings.clear()
-        for reg in self.emitter.allocatableRegs:
+        for reg in self.localRegs:
             reg.occupied = False
 
+        self.uses = {}
+        for pos, loc in enumerate(bb.locs):
+            for index in loc.instr.getRead():
+                self.uses.setdefault(index, []).append(pos)
+
         # in step9, you may need to think about how to store callersave regs here
-        for loc in bb.allSeq():
+        for pos, loc in enumerate(bb.allSeq()):
             subEmitter.emitComment(str(loc.instr))
+            self.pos = pos
 
             self.allocForLoc(loc, subEmitter)
 
         for tempindex in bb.liveOut:
-            if tempindex in self.bindings:
+            if tempindex in self.bindings and tempindex not in self.homes:
                 subEmitter.emitStoreToStack(self.bindings.get(tempindex))
 
         if (not bb.isEmpty()) and (bb.kind is not BlockKind.CONTINUOUS):
+            self.pos = len(bb.locs) - 1
             self.allocForLoc(bb.locs[len(bb.locs) - 1], subEmitter)
 
     def allocForLoc(self, loc: Loc, subEmitter: SubroutineEmitter):
         instr = loc.instr
+        if isinstance(instr, Riscv.Move) and self.coalesceMove(loc):
+            return
         srcRegs: list[Reg] = []
         dstRegs: list[Reg] = []
 
@@ -92,15 +170,34 @@ class BruteRegAlloc(RegAlloc):
             else:
                 dstRegs.append(self.allocRegFor(temp, False, loc.liveIn, subEmitter))
 
+        if isinstance(instr, Riscv.Move) and dstRegs[0] is srcRegs[0]:
+            return
         subEmitter.emitNative(instr.toNative(dstRegs, srcRegs))
 
+    # if the src of a move dies at the move and is in a register, the dst just takes over the register
+    # and the move disappears
+    def coalesceMove(self, loc: Loc) -> bool:
+        dst = loc.instr.dsts[0]
+        src = loc.instr.srcs[0]
+        if isinstance(dst, Reg) or isinstance(src, Reg) or dst.index in self.homes:
+            return False
+        if src.index not in self.bindings or src.index in loc.liveOut:
+            return False
+        reg = self.bindings[src.index]
+        self.unbind(src)
+        self.unbind(dst)
+        self.bind(dst, reg)
+        return True
+
     def allocRegFor(
         self, temp: Temp, isRead: bool, live: set[int], subEmitter: SubroutineEmitter
     ):
+        if temp.index in self.homes:
+            return self.homes[temp.index]
         if temp.index in self.bindings:
             return self.bindings[temp.index]
 
-        for reg in self.emitter.allocatableRegs:
+        for reg in self.localRegs:
             if (not reg.occupied) or (not reg.temp.index in live):
                 subEmitter.emitComment(
                     "  allocate {} to {}  (read: {}):".format(
@@ -114,11 +211,15 @@ class BruteRegAlloc(RegAlloc):
                 self.bind(temp, reg)
                 return reg
 
-        reg = self.emitter.allocatableRegs[
-            random.randint(0, len(self.emitter.allocatableRegs) - 1)
-        ]
+        reg = max(self.localRegs, key=self.nextUse)
         subEmitter.emitStoreToStack(reg)
         subEmitter.emitComment("  spill {} ({})".format(str(reg), str(reg.temp)))
+        self.logSpill(
+            self.info,
+            "spill {} ({}) for {}, next use {}".format(
+                str(reg), str(reg.temp), str(temp), self.describeNextUse(reg)
+            ),
+        )
         self.unbind(reg.temp)
         self.bind(temp, reg)
         subEmitter.emitComment(
@@ -127,3 +228,15 @@ class BruteRegAlloc(RegAlloc):
         if isRead:
             subEmitter.emitLoadFromStack(reg, temp)
         return reg
+
+    # the position of the next read of the temp in reg (from the current loc on),
+    # the temps which are not read again in the block come last
+    def nextUse(self, reg: Reg) -> float:
+        uses = self.uses.get(reg.temp.index, [])
+        i = bisect_left(uses, self.pos)
+        return uses[i] - self.pos if i < len(uses) else float("inf")
+
+    def describeNextUse(self, reg: Reg) -> str:
+        uses = self.uses.get(reg.temp.index, [])
+        i = bisect_left(uses, self.pos)
+        return "in {} locs".format(uses[i] - self.pos) if i < len(uses) else "not in this block"
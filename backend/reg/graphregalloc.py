@@ -0,0 +1,325 @@
+from itertools import chain
+from typing import Optional, TextIO
+
+from backend.dataflow.cfg import CFG
+from backend.dataflow.livenessanalyzer import LivenessAnalyzer
+from backend.dataflow.loc import Loc
+from backend.reg.regalloc import RegAlloc
+from backend.reg.spillrewriter import SpillRewriter
+from backend.riscv.riscvasmemitter import RiscvAsmEmitter
+from backend.subroutineinfo import SubroutineInfo
+from utils.riscv import Riscv
+from utils.tac.reg import Reg
+from utils.tac.tacinstr import TACInstr
+from utils.tac.temp import Temp
+
+"""
+GraphRegAlloc: one kind of RegAlloc, iterated register coalescing (George & Appel)
+
+Unlike BruteRegAlloc, a temp keeps its register across basic blocks,
+and only the temps which can not be colored are kept in the stack.
+
+1. build：根据活跃变量分析的结果构造冲突图，并收集 mv 指令
+2. simplify / coalesce / freeze / selectSpill：迭代地简化冲突图，保守地合并 mv 的两端
+3. assignColors：按出栈顺序为每个 Temp 选择寄存器，无法着色的 Temp 被溢出
+4. 若有 Temp 被溢出，用 SpillRewriter 改写代码，重新分析活跃变量后再次分配
+5. 用 SpillRewriter 按照着色结果生成汇编代码
+
+The nodes of the interference graph are temp indexes, the allocatable Regs are precolored nodes.
+The worklists are dicts (used as ordered sets) so that the result is deterministic.
+"""
+
+
+class GraphRegAlloc(RegAlloc):
+    def __init__(self, emitter: RiscvAsmEmitter, spillLog: Optional[TextIO] = None) -> None:
+        super().__init__(emitter, spillLog)
+        for reg in emitter.allocatableRegs:
+            reg.used = False
+
+        # the caller saved regs come first, so the callee saved ones (which must be saved in the prologue) are used last
+        self.colors: list[Reg] = list(emitter.allocatableRegs)
+        self.K = len(self.colors)
+        self.precolored: dict[int, Reg] = {reg.index: reg for reg in self.colors}
+
+    def accept(self, graph: CFG, info: SubroutineInfo) -> None:
+        subEmitter = self.emitter.emitSubroutine(info)
+
+        rewriter = SpillRewriter(graph)
+        self.spillTemps = rewriter.spillTemps
+
+        analyzer = LivenessAnalyzer()
+        while True:
+            self.build(graph)
+            self.makeWorklist()
+            while self.simplifyWorklist or self.worklistMoves or self.freezeWorklist or self.spillWorklist:
+                if self.simplifyWorklist:
+                    self.simplify()
+                elif self.worklistMoves:
+                    self.coalesce()
+                elif self.freezeWorklist:
+                    self.freeze()
+                else:
+                    self.selectSpill()
+            self.assignColors()
+
+            if not self.spilledNodes:
+                break
+            self.logSpill(
+                info, "spill " + ", ".join(str(rewriter.temps[index]) for index in sorted(self.spilledNodes))
+            )
+            rewriter.rewrite(graph, set(self.spilledNodes))
+            analyzer.accept(graph)
+
+        rewriter.emit(graph, subEmitter, {index: self.color[index] for index in self.color if index >= 0})
+        subEmitter.emitEnd()
+
+    def isMove(self, instr: TACInstr) -> bool:
+        return isinstance(instr, Riscv.Move) and all(
+            self.isNode(temp) for temp in instr.dsts + instr.srcs
+        )
+
+    # Regs which are not allocatable (sp, ...) are not in the interference graph
+    def isNode(self, temp: Temp) -> bool:
+        return not isinstance(temp, Reg) or temp.index in self.precolored
+
+    def build(self, graph: CFG) -> None:
+        self.adjSet: set[tuple[int, int]] = set()
+        self.adjList: dict[int, set[int]] = {}
+        self.degree: dict[int, int] = {}
+        self.moveList: dict[int, dict[Loc, None]] = {}
+        self.occurrences: dict[int, int] = {}
+
+        self.worklistMoves: dict[Loc, None] = {}
+        self.activeMoves: dict[Loc, None] = {}
+        self.coalescedMoves: dict[Loc, None] = {}
+        self.constrainedMoves: dict[Loc, None] = {}
+        self.frozenMoves: dict[Loc, None] = {}
+
+        self.simplifyWorklist: dict[int, None] = {}
+        self.freezeWorklist: dict[int, None] = {}
+        self.spillWorklist: dict[int, None] = {}
+        self.spilledNodes: dict[int, None] = {}
+        self.coalescedNodes: set[int] = set()
+        self.coloredNodes: set[int] = set()
+        self.selectStack: list[int] = []
+        self.onStack: set[int] = set()
+        self.alias: dict[int, int] = {}
+        self.color: dict[int, Reg] = dict(self.precolored)
+
+        for bb in graph.iterator():
+            for loc in bb.iterator():
+                instr = loc.instr
+                for temp in instr.dsts + instr.srcs:
+                    if self.isNode(temp):
+                        self.addNode(temp.index)
+                        self.occurrences[temp.index] = self.occurrences.get(temp.index, 0) + 1
+
+                live = [index for index in loc.liveOut if index >= 0 or index in self.precolored]
+                if self.isMove(instr):
+                    src = instr.srcs[0].index
+                    live = [index for index in live if index != src]
+                    for temp in instr.dsts + instr.srcs:
+                        self.moveList[temp.index][loc] = None
+                    self.worklistMoves[loc] = None
+
+                for dst in instr.dsts:
+                    if self.isNode(dst):
+                        for index in live:
+                            self.addNode(index)
+                            self.addEdge(index, dst.index)
+
+    def addNode(self, index: int) -> None:
+        if index not in self.adjList:
+            self.adjList[index] = set()
+            self.degree[index] = 0
+            self.moveList[index] = {}
+
+    def addEdge(self, u: int, v: int) -> None:
+        if u != v and (u, v) not in self.adjSet:
+            self.adjSet.add((u, v))
+            self.adjSet.add((v, u))
+            if u not in self.precolored:
+                self.adjList[u].add(v)
+                self.degree[u] += 1
+            if v not in self.precolored:
+                self.adjList[v].add(u)
+                self.degree[v] += 1
+
+    def makeWorklist(self) -> None:
+        for index in self.adjList:
+            if index in self.precolored:
+                continue
+            if self.degree[index] >= self.K:
+                self.spillWorklist[index] = None
+            elif self.moveRelated(index):
+                self.freezeWorklist[index] = None
+            else:
+                self.simplifyWorklist[index] = None
+
+    def adjacent(self, index: int) -> list[int]:
+        return [
+            m for m in self.adjList[index] if m not in self.onStack and m not in self.coalescedNodes
+        ]
+
+    def nodeMoves(self, index: int) -> list[Loc]:
+        return [
+            move for move in self.moveList[index] if move in self.activeMoves or move in self.worklistMoves
+        ]
+
+    def moveRelated(self, index: int) -> bool:
+        return len(self.nodeMoves(index)) > 0
+
+    def simplify(self) -> None:
+        index = next(iter(self.simplifyWorklist))
+        del self.simplifyWorklist[index]
+        self.selectStack.append(index)
+        self.onStack.add(index)
+        for m in self.adjacent(index):
+            self.decrementDegree(m)
+
+    def decrementDegree(self, index: int) -> None:
+        if index in self.precolored:
+            return
+        d = self.degree[index]
+        self.degree[index] = d - 1
+        if d == self.K:
+            self.enableMoves([index] + self.adjacent(index))
+            self.spillWorklist.pop(index, None)
+            if self.moveRelated(index):
+                self.freezeWorklist[index] = None
+            else:
+                self.simplifyWorklist[index] = None
+
+    def enableMoves(self, nodes: list[int]) -> None:
+        for index in nodes:
+            for move in self.nodeMoves(index):
+                if move in self.activeMoves:
+                    del self.activeMoves[move]
+                    self.worklistMoves[move] = None
+
+    def coalesce(self) -> None:
+        move = next(iter(self.worklistMoves))
+        del self.worklistMoves[move]
+        x = self.getAlias(move.instr.dsts[0].index)
+        y = self.getAlias(move.instr.srcs[0].index)
+        u, v = (y, x) if y in self.precolored else (x, y)
+
+        if u == v:
+            self.coalescedMoves[move] = None
+            self.addWorklist(u)
+        elif v in self.precolored or (u, v) in self.adjSet:
+            self.constrainedMoves[move] = None
+            self.addWorklist(u)
+            self.addWorklist(v)
+        elif (u in self.precolored and self.george(u, v)) or (
+            u not in self.precolored and self.conservative(u, v)
+        ):
+            self.coalescedMoves[move] = None
+            self.combine(u, v)
+            self.addWorklist(u)
+        else:
+            self.activeMoves[move] = None
+
+    def addWorklist(self, index: int) -> None:
+        if index not in self.precolored and not self.moveRelated(index) and self.degree[index] < self.K:
+            self.freezeWorklist.pop(index, None)
+            self.simplifyWorklist[index] = None
+
+    # George's test for coalescing with a precolored node u: every neighbor of v is insignificant or already a neighbor of u
+    def george(self, u: int, v: int) -> bool:
+        for t in self.adjList[v]:
+            if t in self.onStack or t in self.coalescedNodes:
+                continue
+            if not (self.degree[t] < self.K or t in self.precolored or (t, u) in self.adjSet):
+                return False
+        return True
+
+    # Briggs's test: u and v can be combined if the result has fewer than K neighbors of significant degree
+    def conservative(self, u: int, v: int) -> bool:
+        k = 0
+        seen = set()
+        for index in chain(self.adjList[u], self.adjList[v]):
+            if index in seen or index in self.onStack or index in self.coalescedNodes:
+                continue
+            seen.add(index)
+            if index in self.precolored or self.degree[index] >= self.K:
+                k += 1
+                if k >= self.K:
+                    return False
+        return True
+
+    def getAlias(self, index: int) -> int:
+        while index in self.coalescedNodes:
+            index = self.alias[index]
+        return index
+
+    def combine(self, u: int, v: int) -> None:
+        if v in self.freezeWorklist:
+            del self.freezeWorklist[v]
+        else:
+            self.spillWorklist.pop(v, None)
+        self.coalescedNodes.add(v)
+        self.alias[v] = u
+        self.moveList[u].update(self.moveList[v])
+        self.enableMoves([v])
+        for t in self.adjacent(v):
+            self.addEdge(t, u)
+            self.decrementDegree(t)
+        if u not in self.precolored and self.degree[u] >= self.K and u in self.freezeWorklist:
+            del self.freezeWorklist[u]
+            self.spillWorklist[u] = None
+
+    def freeze(self) -> None:
+        index = next(iter(self.freezeWorklist))
+        del self.freezeWorklist[index]
+        self.simplifyWorklist[index] = None
+        self.freezeMoves(index)
+
+    def freezeMoves(self, u: int) -> None:
+        for move in self.nodeMoves(u):
+            x = move.instr.dsts[0].index
+            y = move.instr.srcs[0].index
+            if self.getAlias(y) == self.getAlias(u):
+                v = self.getAlias(x)
+            else:
+                v = self.getAlias(y)
+            self.activeMoves.pop(move, None)
+            self.worklistMoves.pop(move, None)
+            self.frozenMoves[move] = None
+            if v in self.freezeWorklist and not self.moveRelated(v) and self.degree[v] < self.K:
+                del self.freezeWorklist[v]
+                self.simplifyWorklist[v] = None
+
+    # spill the node with the fewest occurrences per interference
+    def selectSpill(self) -> None:
+        def cost(index: int) -> float:
+            if index in self.spillTemps:
+                return float("inf")
+            return self.occurrences.get(index, 0) / max(self.degree[index], 1)
+
+        index = min(self.spillWorklist, key=cost)
+        del self.spillWorklist[index]
+        self.simplifyWorklist[index] = None
+        self.freezeMoves(index)
+
+    def assignColors(self) -> None:
+        while self.selectStack:
+            index = self.selectStack.pop()
+            self.onStack.discard(index)
+            forbidden = set()
+            for w in self.adjList[index]:
+                w = self.getAlias(w)
+                if w in self.color:
+                    forbidden.add(self.color[w].index)
+            for reg in self.colors:
+                if reg.index not in forbidden:
+                    self.color[index] = reg
+                    self.coloredNodes.add(index)
+                    break
+            else:
+                self.spilledNodes[index] = None
+
+        for index in self.coalescedNodes:
+            alias = self.getAlias(index)
+            if alias in self.color:
+                self.color[index] = self.color[alias]
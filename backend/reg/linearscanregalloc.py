@@ -0,0 +1,166 @@
+from bisect import insort
+from typing import Optional, TextIO
+
+from backend.dataflow.cfg import CFG
+from backend.dataflow.livenessanalyzer import LivenessAnalyzer
+from backend.reg.regalloc import RegAlloc
+from backend.reg.spillrewriter import SpillRewriter
+from backend.riscv.riscvasmemitter import RiscvAsmEmitter
+from backend.subroutineinfo import SubroutineInfo
+from utils.riscv import Riscv
+from utils.tac.reg import Reg
+
+"""
+LinearScanRegAlloc: one kind of RegAlloc, linear scan (Poletto & Sarkar)
+
+The blocks are laid out in the order of the CFG and every loc gets two positions:
+2 * i where it reads its srcs and 2 * i + 1 where it writes its dsts,
+so a temp whose last use is a loc can give its register to the dst of the same loc.
+
+1. buildIntervals：每个 Temp 的活跃区间为其所有出现位置的最小/最大值，
+   并扩展到它活跃进入/离开的基本块的边界；预着色寄存器（如 a0）的占用区间单独记录
+2. scan：按区间起点依次分配寄存器，空闲寄存器不足时溢出结束最晚的区间
+3. 若有 Temp 被溢出，用 SpillRewriter 改写代码，重新分析活跃变量后再次分配
+
+An interval is [start, end, temp.index], the active intervals are kept sorted by end.
+"""
+
+
+class LinearScanRegAlloc(RegAlloc):
+    def __init__(self, emitter: RiscvAsmEmitter, spillLog: Optional[TextIO] = None) -> None:
+        super().__init__(emitter, spillLog)
+        for reg in emitter.allocatableRegs:
+            reg.used = False
+
+        # the caller saved regs come first, so the callee saved ones (which must be saved in the prologue) are used last
+        self.colors: list[Reg] = list(emitter.allocatableRegs)
+        self.precolored: dict[int, Reg] = {reg.index: reg for reg in self.colors}
+
+    def accept(self, graph: CFG, info: SubroutineInfo) -> None:
+        subEmitter = self.emitter.emitSubroutine(info)
+
+        rewriter = SpillRewriter(graph)
+        analyzer = LivenessAnalyzer()
+        while True:
+            intervals, fixed, hints = self.buildIntervals(graph)
+            regs, spilled = self.scan(intervals, fixed, hints, rewriter.spillTemps)
+            if not spilled:
+                break
+            self.logSpill(
+                info, "spill " + ", ".join(str(rewriter.temps[index]) for index in sorted(spilled))
+            )
+            rewriter.rewrite(graph, spilled)
+            analyzer.accept(graph)
+
+        rewriter.emit(graph, subEmitter, regs)
+        subEmitter.emitEnd()
+
+    def buildIntervals(
+        self, graph: CFG
+    ) -> tuple[list[list[int]], dict[int, list[tuple[int, int]]], dict[int, int]]:
+        ranges: dict[int, list[int]] = {}
+        # for every precolored reg, the positions where it is written and read
+        fixed: dict[int, list[tuple[int, int]]] = {}
+        # for the two ends of a move, the other end (the same register makes the move free)
+        hints: dict[int, int] = {}
+
+        def extend(index: int, pos: int) -> None:
+            r = ranges.get(index)
+            if r is None:
+                ranges[index] = [pos, pos, index]
+            elif pos < r[0]:
+                r[0] = pos
+            elif pos > r[1]:
+                r[1] = pos
+
+        pos = 0
+        for bb in graph.iterator():
+            blockStart = pos
+            blockEnd = pos + 2 * len(bb.locs) - 1
+            for index in bb.liveIn:
+                if index >= 0:
+                    extend(index, blockStart)
+            for index in bb.liveOut:
+                if index >= 0:
+                    extend(index, blockEnd)
+
+            # a precolored reg is occupied from a write to the following reads of it
+            written: dict[int, int] = {}
+            for loc in bb.iterator():
+                instr = loc.instr
+                for temp in instr.srcs:
+                    if isinstance(temp, Reg):
+                        if temp.index in self.precolored:
+                            fixed.setdefault(temp.index, []).append((written.get(temp.index, pos), pos))
+                    else:
+                        extend(temp.index, pos)
+                for temp in instr.dsts:
+                    if isinstance(temp, Reg):
+                        if temp.index in self.precolored:
+                            fixed.setdefault(temp.index, []).append((pos + 1, pos + 1))
+                            written[temp.index] = pos + 1
+                    else:
+                        extend(temp.index, pos + 1)
+                if isinstance(instr, Riscv.Move):
+                    dst, src = instr.dsts[0].index, instr.srcs[0].index
+                    hints.setdefault(dst, src)
+                    hints.setdefault(src, dst)
+                pos += 2
+
+        intervals = sorted(ranges.values())
+        return intervals, fixed, hints
+
+    def scan(
+        self,
+        intervals: list[list[int]],
+        fixed: dict[int, list[tuple[int, int]]],
+        hints: dict[int, int],
+        spillTemps: set[int],
+    ) -> tuple[dict[int, Reg], set[int]]:
+        regs: dict[int, Reg] = {}
+        spilled: set[int] = set()
+        free: list[Reg] = list(self.colors)
+        # (end, start, temp.index), sorted by end
+        active: list[tuple[int, int, int]] = []
+
+        def conflictsWithFixed(reg: Reg, start: int, end: int) -> bool:
+            for fixedStart, fixedEnd in fixed.get(reg.index, ()):
+                if fixedStart <= end and start <= fixedEnd:
+                    return True
+            return False
+
+        for start, end, index in intervals:
+            # expire the intervals which end before this one starts
+            while active and active[0][0] < start:
+                _, _, expired = active.pop(0)
+                free.append(regs[expired])
+
+            candidates = [reg for reg in free if not conflictsWithFixed(reg, start, end)]
+            if candidates:
+                hint = hints.get(index)
+                hintReg = self.precolored.get(hint) if hint is not None and hint < 0 else regs.get(hint)
+                reg = hintReg if hintReg in candidates else min(candidates, key=self.colors.index)
+                free.remove(reg)
+                regs[index] = reg
+                insort(active, (end, start, index))
+                continue
+
+            # no free register: spill the interval which ends last (never the short ones made by spilling)
+            victims = [
+                item
+                for item in active
+                if item[2] not in spillTemps and not conflictsWithFixed(regs[item[2]], start, end)
+            ]
+            victim = max(victims, default=None)
+            # a spill temp must take a register, or accept would spill it again and again: the callee saved regs
+            # are never precolored and only a few spill temps are live at once, so one of them is free or active
+            assert victim is not None or index not in spillTemps, "no register for the spill temp _T%d" % index
+            if victim is not None and (victim[0] > end or index in spillTemps):
+                active.remove(victim)
+                regs[index] = regs.pop(victim[2])
+                spilled.add(victim[2])
+                insort(active, (end, start, index))
+            else:
+                spilled.add(index)
+
+        return regs, spilled
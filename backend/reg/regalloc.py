@@ -1,4 +1,5 @@
 from abc import ABC, abstractmethod
+from typing import Optional, TextIO
 
 from backend.dataflow.cfg import CFG
 from backend.riscv.riscvasmemitter import RiscvAsmEmitter
@@ -6,12 +7,19 @@ from backend.subroutineinfo import SubroutineInfo
 
 """
 RegAlloc: a abstract class for reg alloc
+
+spillLog: if given, the spill decisions are written to it (see logSpill)
 """
 
 
 class RegAlloc(ABC):
-    def __init__(self, emitter: RiscvAsmEmitter) -> None:
+    def __init__(self, emitter: RiscvAsmEmitter, spillLog: Optional[TextIO] = None) -> None:
         self.emitter = emitter
+        self.spillLog = spillLog
+
+    def logSpill(self, info: SubroutineInfo, message: str) -> None:
+        if self.spillLog is not None:
+            print("{}: {}".format(info.funcLabel.name, message), file=self.spillLog)
 
     @abstractmethod
     def accept(self, graph: CFG, info: SubroutineInfo) -> None:
@@ -0,0 +1,113 @@
+from backend.dataflow.cfg import CFG
+from backend.dataflow.loc import Loc
+from backend.subroutineemitter import SubroutineEmitter
+from utils.riscv import Riscv
+from utils.tac.reg import Reg
+from utils.tac.tacinstr import TACInstr
+from utils.tac.tacop import InstrKind
+from utils.tac.temp import Temp
+
+"""
+SpillRewriter: spill code for the RegAllocs which assign one register to a temp for the whole function
+
+1. rewrite：为溢出的 Temp 插入 SpillLoad / SpillStore，每次使用/定值都换成一个新的短生命周期 Temp
+2. emit：按照分配结果生成汇编代码，SpillLoad / SpillStore 变为栈上的读写
+
+    temps: map from temp.index to Temp for all the temps (but not Regs) in the function
+spillTemps: the temps introduced by rewrite, they live very shortly and should never be spilled again
+"""
+
+
+# Load the spilled temp slot into dst, inserted before a use of slot
+class SpillLoad(TACInstr):
+    def __init__(self, dst: Temp, slot: Temp) -> None:
+        super().__init__(InstrKind.SEQ, [dst], [], None)
+        self.slot = slot
+
+    def __str__(self) -> str:
+        return "%s = spill %s" % (self.dsts[0], self.slot)
+
+
+# Store src to the slot of the spilled temp slot, inserted after a def of slot
+class SpillStore(TACInstr):
+    def __init__(self, src: Temp, slot: Temp) -> None:
+        super().__init__(InstrKind.SEQ, [], [src], None)
+        self.slot = slot
+
+    def __str__(self) -> str:
+        return "spill %s = %s" % (self.slot, self.srcs[0])
+
+
+class SpillRewriter:
+    def __init__(self, graph: CFG) -> None:
+        self.temps: dict[int, Temp] = {}
+        for bb in graph.iterator():
+            for loc in bb.iterator():
+                for temp in loc.instr.dsts + loc.instr.srcs:
+                    if not isinstance(temp, Reg):
+                        self.temps[temp.index] = temp
+        self.nextIndex = max([index + 1 for index in self.temps] + [0])
+        self.spillTemps: set[int] = set()
+
+    def freshTemp(self) -> Temp:
+        temp = Temp(self.nextIndex)
+        self.temps[temp.index] = temp
+        self.spillTemps.add(temp.index)
+        self.nextIndex += 1
+        return temp
+
+    # keep the spilled temps in the stack: every use is loaded into a fresh temp right before it,
+    # and every def goes to a fresh temp which is stored right after it
+    def rewrite(self, graph: CFG, spilled: set[int]) -> None:
+        for bb in graph.iterator():
+            locs: list[Loc] = []
+            for loc in bb.iterator():
+                instr = loc.instr
+                fresh: dict[int, Temp] = {}
+
+                for i, temp in enumerate(instr.srcs):
+                    if temp.index in spilled:
+                        if temp.index not in fresh:
+                            fresh[temp.index] = self.freshTemp()
+                            locs.append(Loc(SpillLoad(fresh[temp.index], self.temps[temp.index])))
+                        instr.srcs[i] = fresh[temp.index]
+                stores = []
+                for i, temp in enumerate(instr.dsts):
+                    if temp.index in spilled:
+                        if temp.index not in fresh:
+                            fresh[temp.index] = self.freshTemp()
+                        instr.dsts[i] = fresh[temp.index]
+                        stores.append(Loc(SpillStore(fresh[temp.index], self.temps[temp.index])))
+
+                locs.append(loc)
+                locs.extend(stores)
+            bb.locs = locs
+
+    def emit(self, graph: CFG, subEmitter: SubroutineEmitter, regs: dict[int, Reg]) -> None:
+        def regOf(temp: Temp) -> Reg:
+            return temp if isinstance(temp, Reg) else regs[temp.index]
+
+        for reg in regs.values():
+            reg.used = True
+
+        for bb in graph.iterator():
+            if not graph.isReachable(bb.id):
+                continue
+            if bb.label is not None:
+                subEmitter.emitLabel(bb.label)
+            for loc in bb.iterator():
+                instr = loc.instr
+                subEmitter.emitComment(str(instr))
+                if isinstance(instr, SpillLoad):
+                    subEmitter.emitLoadFromStack(regOf(instr.dsts[0]), instr.slot)
+                elif isinstance(instr, SpillStore):
+                    reg = regOf(instr.srcs[0])
+                    reg.temp = instr.slot
+                    subEmitter.emitStoreToStack(reg)
+                elif isinstance(instr, Riscv.Move) and regOf(instr.dsts[0]) is regOf(instr.srcs[0]):
+                    # both ends of the move got the same register
+                    continue
+                else:
+                    dstRegs = [regOf(temp) for temp in instr.dsts]
+                    srcRegs = [regOf(temp) for temp in instr.srcs]
+                    subEmitter.emitNative(instr.toNative(dstRegs, srcRegs))
@@ -0,0 +1,50 @@
+from backend.dataflow.basicblock import BasicBlock, BlockKind
+from backend.dataflow.cfg import CFG
+from backend.dataflow.loc import Loc
+from utils.tac.nativeinstr import NativeInstr
+from utils.tac.tacop import InstrKind
+
+"""
+buildNativeCFG: the CFG of the native instrs of a function (RiscvSubroutineEmitter.buf), for ShrinkWrap and StackSlotColoring
+
+A block starts at a label (the labels right after each other start one block) and ends after a jump.
+The labels stay in the locs of the blocks (the blocks have no label), so the instrs can be written back in order.
+The jumps to the epilogue, which is not in buf, have no edge; the last block may fall through to the epilogue.
+The labels are compared by name, since the label of the epilogue is a new Label object every time.
+"""
+
+
+def buildNativeCFG(buf: list[NativeInstr]) -> CFG:
+    blocks: list[list[NativeInstr]] = [[]]
+    for instr in buf:
+        if instr.isLabel() and any(not other.isLabel() for other in blocks[-1]):
+            blocks.append([])
+        blocks[-1].append(instr)
+        if instr.kind in (InstrKind.JMP, InstrKind.COND_JMP, InstrKind.RET):
+            blocks.append([])
+    if not blocks[-1] and len(blocks) > 1:
+        blocks.pop()
+
+    labels: dict[str, int] = {}
+    for id, instrs in enumerate(blocks):
+        for instr in instrs:
+            if instr.isLabel():
+                labels[instr.label.name] = id
+
+    nodes = []
+    edges = []
+    for id, instrs in enumerate(blocks):
+        last = instrs[-1] if instrs else None
+        kind = BlockKind.CONTINUOUS
+        if last is not None and last.kind is InstrKind.JMP:
+            kind = BlockKind.END_BY_JUMP
+        elif last is not None and last.kind is InstrKind.COND_JMP:
+            kind = BlockKind.END_BY_COND_JUMP
+        elif last is not None and last.kind is InstrKind.RET:
+            kind = BlockKind.END_BY_RETURN
+        if kind in (BlockKind.END_BY_JUMP, BlockKind.END_BY_COND_JUMP) and last.label.name in labels:
+            edges.append((id, labels[last.label.name]))
+        if kind in (BlockKind.CONTINUOUS, BlockKind.END_BY_COND_JUMP) and id + 1 < len(blocks):
+            edges.append((id, id + 1))
+        nodes.append(BasicBlock(kind, id, None, [Loc(instr) for instr in instrs]))
+    return CFG(nodes, edges)
@@ -0,0 +1,101 @@
+from typing import Optional
+
+from utils.label.label import Label
+from utils.riscv import Riscv
+from utils.stats import stats
+from utils.tac.nativeinstr import NativeInstr
+
+"""
+Peephole: clean up the native instrs of a function (RiscvSubroutineEmitter.buf) before they are printed
+
+The instrs are moved one by one to the output, and after each one the rules look at the end of the output,
+so an instr which becomes adjacent to another one after a rewrite is looked at again.
+1. store-load：sw r, off(sp) 之后紧跟 lw r', off(sp)，lw 换成 mv r', r（r' 就是 r 时直接删除）
+2. self-move：删除 mv r, r
+3. jump-next：删除跳到紧随其后的标号的 j / 条件跳转（函数末尾的 j 到 epilogue 也会删除）
+4. branch-over-jump：b<cond> L1; j L2; L1: 变为 b<!cond> L2; L1:
+
+Only the instrs next to each other are looked at, so no liveness is needed:
+a label between two instrs stops every rule, since the second instr may be reached from elsewhere.
+"""
+
+
+class Peephole:
+    name = "peephole"
+    RULES = ["store-load", "self-move", "jump-next", "branch-over-jump"]
+
+    def __init__(self, rules: Optional[list[str]] = None) -> None:
+        self.rules = set(self.RULES if rules is None else rules)
+        unknown = self.rules - set(self.RULES)
+        if unknown:
+            raise ValueError("unknown peephole rules: " + ", ".join(sorted(unknown)))
+
+    # the optimized instrs, exit is the label of the epilogue right after them
+    def run(self, buf: list[NativeInstr], exit: Label) -> list[NativeInstr]:
+        out: list[NativeInstr] = []
+        for instr in buf:
+            if instr.isLabel():
+                self.reachLabel(out, instr.label)
+            out.append(instr)
+            self.rewriteTail(out)
+        self.reachLabel(out, exit)
+        return out
+
+    def rewriteTail(self, out: list[NativeInstr]) -> None:
+        instr = out[-1]
+        if "store-load" in self.rules and isinstance(instr, Riscv.NativeLoadWord) and len(out) >= 2:
+            store = out[-2]
+            if (
+                isinstance(store, Riscv.NativeStoreWord)
+                and store.srcs[1] is instr.srcs[0]
+                and store.offset == instr.offset
+            ):
+                stats.add(self.name, "loads right after stores")
+                instr = Riscv.NativeMove(instr.dsts[0], store.srcs[0])
+                out[-1] = instr
+        if "self-move" in self.rules and isinstance(instr, Riscv.NativeMove) and instr.dsts[0] is instr.srcs[0]:
+            stats.add(self.name, "self moves")
+            out.pop()
+
+    # the next instr is the label, which may also be reached by the jumps and branches at the end of out
+    def reachLabel(self, out: list[NativeInstr], label: Label) -> None:
+        # the labels right before this one are the same point of the code
+        labels = []
+        while out and out[-1].isLabel():
+            labels.append(out.pop())
+        while True:
+            if "branch-over-jump" in self.rules and self.branchOverJump(out, label):
+                continue
+            if "jump-next" in self.rules and self.jumpNext(out, label):
+                continue
+            break
+        out.extend(reversed(labels))
+
+    def branchOverJump(self, out: list[NativeInstr], label: Label) -> bool:
+        if len(out) < 2:
+            return False
+        branch, jump = out[-2], out[-1]
+        if not (
+            isinstance(branch, Riscv.NativeBranch)
+            and isinstance(jump, Riscv.NativeJump)
+            and self.sameLabel(branch.label, label)
+        ):
+            return False
+        stats.add(self.name, "branches over jumps inverted")
+        out[-2:] = [branch.inverted(jump.label)]
+        return True
+
+    def jumpNext(self, out: list[NativeInstr], label: Label) -> bool:
+        if not out:
+            return False
+        jump = out[-1]
+        if not (isinstance(jump, (Riscv.NativeJump, Riscv.NativeBranch)) and self.sameLabel(jump.label, label)):
+            return False
+        stats.add(self.name, "jumps to the next instr")
+        out.pop()
+        return True
+
+    # the label of the epilogue is a new Label object every time, so the labels are compared by name
+    @staticmethod
+    def sameLabel(a: Label, b: Label) -> bool:
+        return a is b or a.name == b.name
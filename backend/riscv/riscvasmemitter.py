@@ -1,14 +1,18 @@
-from typing import Sequence, Tuple
+from typing import Optional, Sequence, TextIO, Tuple
 
 from backend.asmemitter import AsmEmitter
-from utils.error import IllegalArgumentException
 from utils.label.label import Label, LabelKind
-from utils.riscv import Riscv, RvBinaryOp, RvUnaryOp
+from utils.riscv import INVERTED_BRANCH, Riscv, RvBinaryImmOp, RvBinaryOp, RvBranchOp, RvUnaryOp
+from utils.stats import stats
 from utils.tac.reg import Reg
 from utils.tac.tacfunc import TACFunc
 from utils.tac.tacinstr import *
 from utils.tac.tacvisitor import TACVisitor
 
+from .peephole import Peephole
+from .shrinkwrap import ShrinkWrap
+from .slotcoloring import StackSlotColoring
+from .strengthreducer import StrengthReducer
 from ..subroutineemitter import SubroutineEmitter
 from ..subroutineinfo import SubroutineInfo
 
@@ -22,8 +26,15 @@ class RiscvAsmEmitter(AsmEmitter):
         self,
         allocatableRegs: list[Reg],
         callerSaveRegs: list[Reg],
+        sink: Optional[TextIO] = None,
+        peephole: Optional[Peephole] = None,
+        shrinkWrap: bool = False,
     ) -> None:
-        super().__init__(allocatableRegs, callerSaveRegs)
+        super().__init__(allocatableRegs, callerSaveRegs, sink)
+        # run on the instrs of each function before they are printed (if given)
+        self.peephole = peephole
+        # move the prologue off the paths which do not need the frame (see ShrinkWrap)
+        self.shrinkWrap = shrinkWrap
 
     
         # the start of the asm code
@@ -37,10 +48,21 @@ class RiscvAsmEmitter(AsmEmitter):
     def selectInstr(self, func: TACFunc) -> tuple[list[str], SubroutineInfo]:
 
         selector: RiscvAsmEmitter.RiscvInstrSelector = (
-            RiscvAsmEmitter.RiscvInstrSelector(func.entry)
+            RiscvAsmEmitter.RiscvInstrSelector(func.entry, func)
         )
+        writeCounts: dict[int, int] = {}
         for instr in func.getInstrSeq():
-            instr.accept(selector)
+            for index in instr.getRead():
+                selector.readCounts[index] = selector.readCounts.get(index, 0) + 1
+            for index in instr.getWritten():
+                writeCounts[index] = writeCounts.get(index, 0) + 1
+        # the temps which are only ever assigned a constant (once) can be used as immediates
+        for instr in func.getInstrSeq():
+            if isinstance(instr, LoadImm4) and isinstance(instr.value, int) and writeCounts[instr.dst.index] == 1:
+                selector.constants[instr.dst.index] = instr.value
+        for instr in func.getInstrSeq():
+            selector.visit(instr)
+        selector.dropUnusedConstants()
 
         info = SubroutineInfo(func.entry)
 
@@ -48,16 +70,53 @@ class RiscvAsmEmitter(AsmEmitter):
 
     # use info to construct a RiscvSubroutineEmitter
     def emitSubroutine(self, info: SubroutineInfo):
+        # the regs used by the last function are not used by this one
+        for reg in self.allocatableRegs:
+            reg.used = False
         return RiscvSubroutineEmitter(self, info)
 
-    # return all the string stored in asmcodeprinter
+    # return all the string stored in asmcodeprinter (None if it has been written to the sink)
     def emitEnd(self):
         return self.printer.close()
 
     class RiscvInstrSelector(TACVisitor):
-        def __init__(self, entry: Label) -> None:
+        def __init__(self, entry: Label, func: Optional[TACFunc] = None) -> None:
             self.entry = entry
             self.seq = []
+            # mul / div / rem by constants need new temps, which come from func
+            self.reducer = StrengthReducer(self.seq, func.freshTemp) if func is not None else None
+            # map from temp.index to how many times it is read in the function
+            self.readCounts: dict[int, int] = {}
+            # map from temp.index to the constant it always holds
+            self.constants: dict[int, int] = {}
+            # the last visited TAC instr, and where its instrs start in seq
+            self.prev: Optional[TACInstr] = None
+            self.prevStart = 0
+
+        def visit(self, instr: TACInstr) -> None:
+            start = len(self.seq)
+            instr.accept(self)
+            self.prev = instr
+            self.prevStart = start
+
+        # the register to read temp from: x0 for a temp which is always 0
+        def operand(self, temp: Temp) -> Temp:
+            return Riscv.ZERO if self.constants.get(temp.index) == 0 else temp
+
+        # the li of a constant whose uses all became immediates (or x0) is not needed
+        def dropUnusedConstants(self) -> None:
+            read = set()
+            for instr in self.seq:
+                read.update(instr.getRead())
+            self.seq = [
+                instr
+                for instr in self.seq
+                if not (
+                    isinstance(instr, Riscv.LoadImm)
+                    and instr.dsts[0].index in self.constants
+                    and instr.dsts[0].index not in read
+                )
+            ]
 
         def visitOther(self, instr: TACInstr) -> None:
             raise NotImplementedError("RiscvInstrSelector visit{} not implemented".format(type(instr).__name__))
@@ -65,11 +124,28 @@ class RiscvAsmEmitter(AsmEmitter):
         # in step11, you need to think about how to deal with globalTemp in almost all the visit functions. 
         def visitReturn(self, instr: Return) -> None:
             if instr.value is not None:
-                self.seq.append(Riscv.Move(Riscv.A0, instr.value))
+                if self.computedJustBefore(instr.value):
+                    # compute the return value directly into a0
+                    self.seq[-1].dsts[0] = Riscv.A0
+                else:
+                    self.seq.append(Riscv.Move(Riscv.A0, self.operand(instr.value)))
             else:
                 self.seq.append(Riscv.LoadImm(Riscv.A0, 0))
             self.seq.append(Riscv.JumpToEpilogue(self.entry))
 
+        # temp is computed by the TAC instr right before and read nowhere else
+        # (and written by the last selected instr, if lastWrites)
+        def computedJustBefore(self, temp: Temp, lastWrites: bool = True) -> bool:
+            return (
+                self.prev is not None
+                and self.prev.getWritten() == [temp.index]
+                and self.readCounts.get(temp.index) == 1
+                and (not lastWrites or (len(self.seq) > 0 and self.seq[-1].getWritten() == [temp.index]))
+            )
+
+        def visitAssign(self, instr: Assign) -> None:
+            self.seq.append(Riscv.Move(instr.dst, self.operand(instr.src)))
+
         def visitMark(self, instr: Mark) -> None:
             self.seq.append(Riscv.RiscvLabel(instr.label))
 
@@ -82,38 +158,39 @@ class RiscvAsmEmitter(AsmEmitter):
                 TacUnaryOp.BITNOT: RvUnaryOp.NOT,
                 TacUnaryOp.LOGICNOT: RvUnaryOp.SEQZ,
             }[instr.op]
-            self.seq.append(Riscv.Unary(op, instr.dst, instr.operand))
+            self.seq.append(Riscv.Unary(op, instr.dst, self.operand(instr.operand)))
 
         def visitBinary(self, instr: Binary) -> None:
             """
             For different tac operation, you should translate it to different RiscV code
             A tac operation may need more than one RiscV instruction
             """
+            if self.selectImmediate(instr) or self.selectReduced(instr):
+                return
+            dst, lhs, rhs = instr.dst, self.operand(instr.lhs), self.operand(instr.rhs)
             if instr.op == TacBinaryOp.LOR: # ||
-                self.seq.append(Riscv.Binary(RvBinaryOp.OR, instr.dst, instr.lhs, instr.rhs))
-                self.seq.append(Riscv.Unary(RvUnaryOp.SNEZ, instr.dst, instr.dst))
+                self.seq.append(Riscv.Binary(RvBinaryOp.OR, dst, lhs, rhs))
+                self.seq.append(Riscv.Unary(RvUnaryOp.SNEZ, dst, dst))
             elif instr.op == TacBinaryOp.LAND: # &&
-                self.seq.append(Riscv.Unary(RvUnaryOp.SNEZ, instr.dst, instr.lhs))
-                self.seq.append(Riscv.Unary(RvUnaryOp.NEG, instr.dst, instr.dst))
-                self.seq.append(Riscv.Binary(RvBinaryOp.AND, instr.dst, instr.dst, instr.rhs))
-                self.seq.append(Riscv.Unary(RvUnaryOp.SNEZ, instr.dst, instr.dst))
+                self.seq.append(Riscv.Unary(RvUnaryOp.SNEZ, dst, lhs))
+                self.seq.append(Riscv.Unary(RvUnaryOp.NEG, dst, dst))
+                self.seq.append(Riscv.Binary(RvBinaryOp.AND, dst, dst, rhs))
+                self.seq.append(Riscv.Unary(RvUnaryOp.SNEZ, dst, dst))
             elif instr.op == TacBinaryOp.EQU: # ==
-                self.seq.append(Riscv.Binary(RvBinaryOp.SUB, instr.dst, instr.lhs, instr.rhs))
-                self.seq.append(Riscv.Unary(RvUnaryOp.SEQZ, instr.dst, instr.dst))
-                self.seq.append(Riscv.Unary(RvUnaryOp.SNEZ, instr.dst, instr.dst))
+                self.seq.append(Riscv.Binary(RvBinaryOp.SUB, dst, lhs, rhs))
+                self.seq.append(Riscv.Unary(RvUnaryOp.SEQZ, dst, dst))
             elif instr.op == TacBinaryOp.NEQ: # !=
-                self.seq.append(Riscv.Binary(RvBinaryOp.SUB, instr.dst, instr.lhs, instr.rhs))
-                self.seq.append(Riscv.Unary(RvUnaryOp.SNEZ, instr.dst, instr.dst))
+                self.seq.append(Riscv.Binary(RvBinaryOp.SUB, dst, lhs, rhs))
+                self.seq.append(Riscv.Unary(RvUnaryOp.SNEZ, dst, dst))
+            # a - b may overflow, so a <= b and a > b are computed as !(b < a) and b < a
             elif instr.op == TacBinaryOp.LEQ: # <=
-                self.seq.append(Riscv.Binary(RvBinaryOp.SUB, instr.dst, instr.lhs, instr.rhs))
-                self.seq.append(Riscv.Unary(RvUnaryOp.SGTZ, instr.dst, instr.dst))
-                self.seq.append(Riscv.Unary(RvUnaryOp.SEQZ, instr.dst, instr.dst))
+                self.seq.append(Riscv.Binary(RvBinaryOp.SLT, dst, rhs, lhs))
+                self.seq.append(Riscv.Unary(RvUnaryOp.SEQZ, dst, dst))
             elif instr.op == TacBinaryOp.SGT: # >
-                self.seq.append(Riscv.Binary(RvBinaryOp.SUB, instr.dst, instr.lhs, instr.rhs))
-                self.seq.append(Riscv.Unary(RvUnaryOp.SGTZ, instr.dst, instr.dst))
+                self.seq.append(Riscv.Binary(RvBinaryOp.SLT, dst, rhs, lhs))
             elif instr.op == TacBinaryOp.GEQ: # >=
-                self.seq.append(Riscv.Binary(RvBinaryOp.SLT, instr.dst, instr.lhs, instr.rhs))
-                self.seq.append(Riscv.Unary(RvUnaryOp.SEQZ, instr.dst, instr.dst))
+                self.seq.append(Riscv.Binary(RvBinaryOp.SLT, dst, lhs, rhs))
+                self.seq.append(Riscv.Unary(RvUnaryOp.SEQZ, dst, dst))
             else:
                 op = {
                     TacBinaryOp.ADD: RvBinaryOp.ADD,
@@ -123,10 +200,104 @@ class RiscvAsmEmitter(AsmEmitter):
                     TacBinaryOp.MOD: RvBinaryOp.REM, # mod
                     TacBinaryOp.SLT: RvBinaryOp.SLT, # <
                 }[instr.op]
-                self.seq.append(Riscv.Binary(op, instr.dst, instr.lhs, instr.rhs))
+                self.seq.append(Riscv.Binary(op, dst, lhs, rhs))
+
+        # a op c and c op a become a op' c
+        SWAPPED_OPS = {
+            TacBinaryOp.ADD: TacBinaryOp.ADD,
+            TacBinaryOp.EQU: TacBinaryOp.EQU,
+            TacBinaryOp.NEQ: TacBinaryOp.NEQ,
+            TacBinaryOp.LOR: TacBinaryOp.LOR,
+            TacBinaryOp.SLT: TacBinaryOp.SGT,
+            TacBinaryOp.SGT: TacBinaryOp.SLT,
+            TacBinaryOp.LEQ: TacBinaryOp.GEQ,
+            TacBinaryOp.GEQ: TacBinaryOp.LEQ,
+        }
+
+        # select the I-type form of a binary op with a constant operand (if there is one)
+        def selectImmediate(self, instr: Binary) -> bool:
+            op, reg, c = instr.op, instr.lhs, self.constants.get(instr.rhs.index)
+            if c is None:
+                c = self.constants.get(instr.lhs.index)
+                if c is None or op not in self.SWAPPED_OPS:
+                    return False
+                op, reg = self.SWAPPED_OPS[op], instr.rhs
+            dst, reg = instr.dst, self.operand(reg)
+
+            if op == TacBinaryOp.ADD and Riscv.fitsImm(c):
+                self.seq.append(Riscv.BinaryImm(RvBinaryImmOp.ADDI, dst, reg, c))
+            elif op == TacBinaryOp.SUB and Riscv.fitsImm(-c):
+                self.seq.append(Riscv.BinaryImm(RvBinaryImmOp.ADDI, dst, reg, -c))
+            elif op in (TacBinaryOp.EQU, TacBinaryOp.NEQ) and Riscv.fitsImm(c):
+                test = RvUnaryOp.SEQZ if op == TacBinaryOp.EQU else RvUnaryOp.SNEZ
+                if c == 0:
+                    self.seq.append(Riscv.Unary(test, dst, reg))
+                else:
+                    self.seq.append(Riscv.BinaryImm(RvBinaryImmOp.XORI, dst, reg, c))
+                    self.seq.append(Riscv.Unary(test, dst, dst))
+            elif op in (TacBinaryOp.SLT, TacBinaryOp.GEQ) and Riscv.fitsImm(c):
+                # a >= c is !(a < c)
+                self.seq.append(Riscv.BinaryImm(RvBinaryImmOp.SLTI, dst, reg, c))
+                if op == TacBinaryOp.GEQ:
+                    self.seq.append(Riscv.Unary(RvUnaryOp.SEQZ, dst, dst))
+            elif op in (TacBinaryOp.LEQ, TacBinaryOp.SGT) and Riscv.fitsImm(c + 1):
+                # a <= c is a < c + 1, and a > c is !(a < c + 1)
+                self.seq.append(Riscv.BinaryImm(RvBinaryImmOp.SLTI, dst, reg, c + 1))
+                if op == TacBinaryOp.SGT:
+                    self.seq.append(Riscv.Unary(RvUnaryOp.SEQZ, dst, dst))
+            elif op == TacBinaryOp.LOR and Riscv.fitsImm(c):
+                self.seq.append(Riscv.BinaryImm(RvBinaryImmOp.ORI, dst, reg, c))
+                self.seq.append(Riscv.Unary(RvUnaryOp.SNEZ, dst, dst))
+            else:
+                return False
+            return True
+
+        # select mul / div / rem by a constant with cheaper instrs
+        def selectReduced(self, instr: Binary) -> bool:
+            if self.reducer is None:
+                return False
+            x, c = instr.lhs, self.constants.get(instr.rhs.index)
+            if c is None and instr.op == TacBinaryOp.MUL:
+                x, c = instr.rhs, self.constants.get(instr.lhs.index)
+            if c is None:
+                return False
+            reduce = {
+                TacBinaryOp.MUL: self.reducer.mul,
+                TacBinaryOp.DIV: self.reducer.div,
+                TacBinaryOp.MOD: self.reducer.rem,
+            }.get(instr.op)
+            return reduce is not None and reduce(instr.dst, self.operand(x), c)
+
+        # the branch taken when the comparison is true, and whether its operands are swapped
+        FUSED_BRANCHES = {
+            TacBinaryOp.EQU: (RvBranchOp.BEQ, False),
+            TacBinaryOp.NEQ: (RvBranchOp.BNE, False),
+            TacBinaryOp.SLT: (RvBranchOp.BLT, False),
+            TacBinaryOp.GEQ: (RvBranchOp.BGE, False),
+            TacBinaryOp.SGT: (RvBranchOp.BLT, True),
+            TacBinaryOp.LEQ: (RvBranchOp.BGE, True),
+        }
 
         def visitCondBranch(self, instr: CondBranch) -> None:
-            self.seq.append(Riscv.Branch(instr.cond, instr.label))
+            # branch on cond != 0 (BNE) or on cond == 0 (BEQ)
+            taken = instr.op == CondBranchOp.BNE
+            op, src0, src1 = RvBranchOp.BNE, Riscv.ZERO, self.operand(instr.cond)
+
+            # a comparison (or !) computed right before the branch and read nowhere else is not materialized,
+            # the branch compares its operands directly
+            if self.computedJustBefore(instr.cond, False):
+                prev = self.prev
+                if isinstance(prev, Binary) and prev.op in self.FUSED_BRANCHES:
+                    del self.seq[self.prevStart :]
+                    op, swapped = self.FUSED_BRANCHES[prev.op]
+                    src0, src1 = (prev.rhs, prev.lhs) if swapped else (prev.lhs, prev.rhs)
+                    src0, src1 = self.operand(src0), self.operand(src1)
+                elif isinstance(prev, Unary) and prev.op == TacUnaryOp.LOGICNOT:
+                    del self.seq[self.prevStart :]
+                    src1 = self.operand(prev.operand)
+                    taken = not taken
+
+            self.seq.append(Riscv.Branch(op if taken else INVERTED_BRANCH[op], src0, src1, instr.label))
         
         def visitBranch(self, instr: Branch) -> None:
             self.seq.append(Riscv.Jump(instr.target))
@@ -141,11 +312,14 @@ class RiscvSubroutineEmitter(SubroutineEmitter):
     def __init__(self, emitter: RiscvAsmEmitter, info: SubroutineInfo) -> None:
         super().__init__(emitter, info)
         
-        # + 4 is for the RA reg 
-        self.nextLocalOffset = 4 * len(Riscv.CalleeSaved) + 4
+        # the offsets given to the temps here are only names of their slots,
+        # StackSlotColoring gives the final offsets (from sp up, before the saved regs) in emitEnd
+        self.nextLocalOffset = 0
         
         # the buf which stored all the NativeInstrs in this function
         self.buf: list[NativeInstr] = []
+        self.peephole = emitter.peephole
+        self.shrinkWrap = emitter.shrinkWrap
 
         # from temp to int
         # record where a temp is stored in the stack
@@ -163,23 +337,26 @@ class RiscvSubroutineEmitter(SubroutineEmitter):
     # usually happen when reaching the end of a basicblock
     # in step9, you need to think about the fuction parameters here
     def emitStoreToStack(self, src: Reg) -> None:
-        if src.temp.index not in self.offsets:
-            self.offsets[src.temp.index] = self.nextLocalOffset
-            self.nextLocalOffset += 4
         self.buf.append(
-            Riscv.NativeStoreWord(src, Riscv.SP, self.offsets[src.temp.index])
+            Riscv.NativeStoreWord(src, Riscv.SP, self.offsetOf(src.temp))
         )
 
     # load some temp from stack
     # usually happen when using a temp which is stored to stack before
     # in step9, you need to think about the fuction parameters here
     def emitLoadFromStack(self, dst: Reg, src: Temp):
-        if src.index not in self.offsets:
-            raise IllegalArgumentException()
-        else:
-            self.buf.append(
-                Riscv.NativeLoadWord(dst, Riscv.SP, self.offsets[src.index])
-            )
+        # the blocks may be laid out in any order (BlockLayout),
+        # so the block storing the temp is not always emitted before the one loading it
+        self.buf.append(
+            Riscv.NativeLoadWord(dst, Riscv.SP, self.offsetOf(src))
+        )
+
+    # the stack slot of a temp, given the first time the temp is stored or loaded
+    def offsetOf(self, temp: Temp) -> int:
+        if temp.index not in self.offsets:
+            self.offsets[temp.index] = self.nextLocalOffset
+            self.nextLocalOffset += 4
+        return self.offsets[temp.index]
 
     # add a NativeInstr to buf
     # when calling the fuction emitEnd, all the instr in buf will be transformed to RiscV code
@@ -190,18 +367,62 @@ class RiscvSubroutineEmitter(SubroutineEmitter):
         self.buf.append(Riscv.RiscvLabel(label).toNative([], []))
 
     
+    # the callee-saved regs written by this function, which the prologue saves
+    # (fp is not allocated, but it is the base of the stack slots far from sp)
+    def savedRegs(self) -> list[Reg]:
+        written = {reg for instr in self.buf for reg in instr.dsts}
+        return [reg for reg in [Riscv.FP] + Riscv.CalleeSaved if reg in written]
+
     def emitEnd(self):
-        self.printer.printComment("start of prologue")
-        self.printer.printInstr(Riscv.SPAdd(-self.nextLocalOffset))
-
-        # in step9, you need to think about how to store RA here
-        # you can get some ideas from how to save CalleeSaved regs
-        for i in range(len(Riscv.CalleeSaved)):
-            if Riscv.CalleeSaved[i].isUsed():
-                self.printer.printInstr(
-                    Riscv.NativeStoreWord(Riscv.CalleeSaved[i], Riscv.SP, 4 * i)
-                )
+        exitLabel = Label(LabelKind.TEMP, self.info.funcLabel.name + Riscv.EPILOGUE_SUFFIX)
+        if self.peephole is not None:
+            self.buf = self.peephole.run(self.buf, exitLabel)
+
+        # the frame: the stack slots of the temps, then the saved regs
+        # (ra is not saved, since the backend does not emit calls yet; in step9, it needs a slot here)
+        self.buf, slotSize = StackSlotColoring().run(self.buf)
+        saved = self.savedRegs()
+        frameSize = slotSize + 4 * len(saved)
+        if not Riscv.fitsImm(frameSize) and Riscv.FP not in saved:
+            saved.insert(0, Riscv.FP)
+            frameSize += 4
+        prologue: list[NativeInstr] = []
+        epilogue: list[NativeInstr] = []
+        # a function which needs no stack at all has no frame
+        if frameSize == 0:
+            stats.add("frame", "frames omitted")
+        elif Riscv.fitsImm(frameSize):
+            prologue.append(Riscv.SPAdd(-frameSize))
+            for i, reg in enumerate(saved):
+                prologue.append(Riscv.NativeStoreWord(reg, Riscv.SP, slotSize + 4 * i))
+                epilogue.append(Riscv.NativeLoadWord(reg, Riscv.SP, slotSize + 4 * i))
+            epilogue.append(Riscv.SPAdd(frameSize))
+        else:
+            # a large frame: save the regs (fp among them) next to the old sp, then move sp by the slots through fp
+            stats.add("frame", "large frames")
+            prologue.append(Riscv.SPAdd(-4 * len(saved)))
+            for i, reg in enumerate(saved):
+                prologue.append(Riscv.NativeStoreWord(reg, Riscv.SP, 4 * i))
+                epilogue.append(Riscv.NativeLoadWord(reg, Riscv.SP, 4 * i))
+            prologue += [
+                Riscv.LoadImm(Riscv.FP, slotSize).toNative([Riscv.FP], []),
+                Riscv.Binary(RvBinaryOp.SUB, Riscv.SP, Riscv.SP, Riscv.FP).toNative([Riscv.SP], [Riscv.SP, Riscv.FP]),
+            ]
+            epilogue[:0] = [
+                Riscv.LoadImm(Riscv.FP, slotSize).toNative([Riscv.FP], []),
+                Riscv.Binary(RvBinaryOp.ADD, Riscv.SP, Riscv.SP, Riscv.FP).toNative([Riscv.SP], [Riscv.SP, Riscv.FP]),
+            ]
+            epilogue.append(Riscv.SPAdd(4 * len(saved)))
+
+        if prologue and self.shrinkWrap:
+            wrapped = ShrinkWrap(self.buf, exitLabel, saved).wrap(prologue)
+            if wrapped is not None:
+                self.buf = wrapped
+                prologue = []
 
+        self.printer.printComment("start of prologue")
+        for instr in prologue:
+            self.printer.printInstr(instr)
         self.printer.printComment("end of prologue")
         self.printer.println("")
 
@@ -217,20 +438,15 @@ class RiscvSubroutineEmitter(SubroutineEmitter):
         self.printer.printComment("end of body")
         self.printer.println("")
 
-        self.printer.printLabel(
-            Label(LabelKind.TEMP, self.info.funcLabel.name + Riscv.EPILOGUE_SUFFIX)
-        )
+        self.printer.printLabel(exitLabel)
         self.printer.printComment("start of epilogue")
-
-        for i in range(len(Riscv.CalleeSaved)):
-            if Riscv.CalleeSaved[i].isUsed():
-                self.printer.printInstr(
-                    Riscv.NativeLoadWord(Riscv.CalleeSaved[i], Riscv.SP, 4 * i)
-                )
-
-        self.printer.printInstr(Riscv.SPAdd(self.nextLocalOffset))
+        for instr in epilogue:
+            self.printer.printInstr(instr)
         self.printer.printComment("end of epilogue")
         self.printer.println("")
 
         self.printer.printInstr(Riscv.NativeReturn())
         self.printer.println("")
+
+        # the code of this function is finished, pass it on to the sink (if any)
+        self.printer.flush()
@@ -0,0 +1,111 @@
+from typing import Optional
+
+from backend.dataflow.basicblock import BasicBlock, BlockKind
+from backend.dataflow.cfg import CFG
+from backend.dataflow.dominators import DominatorTree
+from backend.riscv.nativecfg import buildNativeCFG
+from utils.label.label import Label
+from utils.riscv import Riscv
+from utils.stats import stats
+from utils.tac.nativeinstr import NativeInstr
+from utils.tac.reg import Reg
+
+"""
+ShrinkWrap: move the prologue of a function (RiscvSubroutineEmitter.emitEnd) off the paths which do not need the frame
+
+The native instrs are split into blocks (buildNativeCFG), the exit is the epilogue right after them.
+A block needs the frame if it uses sp or a callee-saved register which is saved.
+The prologue is moved to the start of a block P, found from the nearest common dominator of those blocks and
+going up the dominator tree until
+1. P is not in a loop (the prologue must run at most once)
+2. P dominates every block it can reach, so each block is either always after the prologue or never
+Then the blocks reached from P return through the epilogue as before, and the other blocks return by a ret
+of their own (the epilogue would restore what was never saved).
+
+If no such P is found, or a block without the frame has a conditional branch to the epilogue (there is no
+ret to branch to), the prologue stays at the start of the function.
+"""
+
+
+class ShrinkWrap:
+    name = "shrinkwrap"
+
+    def __init__(self, buf: list[NativeInstr], exit: Label, saved: list[Reg]) -> None:
+        self.buf = buf
+        self.exit = exit
+        self.saved = set(saved)
+
+    # buf with the prologue moved into it, or None if the prologue should stay at the start
+    def wrap(self, prologue: list[NativeInstr]) -> Optional[list[NativeInstr]]:
+        graph = buildNativeCFG(self.buf)
+        if not graph.nodes:
+            return None
+        domTree = DominatorTree(graph)
+        needy = [bb.id for bb in graph.iterator() if graph.isReachable(bb.id) and self.needsFrame(bb)]
+        if not needy:
+            return None
+
+        place: Optional[int] = needy[0]
+        for id in needy[1:]:
+            place = self.commonDominator(domTree, place, id)
+        while place is not None and not self.canPlace(graph, domTree, place):
+            place = domTree.idom[place]
+        if place is None or (place == 0 and not graph.getPrev(0)):
+            return None
+
+        framed = self.reachableFrom(graph, place)
+        out: list[NativeInstr] = []
+        for bb in graph.iterator():
+            instrs = [loc.instr for loc in bb.iterator()]
+            if bb.id not in framed:
+                if bb.kind is BlockKind.END_BY_COND_JUMP and self.isExit(instrs[-1].label):
+                    return None
+                if bb.kind is BlockKind.END_BY_JUMP and self.isExit(instrs[-1].label):
+                    instrs[-1] = Riscv.NativeReturn()
+            if bb.id == place:
+                # the prologue goes after the labels of the block
+                labels = 0
+                while labels < len(instrs) and instrs[labels].isLabel():
+                    labels += 1
+                instrs[labels:labels] = prologue
+            out += instrs
+        # the last block falls through to the epilogue (after a conditional jump too)
+        last = graph.getBlock(len(graph.nodes) - 1)
+        if last.id not in framed and last.kind in (BlockKind.CONTINUOUS, BlockKind.END_BY_COND_JUMP):
+            out.append(Riscv.NativeReturn())
+        stats.add(self.name, "prologues moved off the entry")
+        return out
+
+    def needsFrame(self, bb: BasicBlock) -> bool:
+        for loc in bb.iterator():
+            for reg in loc.instr.dsts + loc.instr.srcs:
+                if reg is Riscv.SP or reg in self.saved:
+                    return True
+        return False
+
+    def canPlace(self, graph: CFG, domTree: DominatorTree, place: int) -> bool:
+        reached = self.reachableFrom(graph, place)
+        if any(place in graph.getSucc(id) for id in reached):
+            return False
+        return all(domTree.dominates(place, id) for id in reached)
+
+    # the blocks reachable from start (including start)
+    def reachableFrom(self, graph: CFG, start: int) -> set[int]:
+        reached = {start}
+        stack = [start]
+        while stack:
+            for next in graph.getSucc(stack.pop()):
+                if next not in reached:
+                    reached.add(next)
+                    stack.append(next)
+        return reached
+
+    @staticmethod
+    def commonDominator(domTree: DominatorTree, a: int, b: int) -> Optional[int]:
+        while a is not None and not domTree.dominates(a, b):
+            a = domTree.idom[a]
+        return a
+
+    # the label of the epilogue is a new Label object every time, so the labels are compared by name
+    def isExit(self, label: Optional[Label]) -> bool:
+        return label is not None and label.name == self.exit.name
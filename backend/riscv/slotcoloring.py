@@ -0,0 +1,117 @@
+from backend.dataflow.cfg import CFG
+from backend.riscv.nativecfg import buildNativeCFG
+from utils.riscv import Riscv, RvBinaryOp
+from utils.stats import stats
+from utils.tac.nativeinstr import NativeInstr
+
+"""
+StackSlotColoring: let the temps which are never live at the same time share a stack slot
+
+RiscvSubroutineEmitter gives each temp stored to the stack a slot of its own (offsetOf). Before the frame is laid out,
+the slots are handled like the temps of a register allocator, on the native instrs (buildNativeCFG):
+1. 活跃分析：lw off(sp) 读 slot，sw off(sp) 写 slot，按基本块迭代到不动点
+2. 冲突：写一个 slot 时，与此时活跃的其它 slot 冲突
+3. 着色：访问次数多的 slot 先选，取邻居没用过的最小编号，新的 offset 为 4 * 编号（访问多的 slot 离 sp 近）
+4. 改写：offset 超出 12 位立即数时，用 fp 作为基址：li fp, off; add fp, fp, sp; lw / sw r, 0(fp)
+
+The frame is [slots][saved regs] from sp up, so run returns the size of the slots.
+"""
+
+
+class StackSlotColoring:
+    name = "slots"
+
+    # buf with the new offsets, and the size of the slots
+    def run(self, buf: list[NativeInstr]) -> tuple[list[NativeInstr], int]:
+        counts: dict[int, int] = {}
+        for instr in buf:
+            if self.isSlotAccess(instr):
+                counts[instr.offset] = counts.get(instr.offset, 0) + 1
+        if not counts:
+            return buf, 0
+
+        graph = buildNativeCFG(buf)
+        neighbors = self.interference(graph)
+        colors: dict[int, int] = {}
+        for slot in sorted(counts, key=lambda slot: (-counts[slot], slot)):
+            taken = {colors[other] for other in neighbors.get(slot, ()) if other in colors}
+            color = 0
+            while color in taken:
+                color += 1
+            colors[slot] = color
+        size = 4 * (max(colors.values()) + 1)
+        stats.add(self.name, "stack slots shared", len(counts) - size // 4)
+
+        out: list[NativeInstr] = []
+        for instr in buf:
+            if self.isSlotAccess(instr):
+                out += self.access(instr, 4 * colors[instr.offset])
+            else:
+                out.append(instr)
+        return out, size
+
+    @staticmethod
+    def isSlotAccess(instr: NativeInstr) -> bool:
+        return (
+            isinstance(instr, (Riscv.NativeLoadWord, Riscv.NativeStoreWord))
+            and instr.srcs[-1] is Riscv.SP
+        )
+
+    # map from a slot to the slots it can not share an offset with
+    def interference(self, graph: CFG) -> dict[int, set[int]]:
+        n = len(graph.nodes)
+        uses: list[set[int]] = [set() for _ in range(n)]
+        defs: list[set[int]] = [set() for _ in range(n)]
+        for bb in graph.iterator():
+            for loc in bb.backwardIterator():
+                instr = loc.instr
+                if not self.isSlotAccess(instr):
+                    continue
+                if isinstance(instr, Riscv.NativeStoreWord):
+                    defs[bb.id].add(instr.offset)
+                    uses[bb.id].discard(instr.offset)
+                else:
+                    uses[bb.id].add(instr.offset)
+
+        liveOut: list[set[int]] = [set() for _ in range(n)]
+        liveIn: list[set[int]] = [set(uses[id]) for id in range(n)]
+        changed = True
+        while changed:
+            changed = False
+            for id in reversed(range(n)):
+                out = set()
+                for next in graph.getSucc(id):
+                    out |= liveIn[next]
+                if out != liveOut[id]:
+                    liveOut[id] = out
+                    liveIn[id] = uses[id] | (out - defs[id])
+                    changed = True
+
+        neighbors: dict[int, set[int]] = {}
+        for bb in graph.iterator():
+            live = set(liveOut[bb.id])
+            for loc in bb.backwardIterator():
+                instr = loc.instr
+                if not self.isSlotAccess(instr):
+                    continue
+                if isinstance(instr, Riscv.NativeStoreWord):
+                    live.discard(instr.offset)
+                    for other in live:
+                        neighbors.setdefault(instr.offset, set()).add(other)
+                        neighbors.setdefault(other, set()).add(instr.offset)
+                else:
+                    live.add(instr.offset)
+        return neighbors
+
+    # the instrs accessing the slot at offset from sp, instead of instr
+    @staticmethod
+    def access(instr: NativeInstr, offset: int) -> list[NativeInstr]:
+        isStore = isinstance(instr, Riscv.NativeStoreWord)
+        if Riscv.fitsImm(offset):
+            if isStore:
+                return [Riscv.NativeStoreWord(instr.srcs[0], Riscv.SP, offset)]
+            return [Riscv.NativeLoadWord(instr.dsts[0], Riscv.SP, offset)]
+        base = Riscv.spOffset(Riscv.FP, offset)
+        if isStore:
+            return base + [Riscv.NativeStoreWord(instr.srcs[0], Riscv.FP, 0)]
+        return base + [Riscv.NativeLoadWord(instr.dsts[0], Riscv.FP, 0)]
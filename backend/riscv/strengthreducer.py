@@ -0,0 +1,172 @@
+from typing import Callable, Optional
+
+from utils.riscv import MAX_INT, Riscv, RvBinaryImmOp, RvBinaryOp, RvUnaryOp
+from utils.tac.temp import Temp
+
+"""
+StrengthReducer: replace mul / div / rem by a constant with cheaper RISC-V instrs (for RiscvInstrSelector)
+
+1. mul：c = ±2^k 变为 slli，c = ±(2^a ± 2^b) 变为两次 slli 与 add / sub
+2. div：c = ±2^k 时，负数先加上 2^k - 1 再 srai（使结果向零取整）；
+   其它 c 用 mulh 乘以 magic number，再移位并对负数的商加 1（Hacker's Delight 10-1）
+3. rem：x % c = x - (x / c) * c，c = ±2^k 时直接用掩码
+
+The instrs are appended to seq, which is the seq of the selector; freshTemp gives the temps for the partial results.
+dst is only written by the last instrs, after every read of x, so dst and x may be the same temp.
+Each method returns False (and appends nothing) if c is not worth reducing, so the selector falls back to mul / div / rem.
+The results follow the 32-bit semantics of the div and rem instrs (x / 0 and INT_MIN / -1 are never reduced).
+"""
+
+INT_MIN = -MAX_INT - 1
+
+
+class StrengthReducer:
+    def __init__(self, seq: list, freshTemp: Callable[[], Temp]) -> None:
+        self.seq = seq
+        self.freshTemp = freshTemp
+
+    def mul(self, dst: Temp, x: Temp, c: int) -> bool:
+        if c == INT_MIN:
+            return False
+        n = abs(c)
+        if n <= 1:
+            if n == 0:
+                self.seq.append(Riscv.Move(dst, Riscv.ZERO))
+            else:
+                self.seq.append(Riscv.Move(dst, x) if c > 0 else Riscv.Unary(RvUnaryOp.NEG, dst, x))
+            return True
+        terms = self.shiftTerms(n)
+        if terms is None:
+            return False
+        (a, b, sign) = terms
+        if b is None:
+            self.shift(RvBinaryImmOp.SLLI, dst, x, a)
+        else:
+            high = self.freshTemp()
+            self.shift(RvBinaryImmOp.SLLI, high, x, a)
+            low = x
+            if b > 0:
+                low = dst
+                self.shift(RvBinaryImmOp.SLLI, dst, x, b)
+            op = RvBinaryOp.ADD if sign > 0 else RvBinaryOp.SUB
+            self.seq.append(Riscv.Binary(op, dst, high, low))
+        if c < 0:
+            self.seq.append(Riscv.Unary(RvUnaryOp.NEG, dst, dst))
+        return True
+
+    # n = 2^a (b is None) or n = 2^a + sign * 2^b
+    @staticmethod
+    def shiftTerms(n: int) -> Optional[tuple[int, Optional[int], int]]:
+        if n & (n - 1) == 0:
+            return (n.bit_length() - 1, None, 1)
+        low = n & -n
+        rest = n - low
+        if rest & (rest - 1) == 0:
+            return (rest.bit_length() - 1, low.bit_length() - 1, 1)
+        high = 1 << n.bit_length()
+        if (high - n) & (high - n - 1) == 0 and n.bit_length() < 32:
+            return (n.bit_length(), (high - n).bit_length() - 1, -1)
+        return None
+
+    def div(self, dst: Temp, x: Temp, c: int) -> bool:
+        if c in (0, INT_MIN):
+            return False
+        n = abs(c)
+        if n == 1:
+            self.seq.append(Riscv.Move(dst, x) if c > 0 else Riscv.Unary(RvUnaryOp.NEG, dst, x))
+            return True
+        if n & (n - 1) == 0:
+            k = n.bit_length() - 1
+            biased = self.biased(x, k)
+            self.shift(RvBinaryImmOp.SRAI, dst, biased, k)
+            if c < 0:
+                self.seq.append(Riscv.Unary(RvUnaryOp.NEG, dst, dst))
+            return True
+
+        magic, shift = self.magic(c)
+        m = self.freshTemp()
+        q = self.freshTemp()
+        self.seq.append(Riscv.LoadImm(m, magic))
+        self.seq.append(Riscv.Binary(RvBinaryOp.MULH, q, x, m))
+        if c > 0 and magic < 0:
+            self.seq.append(Riscv.Binary(RvBinaryOp.ADD, q, q, x))
+        elif c < 0 and magic > 0:
+            self.seq.append(Riscv.Binary(RvBinaryOp.SUB, q, q, x))
+        if shift > 0:
+            self.shift(RvBinaryImmOp.SRAI, q, q, shift)
+        # round towards zero: add 1 if the quotient is negative
+        sign = self.freshTemp()
+        self.shift(RvBinaryImmOp.SRLI, sign, q, 31)
+        self.seq.append(Riscv.Binary(RvBinaryOp.ADD, dst, q, sign))
+        return True
+
+    def rem(self, dst: Temp, x: Temp, c: int) -> bool:
+        if c in (0, INT_MIN):
+            return False
+        n = abs(c)
+        if n == 1:
+            self.seq.append(Riscv.Move(dst, Riscv.ZERO))
+            return True
+        if n & (n - 1) == 0:
+            # x - (x rounded towards zero to a multiple of 2^k), the sign of c does not matter
+            k = n.bit_length() - 1
+            rounded = self.biased(x, k)
+            if Riscv.fitsImm(-n):
+                self.seq.append(Riscv.BinaryImm(RvBinaryImmOp.ANDI, rounded, rounded, -n))
+            else:
+                self.shift(RvBinaryImmOp.SRAI, rounded, rounded, k)
+                self.shift(RvBinaryImmOp.SLLI, rounded, rounded, k)
+            self.seq.append(Riscv.Binary(RvBinaryOp.SUB, dst, x, rounded))
+            return True
+
+        q = self.freshTemp()
+        self.div(q, x, c)
+        product = self.freshTemp()
+        if not self.mul(product, q, c):
+            divisor = self.freshTemp()
+            self.seq.append(Riscv.LoadImm(divisor, c))
+            self.seq.append(Riscv.Binary(RvBinaryOp.MUL, product, q, divisor))
+        self.seq.append(Riscv.Binary(RvBinaryOp.SUB, dst, x, product))
+        return True
+
+    # a new temp holding x + (2^k - 1 if x < 0 else 0), so that an arithmetic shift by k rounds towards zero
+    def biased(self, x: Temp, k: int) -> Temp:
+        bias = self.freshTemp()
+        if k > 1:
+            self.shift(RvBinaryImmOp.SRAI, bias, x, 31)
+            self.shift(RvBinaryImmOp.SRLI, bias, bias, 32 - k)
+        else:
+            self.shift(RvBinaryImmOp.SRLI, bias, x, 31)
+        self.seq.append(Riscv.Binary(RvBinaryOp.ADD, bias, x, bias))
+        return bias
+
+    def shift(self, op: RvBinaryImmOp, dst: Temp, src: Temp, amount: int) -> None:
+        self.seq.append(Riscv.BinaryImm(op, dst, src, amount))
+
+    # the magic number and the shift for the signed division by d (|d| >= 2), Hacker's Delight 10-1
+    @staticmethod
+    def magic(d: int) -> tuple[int, int]:
+        two31 = 1 << 31
+        ad = abs(d)
+        t = two31 + (1 if d < 0 else 0)
+        anc = t - 1 - t % ad
+        p = 31
+        q1, r1 = divmod(two31, anc)
+        q2, r2 = divmod(two31, ad)
+        while True:
+            p += 1
+            q1, r1 = 2 * q1, 2 * r1
+            if r1 >= anc:
+                q1, r1 = q1 + 1, r1 - anc
+            q2, r2 = 2 * q2, 2 * r2
+            if r2 >= ad:
+                q2, r2 = q2 + 1, r2 - ad
+            delta = ad - r2
+            if not (q1 < delta or (q1 == delta and r1 == 0)):
+                break
+        magic = (q2 + 1) & 0xFFFF_FFFF
+        if d < 0:
+            magic = (-magic) & 0xFFFF_FFFF
+        if magic & 0x8000_0000:
+            magic -= 1 << 32
+        return magic, p - 32
@@ -0,0 +1,10 @@
+# lextab_5342f9f3ecefac71.py. This file automatically created by PLY (version 3.11). Don't edit!
+_tabversion   = '3.10'
+_lextokens    = set(('And', 'Assign', 'BitAnd', 'BitNot', 'BitOr', 'Break', 'Colon', 'Div', 'Else', 'Equal', 'Greater', 'GreaterEqual', 'Identifier', 'If', 'Int', 'Integer', 'LBrace', 'LParen', 'Less', 'LessEqual', 'Minus', 'Mod', 'Mul', 'Not', 'NotEqual', 'Or', 'Plus', 'Question', 'RBrace', 'RParen', 'Return', 'Semi', 'While', 'Xor'))
+_lexreflags   = 64
+_lexliterals  = ''
+_lexstateinfo = {'INITIAL': 'inclusive', 'multiline': 'exclusive'}
+_lexstatere   = {'INITIAL': [('(?P<t_multiline>/\\*)|(?P<t_ANY_Newline>(?:\\r\\n?|\\n))|(?P<t_Identifier>[a-zA-Z_][0-9a-zA-Z_]*)|(?P<t_Integer>[0-9]+)|(?P<t_ignore_LineComment>//.*?(?=(?:\\r\\n?|\\n)))|(?P<t_ignore_Newline>(?:\\r\\n?|\\n))|(?P<t_Return>t_Return)|(?P<t_Break>t_Break)|(?P<t_While>t_While)|(?P<t_Else>t_Else)|(?P<t_ignore_Whitespace>[ \\t]+)|(?P<t_Int>t_Int)|(?P<t_And>\\&\\&)|(?P<t_If>t_If)|(?P<t_Or>\\|\\|)|(?P<t_BitAnd>\\&)|(?P<t_BitNot>\\~)|(?P<t_BitOr>\\|)|(?P<t_Equal>==)|(?P<t_GreaterEqual>>=)|(?P<t_LBrace>\\{)|(?P<t_LParen>\\()|(?P<t_LessEqual><=)|(?P<t_Minus>\\-)|(?P<t_Mul>\\*)|(?P<t_NotEqual>!=)|(?P<t_Plus>\\+)|(?P<t_Question>\\?)|(?P<t_RBrace>\\})|(?P<t_RParen>\\))|(?P<t_Xor>\\^)|(?P<t_Assign>=)|(?P<t_Colon>:)|(?P<t_Div>/)|(?P<t_Greater>>)|(?P<t_Less><)|(?P<t_Mod>%)|(?P<t_Not>!)|(?P<t_Semi>;)', [None, ('t_multiline', 'multiline'), ('t_ANY_Newline', 'Newline'), ('t_Identifier', 'Identifier'), ('t_Integer', 'Integer'), (None, None), (None, None), (None, 'Return'), (None, 'Break'), (None, 'While'), (None, 'Else'), (None, None), (None, 'Int'), (None, 'And'), (None, 'If'), (None, 'Or'), (None, 'BitAnd'), (None, 'BitNot'), (None, 'BitOr'), (None, 'Equal'), (None, 'GreaterEqual'), (None, 'LBrace'), (None, 'LParen'), (None, 'LessEqual'), (None, 'Minus'), (None, 'Mul'), (None, 'NotEqual'), (None, 'Plus'), (None, 'Question'), (None, 'RBrace'), (None, 'RParen'), (None, 'Xor'), (None, 'Assign'), (None, 'Colon'), (None, 'Div'), (None, 'Greater'), (None, 'Less'), (None, 'Mod'), (None, 'Not'), (None, 'Semi')])], 'multiline': [('(?P<t_multiline_end>\\*/)|(?P<t_ANY_Newline>(?:\\r\\n?|\\n))|(?P<t_multiline_ignore_all>.+?(?=\\*/|(?:\\r\\n?|\\n)))', [None, ('t_multiline_end', 'end'), ('t_ANY_Newline', 'Newline'), (None, None)])]}
+_lexstateignore = {'INITIAL': ''}
+_lexstateerrorf = {'INITIAL': 't_ANY_error', 'multiline': 't_ANY_error'}
+_lexstateeoff = {}
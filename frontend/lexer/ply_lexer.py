@@ -1,8 +1,15 @@
 """
 Module that defines a lexer using `ply.lex`.
 It won't make your experiment harder if you don't read it.
+
+The master regexes are pregenerated into `lextab_<hash>.py` (run `python -m frontend.parser`),
+where the hash covers all the token rules.
 """
 
+import hashlib
+import importlib.util
+import os
+import sys
 from functools import wraps
 from typing import List
 
@@ -67,5 +74,56 @@ def _intlit_into_node(f):
 
 t_Integer = _intlit_into_node(t_Integer)
 
-lexer = lex.lex()
+def rules_hash() -> str:
+    """
+    Hash of everything the lexer tables depend on: the states and the regexes of all the token rules.
+    PLY tries the function rules in the order they are defined, so their order counts, but not their line numbers.
+    """
+    module = sys.modules[__name__]
+    rules = [(name, rule) for name, rule in vars(module).items() if name.startswith("t_")]
+    funcs = sorted(
+        (rule.__code__.co_firstlineno, name, getattr(rule, "regex", rule.__doc__))
+        for name, rule in rules
+        if callable(rule)
+    )
+    h = hashlib.sha1()
+    h.update(repr(states).encode())
+    for _, name, regex in funcs:
+        h.update(name.encode())
+        h.update(str(regex).encode())
+    for name, rule in sorted((name, rule) for name, rule in rules if not callable(rule)):
+        h.update(name.encode())
+        h.update(str(rule).encode())
+    return h.hexdigest()[:16]
+
+
+LEXTAB = "lextab_" + rules_hash()
+
+
+def build_lexer():
+    """
+    Load the pregenerated tables if they match the rules, otherwise build the lexer from scratch.
+    Nothing is written to the disk in either case.
+    """
+    module = sys.modules[__name__]
+    lextab = __package__ + "." + LEXTAB
+    if importlib.util.find_spec(lextab) is None:
+        return lex.lex(module=module)
+    return lex.lex(module=module, optimize=True, lextab=lextab)
+
+
+def write_tables() -> str:
+    """
+    Pregenerate the lexer tables next to this file, and remove the ones of older rules.
+    """
+    outputdir = os.path.dirname(os.path.abspath(__file__))
+    for name in os.listdir(outputdir):
+        if name.startswith("lextab_") and name != LEXTAB + ".py":
+            os.remove(os.path.join(outputdir, name))
+
+    lex.lex(module=sys.modules[__name__]).writetab(LEXTAB, outputdir)
+    return os.path.join(outputdir, LEXTAB + ".py")
+
+
+lexer = build_lexer()
 lexer.error_stack = error_stack  # type: ignore
@@ -0,0 +1,18 @@
+"""
+Pregenerate the lexer and parser tables:
+
+    python -m frontend.parser
+
+Run it again whenever you change the token rules or the grammar.
+"""
+
+from importlib import import_module
+
+from . import ply_parser
+
+# note that `frontend.lexer.ply_lexer` is shadowed by the lexer object exported from `frontend.lexer`
+ply_lexer = import_module("frontend.lexer.ply_lexer")
+
+if __name__ == "__main__":
+    print("lexer tables:  " + ply_lexer.write_tables())
+    print("parser tables: " + ply_parser.write_tables())
@@ -0,0 +1,91 @@
+
+# parsetab_e914072951567a6f.py
+# This file is automatically generated. Do not edit.
+# pylint: disable=W,C,R
+_tabversion = '3.10'
+
+_lr_method = 'LALR'
+
+_lr_signature = 'programAnd Assign BitAnd BitNot BitOr Break Colon Div Else Equal Greater GreaterEqual Identifier If Int Integer LBrace LParen Less LessEqual Minus Mod Mul Not NotEqual Or Plus Question RBrace RParen Return Semi While Xor\n    empty :\n    \n    program : function\n    \n    type : Int\n    \n    function : type Identifier LParen RParen LBrace block RBrace\n    \n    block : block block_item\n    \n    block : empty\n    \n    block_item : statement\n        | declaration Semi\n    \n    statement : statement_matched\n        | statement_unmatched\n    \n    statement_matched : If LParen expression RParen statement_matched Else statement_matched\n    statement_unmatched : If LParen expression RParen statement_matched Else statement_unmatched\n    \n    statement_unmatched : If LParen expression RParen statement\n    \n    statement_matched : While LParen expression RParen statement_matched\n    statement_unmatched : While LParen expression RParen statement_unmatched\n    \n    statement_matched : Return expression Semi\n    \n    statement_matched : opt_expression Semi\n    \n    statement_matched : LBrace block RBrace\n    \n    statement_matched : Break Semi\n    \n    opt_expression : expression\n    \n    opt_expression : empty\n    \n    declaration : type Identifier\n    \n    declaration : type Identifier Assign expression\n    \n    expression : assignment\n    assignment : conditional\n    conditional : logical_or\n    logical_or : logical_and\n    logical_and : bit_or\n    bit_or : xor\n    xor : bit_and\n    bit_and : equality\n    equality : relational\n    relational : additive\n    additive : multiplicative\n    multiplicative : unary\n    unary : postfix\n    postfix : primary\n    \n    unary : Minus unary\n        | BitNot unary\n        | Not unary\n    \n    assignment : Identifier Assign expression\n    logical_or : logical_or Or logical_and\n    logical_and : logical_and And bit_or\n    bit_or : bit_or BitOr xor\n    xor : xor Xor bit_and\n    bit_and : bit_and BitAnd equality\n    equality : equality NotEqual relational\n        | equality Equal relational\n    relational : relational Less additive\n        | relational Greater additive\n        | relational LessEqual additive\n        | relational GreaterEqual additive\n    additive : additive Plus multiplicative\n        | additive Minus multiplicative\n    multiplicative : multiplicative Mul unary\n        | multiplicative Div unary\n        | multiplicative Mod unary\n    \n    conditional : logical_or Question expression Colon conditional\n    \n    primary : Integer\n    \n    primary : Identifier\n    \n    primary : LParen expression RParen\n    '
+    
+_lr_action_items = {'Int':([0,8,9,10,14,16,17,19,20,49,50,54,55,80,83,105,106,107,108,111,112,],[4,-1,4,-6,-1,-5,-7,-9,-10,4,-8,-17,-19,-18,-16,-9,-13,-14,-15,-11,-12,]),'$end':([1,2,15,],[0,-2,-4,]),'Identifier':([3,4,8,9,10,11,13,14,16,17,19,20,24,39,42,43,47,49,50,51,52,54,55,56,57,58,59,60,61,62,63,64,65,66,67,68,69,70,71,72,77,80,83,102,103,104,105,106,107,108,110,111,112,],[5,-3,-1,12,-6,46,12,-1,-5,-7,-9,-10,12,74,74,74,12,12,-8,12,12,-17,-19,12,74,74,74,74,74,74,74,74,74,74,74,74,74,74,74,74,12,-18,-16,12,12,74,-9,-13,-14,-15,12,-11,-12,]),'LParen':([5,8,9,10,13,14,16,17,19,20,22,23,24,39,42,43,47,49,50,51,52,54,55,56,57,58,59,60,61,62,63,64,65,66,67,68,69,70,71,72,77,80,83,102,103,104,105,106,107,108,110,111,112,],[6,-1,13,-6,13,-1,-5,-7,-9,-10,51,52,13,13,13,13,13,13,-8,13,13,-17,-19,13,13,13,13,13,13,13,13,13,13,13,13,13,13,13,13,13,13,-18,-16,13,13,13,-9,-13,-14,-15,13,-11,-12,]),'RParen':([6,12,28,29,30,31,32,33,34,35,36,37,38,40,41,44,45,48,73,74,75,76,78,79,81,82,85,86,87,88,89,90,91,92,93,94,95,96,97,98,99,100,109,],[7,-60,-24,-25,-26,-27,-28,-29,-30,-31,-32,-33,-34,-35,-36,-37,-59,79,-38,-60,-39,-40,-41,-61,102,103,-42,-43,-44,-45,-46,-47,-48,-49,-50,-51,-52,-53,-54,-55,-56,-57,-58,]),'LBrace':([7,8,9,10,14,16,17,19,20,49,50,54,55,80,83,102,103,105,106,107,108,110,111,112,],[8,-1,14,-6,-1,-5,-7,-9,-10,14,-8,-17,-19,-18,-16,14,14,-9,-13,-14,-15,14,-11,-12,]),'RBrace':([8,9,10,14,16,17,19,20,49,50,54,55,80,83,105,106,107,108,111,112,],[-1,15,-6,-1,-5,-7,-9,-10,80,-8,-17,-19,-18,-16,-9,-13,-14,-15,-11,-12,]),'If':([8,9,10,14,16,17,19,20,49,50,54,55,80,83,102,103,105,106,107,108,110,111,112,],[-1,22,-6,-1,-5,-7,-9,-10,22,-8,-17,-19,-18,-16,22,22,-9,-13,-14,-15,22,-11,-12,]),'While':([8,9,10,14,16,17,19,20,49,50,54,55,80,83,102,103,105,106,107,108,110,111,112,],[-1,23,-6,-1,-5,-7,-9,-10,23,-8,-17,-19,-18,-16,23,23,-9,-13,-14,-15,23,-11,-12,]),'Return':([8,9,10,14,16,17,19,20,49,50,54,55,80,83,102,103,105,106,107,108,110,111,112,],[-1,24,-6,-1,-5,-7,-9,-10,24,-8,-17,-19,-18,-16,24,24,-9,-13,-14,-15,24,-11,-12,]),'Break':([8,9,10,14,16,17,19,20,49,50,54,55,80,83,102,103,105,106,107,108,110,111,112,],[-1,26,-6,-1,-5,-7,-9,-10,26,-8,-17,-19,-18,-16,26,26,-9,-13,-14,-15,26,-11,-12,]),'Minus':([8,9,10,12,13,14,16,17,19,20,24,37,38,39,40,41,42,43,44,45,47,49,50,51,52,54,55,56,57,58,59,60,61,62,63,64,65,66,67,68,69,70,71,72,73,74,75,76,77,79,80,83,92,93,94,95,96,97,98,99,100,102,103,104,105,106,107,108,110,111,112,],[-1,39,-6,-60,39,-1,-5,-7,-9,-10,39,69,-34,39,-35,-36,39,39,-37,-59,39,39,-8,39,39,-17,-19,39,39,39,39,39,39,39,39,39,39,39,39,39,39,39,39,39,-38,-60,-39,-40,39,-61,-18,-16,69,69,69,69,-53,-54,-55,-56,-57,39,39,39,-9,-13,-14,-15,39,-11,-12,]),'BitNot':([8,9,10,13,14,16,17,19,20,24,39,42,43,47,49,50,51,52,54,55,56,57,58,59,60,61,62,63,64,65,66,67,68,69,70,71,72,77,80,83,102,103,104,105,106,107,108,110,111,112,],[-1,42,-6,42,-1,-5,-7,-9,-10,42,42,42,42,42,42,-8,42,42,-17,-19,42,42,42,42,42,42,42,42,42,42,42,42,42,42,42,42,42,42,-18,-16,42,42,42,-9,-13,-14,-15,42,-11,-12,]),'Not':([8,9,10,13,14,16,17,19,20,24,39,42,43,47,49,50,51,52,54,55,56,57,58,59,60,61,62,63,64,65,66,67,68,69,70,71,72,77,80,83,102,103,104,105,106,107,108,110,111,112,],[-1,43,-6,43,-1,-5,-7,-9,-10,43,43,43,43,43,43,-8,43,43,-17,-19,43,43,43,43,43,43,43,43,43,43,43,43,43,43,43,43,43,43,-18,-16,43,43,43,-9,-13,-14,-15,43,-11,-12,]),'Integer':([8,9,10,13,14,16,17,19,20,24,39,42,43,47,49,50,51,52,54,55,56,57,58,59,60,61,62,63,64,65,66,67,68,69,70,71,72,77,80,83,102,103,104,105,106,107,108,110,111,112,],[-1,45,-6,45,-1,-5,-7,-9,-10,45,45,45,45,45,45,-8,45,45,-17,-19,45,45,45,45,45,45,45,45,45,45,45,45,45,45,45,45,45,45,-18,-16,45,45,45,-9,-13,-14,-15,45,-11,-12,]),'Semi':([8,9,10,12,14,16,17,18,19,20,21,25,26,27,28,29,30,31,32,33,34,35,36,37,38,40,41,44,45,46,49,50,53,54,55,73,74,75,76,78,79,80,83,85,86,87,88,89,90,91,92,93,94,95,96,97,98,99,100,101,102,103,105,106,107,108,109,110,111,112,],[-1,-1,-6,-60,-1,-5,-7,50,-9,-10,-20,54,55,-21,-24,-25,-26,-27,-28,-29,-30,-31,-32,-33,-34,-35,-36,-37,-59,-22,-1,-8,83,-17,-19,-38,-60,-39,-40,-41,-61,-18,-16,-42,-43,-44,-45,-46,-47,-48,-49,-50,-51,-52,-53,-54,-55,-56,-57,-23,-1,-1,-9,-13,-14,-15,-58,-1,-11,-12,]),'Assign':([12,46,],[47,77,]),'Mul':([12,38,40,41,44,45,73,74,75,76,79,96,97,98,99,100,],[-60,70,-35,-36,-37,-59,-38,-60,-39,-40,-61,70,70,-55,-56,-57,]),'Div':([12,38,40,41,44,45,73,74,75,76,79,96,97,98,99,100,],[-60,71,-35,-36,-37,-59,-38,-60,-39,-40,-61,71,71,-55,-56,-57,]),'Mod':([12,38,40,41,44,45,73,74,75,76,79,96,97,98,99,100,],[-60,72,-35,-36,-37,-59,-38,-60,-39,-40,-61,72,72,-55,-56,-57,]),'Plus':([12,37,38,40,41,44,45,73,74,75,76,79,92,93,94,95,96,97,98,99,100,],[-60,68,-34,-35,-36,-37,-59,-38,-60,-39,-40,-61,68,68,68,68,-53,-54,-55,-56,-57,]),'Less':([12,36,37,38,40,41,44,45,73,74,75,76,79,90,91,92,93,94,95,96,97,98,99,100,],[-60,64,-33,-34,-35,-36,-37,-59,-38,-60,-39,-40,-61,64,64,-49,-50,-51,-52,-53,-54,-55,-56,-57,]),'Greater':([12,36,37,38,40,41,44,45,73,74,75,76,79,90,91,92,93,94,95,96,97,98,99,100,],[-60,65,-33,-34,-35,-36,-37,-59,-38,-60,-39,-40,-61,65,65,-49,-50,-51,-52,-53,-54,-55,-56,-57,]),'LessEqual':([12,36,37,38,40,41,44,45,73,74,75,76,79,90,91,92,93,94,95,96,97,98,99,100,],[-60,66,-33,-34,-35,-36,-37,-59,-38,-60,-39,-40,-61,66,66,-49,-50,-51,-52,-53,-54,-55,-56,-57,]),'GreaterEqual':([12,36,37,38,40,41,44,45,73,74,75,76,79,90,91,92,93,94,95,96,97,98,99,100,],[-60,67,-33,-34,-35,-36,-37,-59,-38,-60,-39,-40,-61,67,67,-49,-50,-51,-52,-53,-54,-55,-56,-57,]),'NotEqual':([12,35,36,37,38,40,41,44,45,73,74,75,76,79,89,90,91,92,93,94,95,96,97,98,99,100,],[-60,62,-32,-33,-34,-35,-36,-37,-59,-38,-60,-39,-40,-61,62,-47,-48,-49,-50,-51,-52,-53,-54,-55,-56,-57,]),'Equal':([12,35,36,37,38,40,41,44,45,73,74,75,76,79,89,90,91,92,93,94,95,96,97,98,99,100,],[-60,63,-32,-33,-34,-35,-36,-37,-59,-38,-60,-39,-40,-61,63,-47,-48,-49,-50,-51,-52,-53,-54,-55,-56,-57,]),'BitAnd':([12,34,35,36,37,38,40,41,44,45,73,74,75,76,79,88,89,90,91,92,93,94,95,96,97,98,99,100,],[-60,61,-31,-32,-33,-34,-35,-36,-37,-59,-38,-60,-39,-40,-61,61,-46,-47,-48,-49,-50,-51,-52,-53,-54,-55,-56,-57,]),'Xor':([12,33,34,35,36,37,38,40,41,44,45,73,74,75,76,79,87,88,89,90,91,92,93,94,95,96,97,98,99,100,],[-60,60,-30,-31,-32,-33,-34,-35,-36,-37,-59,-38,-60,-39,-40,-61,60,-45,-46,-47,-48,-49,-50,-51,-52,-53,-54,-55,-56,-57,]),'BitOr':([12,32,33,34,35,36,37,38,40,41,44,45,73,74,75,76,79,86,87,88,89,90,91,92,93,94,95,96,97,98,99,100,],[-60,59,-29,-30,-31,-32,-33,-34,-35,-36,-37,-59,-38,-60,-39,-40,-61,59,-44,-45,-46,-47,-48,-49,-50,-51,-52,-53,-54,-55,-56,-57,]),'And':([12,31,32,33,34,35,36,37,38,40,41,44,45,73,74,75,76,79,85,86,87,88,89,90,91,92,93,94,95,96,97,98,99,100,],[-60,58,-28,-29,-30,-31,-32,-33,-34,-35,-36,-37,-59,-38,-60,-39,-40,-61,58,-43,-44,-45,-46,-47,-48,-49,-50,-51,-52,-53,-54,-55,-56,-57,]),'Question':([12,30,31,32,33,34,35,36,37,38,40,41,44,45,73,74,75,76,79,85,86,87,88,89,90,91,92,93,94,95,96,97,98,99,100,],[-60,56,-27,-28,-29,-30,-31,-32,-33,-34,-35,-36,-37,-59,-38,-60,-39,-40,-61,-42,-43,-44,-45,-46,-47,-48,-49,-50,-51,-52,-53,-54,-55,-56,-57,]),'Or':([12,30,31,32,33,34,35,36,37,38,40,41,44,45,73,74,75,76,79,85,86,87,88,89,90,91,92,93,94,95,96,97,98,99,100,],[-60,57,-27,-28,-29,-30,-31,-32,-33,-34,-35,-36,-37,-59,-38,-60,-39,-40,-61,-42,-43,-44,-45,-46,-47,-48,-49,-50,-51,-52,-53,-54,-55,-56,-57,]),'Colon':([12,28,29,30,31,32,33,34,35,36,37,38,40,41,44,45,73,74,75,76,78,79,84,85,86,87,88,89,90,91,92,93,94,95,96,97,98,99,100,109,],[-60,-24,-25,-26,-27,-28,-29,-30,-31,-32,-33,-34,-35,-36,-37,-59,-38,-60,-39,-40,-41,-61,104,-42,-43,-44,-45,-46,-47,-48,-49,-50,-51,-52,-53,-54,-55,-56,-57,-58,]),'Else':([54,55,80,83,105,107,111,],[-17,-19,-18,-16,110,-14,-11,]),}
+
+_lr_action = {}
+for _k, _v in _lr_action_items.items():
+   for _x,_y in zip(_v[0],_v[1]):
+      if not _x in _lr_action:  _lr_action[_x] = {}
+      _lr_action[_x][_k] = _y
+del _lr_action_items
+
+_lr_goto_items = {'program':([0,],[1,]),'function':([0,],[2,]),'type':([0,9,49,],[3,11,11,]),'block':([8,14,],[9,49,]),'empty':([8,9,14,49,102,103,110,],[10,27,10,27,27,27,27,]),'block_item':([9,49,],[16,16,]),'statement':([9,49,102,],[17,17,106,]),'declaration':([9,49,],[18,18,]),'statement_matched':([9,49,102,103,110,],[19,19,105,107,111,]),'statement_unmatched':([9,49,102,103,110,],[20,20,20,108,112,]),'expression':([9,13,24,47,49,51,52,56,77,102,103,110,],[21,48,53,78,21,81,82,84,101,21,21,21,]),'opt_expression':([9,49,102,103,110,],[25,25,25,25,25,]),'assignment':([9,13,24,47,49,51,52,56,77,102,103,110,],[28,28,28,28,28,28,28,28,28,28,28,28,]),'conditional':([9,13,24,47,49,51,52,56,77,102,103,104,110,],[29,29,29,29,29,29,29,29,29,29,29,109,29,]),'logical_or':([9,13,24,47,49,51,52,56,77,102,103,104,110,],[30,30,30,30,30,30,30,30,30,30,30,30,30,]),'logical_and':([9,13,24,47,49,51,52,56,57,77,102,103,104,110,],[31,31,31,31,31,31,31,31,85,31,31,31,31,31,]),'bit_or':([9,13,24,47,49,51,52,56,57,58,77,102,103,104,110,],[32,32,32,32,32,32,32,32,32,86,32,32,32,32,32,]),'xor':([9,13,24,47,49,51,52,56,57,58,59,77,102,103,104,110,],[33,33,33,33,33,33,33,33,33,33,87,33,33,33,33,33,]),'bit_and':([9,13,24,47,49,51,52,56,57,58,59,60,77,102,103,104,110,],[34,34,34,34,34,34,34,34,34,34,34,88,34,34,34,34,34,]),'equality':([9,13,24,47,49,51,52,56,57,58,59,60,61,77,102,103,104,110,],[35,35,35,35,35,35,35,35,35,35,35,35,89,35,35,35,35,35,]),'relational':([9,13,24,47,49,51,52,56,57,58,59,60,61,62,63,77,102,103,104,110,],[36,36,36,36,36,36,36,36,36,36,36,36,36,90,91,36,36,36,36,36,]),'additive':([9,13,24,47,49,51,52,56,57,58,59,60,61,62,63,64,65,66,67,77,102,103,104,110,],[37,37,37,37,37,37,37,37,37,37,37,37,37,37,37,92,93,94,95,37,37,37,37,37,]),'multiplicative':([9,13,24,47,49,51,52,56,57,58,59,60,61,62,63,64,65,66,67,68,69,77,102,103,104,110,],[38,38,38,38,38,38,38,38,38,38,38,38,38,38,38,38,38,38,38,96,97,38,38,38,38,38,]),'unary':([9,13,24,39,42,43,47,49,51,52,56,57,58,59,60,61,62,63,64,65,66,67,68,69,70,71,72,77,102,103,104,110,],[40,40,40,73,75,76,40,40,40,40,40,40,40,40,40,40,40,40,40,40,40,40,40,40,98,99,100,40,40,40,40,40,]),'postfix':([9,13,24,39,42,43,47,49,51,52,56,57,58,59,60,61,62,63,64,65,66,67,68,69,70,71,72,77,102,103,104,110,],[41,41,41,41,41,41,41,41,41,41,41,41,41,41,41,41,41,41,41,41,41,41,41,41,41,41,41,41,41,41,41,41,]),'primary':([9,13,24,39,42,43,47,49,51,52,56,57,58,59,60,61,62,63,64,65,66,67,68,69,70,71,72,77,102,103,104,110,],[44,44,44,44,44,44,44,44,44,44,44,44,44,44,44,44,44,44,44,44,44,44,44,44,44,44,44,44,44,44,44,44,]),}
+
+_lr_goto = {}
+for _k, _v in _lr_goto_items.items():
+   for _x, _y in zip(_v[0], _v[1]):
+       if not _x in _lr_goto: _lr_goto[_x] = {}
+       _lr_goto[_x][_k] = _y
+del _lr_goto_items
+_lr_productions = [
+  ("S' -> program","S'",1,None,None,None),
+  ('empty -> <empty>','empty',0,'p_empty','ply_parser.py',46),
+  ('program -> function','program',1,'p_program','ply_parser.py',53),
+  ('type -> Int','type',1,'p_type','ply_parser.py',60),
+  ('function -> type Identifier LParen RParen LBrace block RBrace','function',7,'p_function_def','ply_parser.py',67),
+  ('block -> block block_item','block',2,'p_block','ply_parser.py',74),
+  ('block -> empty','block',1,'p_block_empty','ply_parser.py',83),
+  ('block_item -> statement','block_item',1,'p_block_item','ply_parser.py',90),
+  ('block_item -> declaration Semi','block_item',2,'p_block_item','ply_parser.py',91),
+  ('statement -> statement_matched','statement',1,'p_statement','ply_parser.py',98),
+  ('statement -> statement_unmatched','statement',1,'p_statement','ply_parser.py',99),
+  ('statement_matched -> If LParen expression RParen statement_matched Else statement_matched','statement_matched',7,'p_if_else','ply_parser.py',106),
+  ('statement_unmatched -> If LParen expression RParen statement_matched Else statement_unmatched','statement_unmatched',7,'p_if_else','ply_parser.py',107),
+  ('statement_unmatched -> If LParen expression RParen statement','statement_unmatched',5,'p_if','ply_parser.py',114),
+  ('statement_matched -> While LParen expression RParen statement_matched','statement_matched',5,'p_while','ply_parser.py',121),
+  ('statement_unmatched -> While LParen expression RParen statement_unmatched','statement_unmatched',5,'p_while','ply_parser.py',122),
+  ('statement_matched -> Return expression Semi','statement_matched',3,'p_return','ply_parser.py',129),
+  ('statement_matched -> opt_expression Semi','statement_matched',2,'p_expression_statement','ply_parser.py',136),
+  ('statement_matched -> LBrace block RBrace','statement_matched',3,'p_block_statement','ply_parser.py',143),
+  ('statement_matched -> Break Semi','statement_matched',2,'p_break','ply_parser.py',150),
+  ('opt_expression -> expression','opt_expression',1,'p_opt_expression','ply_parser.py',157),
+  ('opt_expression -> empty','opt_expression',1,'p_opt_expression_empty','ply_parser.py',164),
+  ('declaration -> type Identifier','declaration',2,'p_declaration','ply_parser.py',171),
+  ('declaration -> type Identifier Assign expression','declaration',4,'p_declaration_init','ply_parser.py',178),
+  ('expression -> assignment','expression',1,'p_expression_precedence','ply_parser.py',185),
+  ('assignment -> conditional','assignment',1,'p_expression_precedence','ply_parser.py',186),
+  ('conditional -> logical_or','conditional',1,'p_expression_precedence','ply_parser.py',187),
+  ('logical_or -> logical_and','logical_or',1,'p_expression_precedence','ply_parser.py',188),
+  ('logical_and -> bit_or','logical_and',1,'p_expression_precedence','ply_parser.py',189),
+  ('bit_or -> xor','bit_or',1,'p_expression_precedence','ply_parser.py',190),
+  ('xor -> bit_and','xor',1,'p_expression_precedence','ply_parser.py',191),
+  ('bit_and -> equality','bit_and',1,'p_expression_precedence','ply_parser.py',192),
+  ('equality -> relational','equality',1,'p_expression_precedence','ply_parser.py',193),
+  ('relational -> additive','relational',1,'p_expression_precedence','ply_parser.py',194),
+  ('additive -> multiplicative','additive',1,'p_expression_precedence','ply_parser.py',195),
+  ('multiplicative -> unary','multiplicative',1,'p_expression_precedence','ply_parser.py',196),
+  ('unary -> postfix','unary',1,'p_expression_precedence','ply_parser.py',197),
+  ('postfix -> primary','postfix',1,'p_expression_precedence','ply_parser.py',198),
+  ('unary -> Minus unary','unary',2,'p_unary_expression','ply_parser.py',205),
+  ('unary -> BitNot unary','unary',2,'p_unary_expression','ply_parser.py',206),
+  ('unary -> Not unary','unary',2,'p_unary_expression','ply_parser.py',207),
+  ('assignment -> Identifier Assign expression','assignment',3,'p_binary_expression','ply_parser.py',214),
+  ('logical_or -> logical_or Or logical_and','logical_or',3,'p_binary_expression','ply_parser.py',215),
+  ('logical_and -> logical_and And bit_or','logical_and',3,'p_binary_expression','ply_parser.py',216),
+  ('bit_or -> bit_or BitOr xor','bit_or',3,'p_binary_expression','ply_parser.py',217),
+  ('xor -> xor Xor bit_and','xor',3,'p_binary_expression','ply_parser.py',218),
+  ('bit_and -> bit_and BitAnd equality','bit_and',3,'p_binary_expression','ply_parser.py',219),
+  ('equality -> equality NotEqual relational','equality',3,'p_binary_expression','ply_parser.py',220),
+  ('equality -> equality Equal relational','equality',3,'p_binary_expression','ply_parser.py',221),
+  ('relational -> relational Less additive','relational',3,'p_binary_expression','ply_parser.py',222),
+  ('relational -> relational Greater additive','relational',3,'p_binary_expression','ply_parser.py',223),
+  ('relational -> relational LessEqual additive','relational',3,'p_binary_expression','ply_parser.py',224),
+  ('relational -> relational GreaterEqual additive','relational',3,'p_binary_expression','ply_parser.py',225),
+  ('additive -> additive Plus multiplicative','additive',3,'p_binary_expression','ply_parser.py',226),
+  ('additive -> additive Minus multiplicative','additive',3,'p_binary_expression','ply_parser.py',227),
+  ('multiplicative -> multiplicative Mul unary','multiplicative',3,'p_binary_expression','ply_parser.py',228),
+  ('multiplicative -> multiplicative Div unary','multiplicative',3,'p_binary_expression','ply_parser.py',229),
+  ('multiplicative -> multiplicative Mod unary','multiplicative',3,'p_binary_expression','ply_parser.py',230),
+  ('conditional -> logical_or Question expression Colon conditional','conditional',5,'p_conditional_expression','ply_parser.py',237),
+  ('primary -> Integer','primary',1,'p_int_literal_expression','ply_parser.py',244),
+  ('primary -> Identifier','primary',1,'p_identifier_expression','ply_parser.py',251),
+  ('primary -> LParen expression RParen','primary',3,'p_brace_expression','ply_parser.py',258),
+]
@@ -8,9 +8,18 @@ Add your own parser rules on demand, which can be accomplished by:
     We're using this technique to build up the AST.
 
 Refer to https://www.dabeaz.com/ply/ply.html for more details.
+
+The LALR tables are pregenerated into `parsetab_<hash>.py` (run `python -m frontend.parser`),
+where the hash covers the tokens and all the grammar rules, so editing a rule never picks up stale tables.
+The parser itself is only built on first use.
 """
 
 
+import hashlib
+import importlib.util
+import os
+import sys
+
 import ply.yacc as yacc
 
 from frontend.ast.tree import *
@@ -266,5 +275,89 @@ def p_error(t):
     return parser.token()
 
 
-parser = yacc.yacc(start="program")
-parser.error_stack = error_stack  # type: ignore
+START = "program"
+
+
+def grammar_hash() -> str:
+    """
+    Hash of everything the LALR tables depend on: the start symbol, the tokens and the grammar rules.
+    """
+    module = sys.modules[__name__]
+    rules = sorted(
+        (f.__code__.co_firstlineno, f.__doc__ or "")
+        for name, f in vars(module).items()
+        if name.startswith("p_") and callable(f)
+    )
+    h = hashlib.sha1()
+    h.update(START.encode())
+    h.update(" ".join(tokens).encode())
+    for _, doc in rules:
+        h.update(doc.encode())
+    return h.hexdigest()[:16]
+
+
+TABMODULE = "parsetab_" + grammar_hash()
+
+
+def build_parser():
+    """
+    Load the pregenerated tables if they match the grammar, otherwise generate them in memory.
+    Nothing is written to the disk in either case.
+    """
+    module = sys.modules[__name__]
+    tabmodule = __package__ + "." + TABMODULE
+    if importlib.util.find_spec(tabmodule) is None:
+        print(
+            "Warning: {} not found, generating the LALR tables (run `python -m frontend.parser` to pregenerate them)".format(
+                TABMODULE
+            ),
+            file=sys.stderr,
+        )
+        return yacc.yacc(module=module, start=START, debug=False, write_tables=False)
+
+    return yacc.yacc(
+        module=module,
+        start=START,
+        tabmodule=tabmodule,
+        optimize=True,
+        debug=False,
+        write_tables=False,
+    )
+
+
+def write_tables() -> str:
+    """
+    Pregenerate the LALR tables next to this file, and remove the ones of older grammars.
+    """
+    outputdir = os.path.dirname(os.path.abspath(__file__))
+    for name in os.listdir(outputdir):
+        if name.startswith("parsetab_") and name != TABMODULE + ".py":
+            os.remove(os.path.join(outputdir, name))
+
+    yacc.yacc(
+        module=sys.modules[__name__],
+        start=START,
+        tabmodule=TABMODULE,
+        outputdir=outputdir,
+        debug=False,
+        write_tables=True,
+    )
+    return os.path.join(outputdir, TABMODULE + ".py")
+
+
+class _LazyParser:
+    """
+    Stands for the parser and builds it on first use, so that importing this module stays cheap.
+    """
+
+    def __init__(self) -> None:
+        self.error_stack = error_stack
+        self._parser = None
+
+    def __getattr__(self, name: str):
+        if self._parser is None:
+            self._parser = build_parser()
+        return getattr(self._parser, name)
+
+
+parser = _LazyParser()
@@ -1,8 +1,19 @@
 import argparse
+import io
+import json
+import os
 import sys
+from contextlib import redirect_stdout
+from functools import partial
+from typing import Optional, TextIO
 
 from backend.asm import Asm
+from backend.opt.inliner import Inliner
+from backend.opt.optimizer import Optimizer
 from backend.reg.bruteregalloc import BruteRegAlloc
+from backend.reg.graphregalloc import GraphRegAlloc
+from backend.reg.linearscanregalloc import LinearScanRegAlloc
+from backend.riscv.peephole import Peephole
 from backend.riscv.riscvasmemitter import RiscvAsmEmitter
 from frontend.ast.tree import Program
 from frontend.lexer import lexer
@@ -10,18 +21,99 @@ from frontend.parser import parser
 from frontend.tacgen.tacgen import TACGen
 from frontend.typecheck.namer import Namer
 from frontend.typecheck.typer import Typer
+from utils.error import DecafSyntaxErrors
+from utils.passtimer import timer
+from utils.stats import stats
 from utils.printtree import TreePrinter
 from utils.riscv import Riscv
 from utils.tac.tacprog import TACProg
 
 
+REG_ALLOCS = {
+    "brute": BruteRegAlloc,
+    "global": partial(BruteRegAlloc, globalAlloc=True),
+    "graph": GraphRegAlloc,
+    "linear": LinearScanRegAlloc,
+}
+
+
 def parseArgs():
     parser = argparse.ArgumentParser(description="MiniDecaf compiler")
     parser.add_argument("--input", type=str, help="the input C file")
     parser.add_argument("--parse", action="store_true", help="output parsed AST")
     parser.add_argument("--tac", action="store_true", help="output transformed TAC")
     parser.add_argument("--riscv", action="store_true", help="output generated RISC-V")
-    return parser.parse_args()
+    parser.add_argument("--output", type=str, help="write the output to this file instead of stdout")
+    parser.add_argument(
+        "--serve",
+        action="store_true",
+        help="keep running and compile one JSON request per line from stdin",
+    )
+    parser.add_argument(
+        "--batch",
+        type=str,
+        nargs="+",
+        metavar="PATH",
+        help="compile many C files (or all the C files under directories) in parallel",
+    )
+    parser.add_argument(
+        "--outdir", type=str, help="where to write the outputs of --batch (default: next to the inputs)"
+    )
+    parser.add_argument(
+        "--jobs", type=int, default=os.cpu_count(), help="number of worker processes for --batch"
+    )
+    parser.add_argument("-O", "--opt", action="store_true", help="optimize the TAC before generating RISC-V")
+    parser.add_argument(
+        "--regalloc",
+        choices=sorted(REG_ALLOCS),
+        default="brute",
+        help="the register allocator: brute (block by block), global (brute, but the values live across blocks stay in registers), "
+        "graph (graph coloring) or linear (linear scan)",
+    )
+    parser.add_argument(
+        "--time-passes",
+        nargs="?",
+        const="table",
+        choices=["table", "json"],
+        help="print the wall time, CPU time and peak memory of each phase to stderr, as a table or as JSON",
+    )
+    parser.add_argument(
+        "--peephole",
+        type=str,
+        help="the peephole rules to run on the RISC-V code, separated by commas, or all / none"
+        " (default: all with -O, none otherwise; rules: {})".format(", ".join(Peephole.RULES)),
+    )
+    parser.add_argument(
+        "--layout-profile",
+        type=str,
+        metavar="FILE",
+        help="a JSON file with the edge weights for the block layout of -O, "
+        'as {"func": {"from -> to": weight}} (default: estimated from the loops)',
+    )
+    parser.add_argument(
+        "--inline-threshold",
+        type=int,
+        default=Inliner.THRESHOLD,
+        metavar="N",
+        help="inline the calls (with -O) to the functions of at most N TAC instrs, "
+        "more in loops (default: %(default)s, 0 disables inlining)",
+    )
+    parser.add_argument("--stats", action="store_true", help="print what the optimizations did to stderr")
+    parser.add_argument(
+        "--print-spills", action="store_true", help="print the spill decisions of the register allocator to stderr"
+    )
+    args = parser.parse_args()
+    if args.peephole is not None:
+        unknown = set(args.peephole.split(",")) - set(Peephole.RULES) - {"all", "none", ""}
+        if unknown:
+            parser.error("unknown peephole rules: " + ", ".join(sorted(unknown)))
+    if args.layout_profile is not None:
+        try:
+            with open(args.layout_profile, "r") as f:
+                args.layout_profile = json.load(f)
+        except (OSError, ValueError) as e:
+            parser.error("can not read the layout profile: %s" % e)
+    return args
 
 
 def readCode(fileName):
@@ -29,66 +121,274 @@ def readCode(fileName):
         return f.read()
 
 
+# Clear the per-compilation state kept in module-level singletons,
+# so that several programs can be compiled in one process
+def resetState():
+    parser.error_stack.clear()
+    lexer.error_stack.clear()
+    lexer.lineno = 1
+    lexer.begin("INITIAL")
+    stats.clear()
+
+    for reg in Riscv.AllocatableRegs:
+        reg.used = False
+        reg.occupied = False
+        reg.temp = None
+
+
 # The parser stage: MiniDecaf code -> Abstract syntax tree
-def step_parse(args: argparse.Namespace):
-    code = readCode(args.input)
-    r: Program = parser.parse(code, lexer=lexer)
+def step_parse(code: str):
+    with timer.phase("parse"):
+        r: Program = parser.parse(code, lexer=lexer)
     errors = parser.error_stack
     if errors:
-        print("\n".join(map(str, errors)), file=sys.stderr)
-        exit(1)
+        raise DecafSyntaxErrors(errors)
 
     return r
 
 
 # IR generation stage: Abstract syntax tree -> Three-address code
 def step_tac(p: Program):
-    namer = Namer()
-    p = namer.transform(p)
-    typer = Typer()
-    p = typer.transform(p)
+    with timer.phase("namer"):
+        namer = Namer()
+        p = namer.transform(p)
+    with timer.phase("typer"):
+        typer = Typer()
+        p = typer.transform(p)
 
-    tacgen = TACGen()
-    tac_prog = tacgen.transform(p)
+    with timer.phase("tacgen"):
+        tacgen = TACGen()
+        tac_prog = tacgen.transform(p)
 
     return tac_prog
 
 
+# Optimization stage (only with -O): Three-address code -> Three-address code
+def step_opt(p: TACProg, args: argparse.Namespace):
+    return Optimizer.default(args.layout_profile, args.inline_threshold).transform(p)
+
+
+# the peephole rules are all on with -O, --peephole chooses them explicitly
+def peepholeFor(args: argparse.Namespace) -> Optional[Peephole]:
+    if args.peephole is None:
+        return Peephole() if args.opt else None
+    rules = [rule for rule in args.peephole.split(",") if rule]
+    if rules == ["none"]:
+        return None
+    return Peephole(None if rules == ["all"] else rules)
+
+
 # Target code generation stage: Three-address code -> RISC-V assembly code
-def step_asm(p: TACProg):
-    riscvAsmEmitter = RiscvAsmEmitter(Riscv.AllocatableRegs, Riscv.CallerSaved)
-    asm = Asm(riscvAsmEmitter, BruteRegAlloc(riscvAsmEmitter))
+# If sink is given, the code is written to it function by function and None is returned
+def step_asm(p: TACProg, args: argparse.Namespace, sink: Optional[TextIO] = None):
+    riscvAsmEmitter = RiscvAsmEmitter(Riscv.AllocatableRegs, Riscv.CallerSaved, sink, peepholeFor(args), args.opt)
+    regAlloc = REG_ALLOCS[args.regalloc](riscvAsmEmitter, spillLog=sys.stderr if args.print_spills else None)
+    asm = Asm(riscvAsmEmitter, regAlloc)
     prog = asm.transform(p)
     return prog
 
 # hope all of you happiness
 # enjoy potato chips
 
-def main():
-    args = parseArgs()
+# Compile one program and print the output selected by args to stdout,
+# or write it to the file object output
+def compileCode(code: str, args: argparse.Namespace, output: Optional[TextIO] = None):
+    resetState()
+    if args.time_passes:
+        timer.start()
+        try:
+            compileTarget(code, args, output)
+        finally:
+            timer.stop()
+            timer.report(sys.stderr, args.time_passes)
+    else:
+        compileTarget(code, args, output)
+    if args.stats:
+        stats.report(sys.stderr)
+
 
+def compileTarget(code: str, args: argparse.Namespace, output: Optional[TextIO] = None):
     def _parse():
-        r = step_parse(args)
+        r = step_parse(code)
         return r
 
     def _tac():
         tac = step_tac(_parse())
+        if args.opt:
+            tac = step_opt(tac, args)
         return tac
 
     def _asm():
-        asm = step_asm(_tac())
+        asm = step_asm(_tac(), args, output)
         return asm
 
     if args.riscv:
         prog = _asm()
-        print(prog)
+        if output is None:
+            print(prog)
     elif args.tac:
         prog = _tac()
-        prog.printTo()
+        with redirect_stdout(output or sys.stdout):
+            prog.printTo()
     elif args.parse:
         prog = _parse()
         printer = TreePrinter(indentLen=2)
-        printer.work(prog)
+        with redirect_stdout(output or sys.stdout):
+            printer.work(prog)
+
+
+# A copy of args that selects the output target ("riscv", "tac" or "parse") and keeps all the other options
+def withTarget(args: argparse.Namespace, target: str) -> argparse.Namespace:
+    return argparse.Namespace(
+        **{
+            **vars(args),
+            "riscv": target == "riscv",
+            "tac": target == "tac",
+            "parse": target == "parse",
+        }
+    )
+
+
+# Daemon mode: the lexer, the parser tables and all the modules stay loaded,
+# and each line of stdin is a JSON request like
+#     {"input": "a.c", "target": "riscv"}  or  {"source": "int main() ...", "target": "tac"}
+# where target is one of "riscv", "tac" and "parse" (default: the one given on the command line, or "riscv").
+# Each request is answered by one JSON line {"ok": true, "output": ...} or {"ok": false, "error": ...}.
+def serve(args: argparse.Namespace):
+    if args.tac:
+        defaultTarget = "tac"
+    elif args.parse:
+        defaultTarget = "parse"
+    else:
+        defaultTarget = "riscv"
+
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+
+        try:
+            request = json.loads(line)
+            target = request.get("target", defaultTarget)
+            if target not in ("riscv", "tac", "parse"):
+                raise ValueError("unknown target '%s'" % target)
+            if "source" in request:
+                code = request["source"]
+            else:
+                code = readCode(request["input"])
+
+            out = io.StringIO()
+            compileCode(code, withTarget(args, target), out)
+            response = {"ok": True, "output": out.getvalue()}
+        except Exception as e:
+            response = {"ok": False, "error": str(e) or type(e).__name__}
+
+        sys.stdout.write(json.dumps(response) + "\n")
+        sys.stdout.flush()
+
+
+BATCH_SUFFIXES = {"riscv": ".S", "tac": ".tac", "parse": ".ast"}
+
+
+# Compile one file of a batch, return the error message if it fails
+def compileFile(inputPath: str, outputPath: str, args: argparse.Namespace) -> Optional[str]:
+    try:
+        code = readCode(inputPath)
+        os.makedirs(os.path.dirname(outputPath) or ".", exist_ok=True)
+        with open(outputPath, "w") as f:
+            compileCode(code, args, f)
+    except Exception as e:
+        # do not leave a partial (or stale) output behind
+        if os.path.exists(outputPath):
+            os.remove(outputPath)
+        return str(e) or type(e).__name__
+
+    return None
+
+
+# Batch mode: collect all the inputs, compile them in a process pool and report the failures.
+# Results are collected in input order, so the report does not depend on which worker finishes first.
+def batch(args: argparse.Namespace):
+    if args.tac:
+        target = "tac"
+    elif args.parse:
+        target = "parse"
+    else:
+        target = "riscv"
+
+    # (input path, output path relative to outdir)
+    inputs: list[tuple[str, str]] = []
+    for path in args.batch:
+        if os.path.isdir(path):
+            for root, dirs, files in os.walk(path):
+                dirs.sort()
+                for name in sorted(files):
+                    if name.endswith(".c"):
+                        fileName = os.path.join(root, name)
+                        inputs.append((fileName, os.path.relpath(fileName, path)))
+        else:
+            inputs.append((path, os.path.basename(path)))
+
+    def outputPathOf(inputPath: str, relPath: str) -> str:
+        base = os.path.join(args.outdir, relPath) if args.outdir else inputPath
+        return os.path.splitext(base)[0] + BATCH_SUFFIXES[target]
+
+    # the outputs are known before any job starts: an input whose output is taken by an earlier one is not compiled
+    outputs = [outputPathOf(inputPath, relPath) for inputPath, relPath in inputs]
+    errors: list[Optional[str]] = [None] * len(inputs)
+    owners: dict[str, int] = {}
+    for i, output in enumerate(outputs):
+        owner = owners.setdefault(os.path.abspath(output), i)
+        if owner != i:
+            errors[i] = "{} is also the output of {}".format(output, inputs[owner][0])
+    todo = [i for i, error in enumerate(errors) if error is None]
+
+    # imported here, since it takes a noticeable part of the startup time of a single compilation
+    from concurrent.futures import ProcessPoolExecutor
+
+    jobs = max(1, min(args.jobs or 1, len(todo) or 1))
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        results = pool.map(
+            compileFile,
+            [inputs[i][0] for i in todo],
+            [outputs[i] for i in todo],
+            [withTarget(args, target)] * len(todo),
+            chunksize=max(1, len(todo) // (jobs * 4)),
+        )
+        for i, error in zip(todo, results):
+            errors[i] = error
+
+    failures = [(inputPath, error) for (inputPath, _), error in zip(inputs, errors) if error is not None]
+    for inputPath, error in failures:
+        print("{}: {}".format(inputPath, error), file=sys.stderr)
+    print(
+        "{} compiled, {} failed".format(len(inputs) - len(failures), len(failures)),
+        file=sys.stderr,
+    )
+    return len(failures) == 0
+
+
+def main():
+    args = parseArgs()
+
+    if args.serve:
+        serve(args)
+        return
+
+    if args.batch:
+        if not batch(args):
+            exit(1)
+        return
+
+    try:
+        code = readCode(args.input)
+        if args.output:
+            with open(args.output, "w") as f:
+                compileCode(code, args, f)
+        else:
+            compileCode(code, args)
+    except DecafSyntaxErrors as e:
+        print(e, file=sys.stderr)
+        exit(1)
 
     return
 
@@ -0,0 +1,202 @@
+from typing import Optional
+
+from backend.asm import Asm
+from backend.reg.regalloc import RegAlloc
+from backend.riscv.riscvasmemitter import RiscvAsmEmitter
+from backend.subroutineinfo import SubroutineInfo
+from tests import rvsim
+from utils.label.blocklabel import BlockLabel
+from utils.label.funclabel import FuncLabel
+from utils.label.label import Label, LabelKind
+from utils.riscv import Riscv, RvBinaryImmOp
+from utils.stats import stats
+from utils.tac.nativeinstr import NativeInstr
+from utils.tac.reg import Reg
+from utils.tac.tacfunc import TACFunc
+from utils.tac.tacinstr import *
+from utils.tac.tacop import CondBranchOp, TacBinaryOp
+from utils.tac.tacprog import TACProg
+from utils.tac.temp import Temp
+
+"""
+helpers: build TAC by hand and compile it, for the tests
+
+The frontend only accepts constant expressions so far, so the tests of the passes build their input with FuncBuilder
+(like TACFuncEmitter: the params are the first temps, and the labels are numbered across the program).
+"""
+
+
+class FuncBuilder:
+    labelUsed = 0
+
+    def __init__(self, name: str, numArgs: int = 0) -> None:
+        self.func = TACFunc(FuncLabel(name), numArgs)
+        self.func.add(Mark(self.func.entry))
+        self.params = [self.temp() for _ in range(numArgs)]
+
+    def temp(self) -> Temp:
+        temp = Temp(self.func.tempUsed)
+        self.func.tempUsed += 1
+        return temp
+
+    def label(self) -> BlockLabel:
+        FuncBuilder.labelUsed += 1
+        return BlockLabel(str(FuncBuilder.labelUsed))
+
+    def add(self, instr: TACInstr) -> TACInstr:
+        self.func.add(instr)
+        return instr
+
+    def load(self, value: int) -> Temp:
+        temp = self.temp()
+        self.add(LoadImm4(temp, value))
+        return temp
+
+    def binary(self, op: TacBinaryOp, lhs: Temp, rhs: Temp) -> Temp:
+        temp = self.temp()
+        self.add(Binary(op, temp, lhs, rhs))
+        return temp
+
+    def call(self, name: str, args: list[Temp], result: bool = True) -> Optional[Temp]:
+        temp = self.temp() if result else None
+        self.add(Call(temp, FuncLabel(name), args))
+        return temp
+
+    def mark(self, label: BlockLabel) -> None:
+        self.add(Mark(label))
+
+    def branch(self, label: BlockLabel) -> None:
+        self.add(Branch(label))
+
+    def branchIfZero(self, cond: Temp, label: BlockLabel) -> None:
+        self.add(CondBranch(CondBranchOp.BEQ, cond, label))
+
+    def branchIfNonZero(self, cond: Temp, label: BlockLabel) -> None:
+        self.add(CondBranch(CondBranchOp.BNE, cond, label))
+
+    def ret(self, value: Optional[Temp] = None) -> None:
+        self.add(Return(value))
+
+    def end(self) -> TACFunc:
+        return self.func
+
+
+def lines(func: TACFunc) -> list[str]:
+    return [str(instr) for instr in func.instrSeq]
+
+
+# the asm of prog, as step_asm prints it
+def compileProg(prog: TACProg, regAlloc: type, shrinkWrap: bool = False) -> str:
+    stats.clear()
+    emitter = RiscvAsmEmitter(Riscv.AllocatableRegs, Riscv.CallerSaved, shrinkWrap=shrinkWrap)
+    alloc: RegAlloc = regAlloc(emitter)
+    return Asm(emitter, alloc).transform(prog)
+
+
+# the asm of main with the native instrs buf as its body (RiscvSubroutineEmitter.emitEnd adds the frame)
+def emitNative(buf: list[NativeInstr], shrinkWrap: bool = False) -> str:
+    stats.clear()
+    emitter = RiscvAsmEmitter(Riscv.AllocatableRegs, Riscv.CallerSaved, shrinkWrap=shrinkWrap)
+    subEmitter = emitter.emitSubroutine(SubroutineInfo(FuncLabel("main")))
+    subEmitter.buf = list(buf)
+    subEmitter.emitEnd()
+    return emitter.emitEnd()
+
+
+# the native label and the label itself (main_exit is the label of the epilogue)
+def nativeLabel(name: str) -> tuple[NativeInstr, Label]:
+    label = Label(LabelKind.TEMP, name)
+    return Riscv.RiscvLabel(label).toNative([], []), label
+
+
+def li(reg: Reg, value: int) -> NativeInstr:
+    return Riscv.LoadImm(reg, value).toNative([reg], [])
+
+
+def addi(dst: Reg, src: Reg, imm: int) -> NativeInstr:
+    return Riscv.BinaryImm(RvBinaryImmOp.ADDI, dst, src, imm).toNative([dst], [src])
+
+
+# the lines of asm without the comments and the directives
+def asmLines(asm: str) -> list[str]:
+    lines = [line.split("#")[0].strip() for line in asm.splitlines()]
+    return [line for line in lines if line and not line.startswith(".")]
+
+
+# main with n values which are all live at once (more than the allocatable regs for a large n), each copied by a move:
+#     cnt = 3 and k = 2 computed by loops (so they are not constants), v_i = cnt * (7 * i + 1), w_i = v_i,
+#     return the w_i folded by acc = acc * 3 + w_i, from acc = k
+# the value returned is pressureResult(n)
+def pressureProg(n: int) -> TACProg:
+    b = FuncBuilder("main")
+    cnt = counted(b, 3)
+    values = [b.binary(TacBinaryOp.MUL, cnt, b.load(7 * i + 1)) for i in range(n)]
+    copies = []
+    for value in values:
+        copy = b.temp()
+        b.add(Assign(copy, value))
+        copies.append(copy)
+    acc = counted(b, 2)
+    for copy in reversed(copies):
+        acc = b.binary(TacBinaryOp.ADD, b.binary(TacBinaryOp.MUL, acc, b.load(3)), copy)
+    b.ret(acc)
+    return TACProg([b.end()])
+
+
+def pressureResult(n: int) -> int:
+    acc = 2
+    for i in reversed(range(n)):
+        acc = (acc * 3 + 3 * (7 * i + 1)) & 0xFFFFFFFF
+    return acc - (1 << 32) if acc & 0x80000000 else acc
+
+
+# a temp counted up from 0 to n by a loop
+def counted(b: FuncBuilder, n: int) -> Temp:
+    counter = b.load(0)
+    loop, done = b.label(), b.label()
+    b.mark(loop)
+    b.branchIfZero(b.binary(TacBinaryOp.SLT, counter, b.load(n)), done)
+    b.add(Binary(TacBinaryOp.ADD, counter, counter, b.load(1)))
+    b.branch(loop)
+    b.mark(done)
+    return counter
+
+
+# regAlloc which keeps the allocator of the last compileProg in the class attribute last
+# (its state is that of the last round of the allocation)
+def recording(regAlloc: type) -> type:
+    class Recording(regAlloc):
+        def __init__(self, *args, **kwargs) -> None:
+            super().__init__(*args, **kwargs)
+            Recording.last = self
+
+    Recording.__name__ = "Recording" + regAlloc.__name__
+    return Recording
+
+
+# the tests shared by the allocators, mixed into a unittest.TestCase which gives
+#     regAlloc: an allocator made by recording
+#     spilled(alloc): whether alloc spilled any temp
+#     assertValidAllocation(alloc): no two temps live at once share a reg in the last round of alloc
+class PressureTests:
+    regAlloc: type
+
+    def compile(self, n: int) -> tuple[str, RegAlloc]:
+        asm = compileProg(pressureProg(n), self.regAlloc)
+        return asm, self.regAlloc.last
+
+    def testNoPressure(self):
+        asm, alloc = self.compile(5)
+        self.assertEqual(rvsim.run(asm)[0], pressureResult(5))
+        self.assertFalse(self.spilled(alloc))
+        self.assertValidAllocation(alloc)
+
+    def testSpill(self):
+        n = 60
+        asm, alloc = self.compile(n)
+        self.assertGreater(n, len(Riscv.AllocatableRegs))
+        self.assertEqual(rvsim.run(asm)[0], pressureResult(n))
+        self.assertTrue(self.spilled(alloc))
+        self.assertIn("sw", asm)
+        self.assertIn("lw", asm)
+        self.assertValidAllocation(alloc)
@@ -0,0 +1,187 @@
+import random
+import re
+
+"""
+rvsim: a small interpreter of the RV32IM assembly printed by the backend, for the tests
+
+run starts at main with ra pointing outside the program and returns a0 when main returns there.
+It also checks what a caller relies on: sp and the callee-saved regs are restored, and the stack is only
+accessed between sp and the sp of the caller.
+"""
+
+MASK = 0xFFFFFFFF
+RETURN_ADDRESS = 0xDEAD0000
+STACK_TOP = 0x7FFF0000
+
+REGS = {"zero": 0, "x0": 0, "ra": 1, "sp": 2, "gp": 3, "tp": 4, "t0": 5, "t1": 6, "t2": 7, "fp": 8, "s0": 8, "s1": 9}
+REGS.update({"a%d" % i: 10 + i for i in range(8)})
+REGS.update({"s%d" % i: 16 + i for i in range(2, 12)})
+REGS.update({"t%d" % i: 25 + i for i in range(3, 7)})
+CALLEE_SAVED = [8, 9] + list(range(18, 28))
+
+
+class SimError(Exception):
+    pass
+
+
+def signed(value: int) -> int:
+    value &= MASK
+    return value - (1 << 32) if value & 0x80000000 else value
+
+
+def parse(asm: str) -> tuple[list[tuple[str, list[str]]], dict[str, int]]:
+    instrs = []
+    labels = {}
+    for line in asm.splitlines():
+        line = line.split("#")[0].strip()
+        if not line or line.startswith("."):
+            continue
+        match = re.match(r"^([A-Za-z_.$][\w.$]*):\s*(.*)$", line)
+        if match:
+            labels[match.group(1)] = len(instrs)
+            line = match.group(2).strip()
+            if not line:
+                continue
+        parts = line.split(None, 1)
+        args = [arg.strip() for arg in parts[1].split(",")] if len(parts) > 1 else []
+        instrs.append((parts[0], args))
+    return instrs, labels
+
+
+def binary(op: str, x: int, y: int) -> int:
+    sx, sy = signed(x), signed(y)
+    if op == "div":
+        if sy == 0:
+            return -1
+        if sx == -(2**31) and sy == -1:
+            return sx
+        quotient = abs(sx) // abs(sy)
+        return quotient if (sx < 0) == (sy < 0) else -quotient
+    if op == "rem":
+        if sy == 0:
+            return sx
+        if sx == -(2**31) and sy == -1:
+            return 0
+        return abs(sx) % abs(sy) * (1 if sx >= 0 else -1)
+    return {
+        "add": lambda: x + y,
+        "sub": lambda: x - y,
+        "mul": lambda: sx * sy,
+        "mulh": lambda: (sx * sy) >> 32,
+        "mulhu": lambda: (x * y) >> 32,
+        "divu": lambda: MASK if y == 0 else x // y,
+        "remu": lambda: x if y == 0 else x % y,
+        "slt": lambda: int(sx < sy),
+        "sltu": lambda: int(x < y),
+        "and": lambda: x & y,
+        "or": lambda: x | y,
+        "xor": lambda: x ^ y,
+        "sll": lambda: x << (y & 31),
+        "srl": lambda: x >> (y & 31),
+        "sra": lambda: sx >> (y & 31),
+    }[op]()
+
+
+BINARY_IMM = {"addi": "add", "slti": "slt", "sltiu": "sltu", "andi": "and", "ori": "or", "xori": "xor"}
+SHIFT_IMM = {"slli": "sll", "srli": "srl", "srai": "sra"}
+UNARY = {
+    "mv": lambda x: x,
+    "neg": lambda x: -x,
+    "not": lambda x: ~x,
+    "seqz": lambda x: int(x == 0),
+    "snez": lambda x: int(x != 0),
+    "sgtz": lambda x: int(signed(x) > 0),
+    "sltz": lambda x: int(signed(x) < 0),
+}
+BRANCH = {
+    "beq": lambda x, y: x == y,
+    "bne": lambda x, y: x != y,
+    "blt": lambda x, y: signed(x) < signed(y),
+    "bge": lambda x, y: signed(x) >= signed(y),
+    "bltu": lambda x, y: x < y,
+    "bgeu": lambda x, y: x >= y,
+}
+BRANCH_ZERO = {"beqz": "beq", "bnez": "bne", "bltz": "blt", "bgez": "bge"}
+
+
+# the value main returns, and the number of instrs executed
+def run(asm: str, maxSteps: int = 1_000_000) -> tuple[int, int]:
+    instrs, labels = parse(asm)
+    regs = [0] * 32
+    # the regs hold garbage, so a value read before it is written is noticed
+    rng = random.Random(0)
+    for i in range(3, 32):
+        regs[i] = rng.randrange(1 << 31)
+    regs[1] = RETURN_ADDRESS
+    regs[2] = STACK_TOP
+    saved = {i: regs[i] for i in CALLEE_SAVED}
+    memory: dict[int, int] = {}
+
+    def get(name: str) -> int:
+        if name not in REGS:
+            raise SimError("unknown reg %s" % name)
+        return regs[REGS[name]]
+
+    def set(name: str, value: int) -> None:
+        if REGS[name] != 0:
+            regs[REGS[name]] = value & MASK
+
+    def imm12(text: str) -> int:
+        value = int(text, 0)
+        if not -2048 <= value <= 2047:
+            raise SimError("immediate %d does not fit in 12 bits" % value)
+        return value
+
+    def address(operand: str) -> int:
+        match = re.match(r"^(-?\w+)\((\w+)\)$", operand)
+        addr = (get(match.group(2)) + imm12(match.group(1))) & MASK
+        if addr % 4:
+            raise SimError("unaligned access at %x" % addr)
+        if not regs[2] <= addr < STACK_TOP:
+            raise SimError("access at %x outside the frame" % addr)
+        return addr
+
+    pc = labels["main"]
+    for steps in range(1, maxSteps + 1):
+        if pc >= len(instrs):
+            raise SimError("fell off the end of the program")
+        op, args = instrs[pc]
+        pc += 1
+        if op == "li":
+            set(args[0], int(args[1], 0))
+        elif op in UNARY:
+            set(args[0], UNARY[op](get(args[1])))
+        elif op in BINARY_IMM:
+            set(args[0], binary(BINARY_IMM[op], get(args[1]), imm12(args[2]) & MASK))
+        elif op in SHIFT_IMM:
+            set(args[0], binary(SHIFT_IMM[op], get(args[1]), int(args[2], 0)))
+        elif op in BRANCH:
+            if BRANCH[op](get(args[0]), get(args[1])):
+                pc = labels[args[2]]
+        elif op in BRANCH_ZERO:
+            if BRANCH[BRANCH_ZERO[op]](get(args[0]), 0):
+                pc = labels[args[1]]
+        elif op == "j":
+            pc = labels[args[0]]
+        elif op == "sw":
+            memory[address(args[1])] = get(args[0])
+        elif op == "lw":
+            addr = address(args[1])
+            if addr not in memory:
+                raise SimError("load of an uninitialized word at %x" % addr)
+            set(args[0], memory[addr])
+        elif op == "ret":
+            if regs[1] != RETURN_ADDRESS:
+                raise SimError("ra is changed")
+            if regs[2] != STACK_TOP:
+                raise SimError("sp is not restored")
+            for i in CALLEE_SAVED:
+                if regs[i] != saved[i]:
+                    raise SimError("callee-saved x%d is not restored" % i)
+            return signed(regs[10]), steps
+        else:
+            try:
+                set(args[0], binary(op, get(args[1]), get(args[2])))
+            except KeyError:
+                raise SimError("unknown instr %s" % op)
+    raise SimError("no return after %d steps" % maxSteps)
@@ -0,0 +1,42 @@
+import unittest
+
+from backend.reg.graphregalloc import GraphRegAlloc
+from tests.helpers import PressureTests, recording
+
+"""
+GraphRegAlloc under register pressure (PressureTests), and the checks of its interference graph and coalescing
+"""
+
+
+class GraphRegAllocTest(PressureTests, unittest.TestCase):
+    regAlloc = recording(GraphRegAlloc)
+
+    def spilled(self, alloc: GraphRegAlloc) -> bool:
+        return bool(alloc.spillTemps)
+
+    # no two interfering nodes share a color, and a coalesced node has the color of its alias
+    def assertValidAllocation(self, alloc: GraphRegAlloc) -> None:
+        self.assertFalse(alloc.spilledNodes)
+        for u, v in alloc.adjSet:
+            u, v = alloc.getAlias(u), alloc.getAlias(v)
+            if u != v and u in alloc.color and v in alloc.color:
+                self.assertIsNot(alloc.color[u], alloc.color[v], "_T%d and _T%d interfere" % (u, v))
+        for index in alloc.coalescedNodes:
+            self.assertIs(alloc.color[index], alloc.color[alloc.getAlias(index)])
+
+    def testSpillTempsAreNotSpilledAgain(self):
+        # the last round colors the short temps made by the rewrite of the spilled ones
+        _, alloc = self.compile(60)
+        self.assertTrue(alloc.spillTemps)
+        for index in alloc.spillTemps:
+            self.assertIn(index, alloc.color)
+
+    def testCoalesced(self):
+        # the copies w_i = v_i are coalesced, with or without spills
+        for n in (5, 60):
+            _, alloc = self.compile(n)
+            self.assertTrue(alloc.coalescedMoves)
+
+
+if __name__ == "__main__":
+    unittest.main()
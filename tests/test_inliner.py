@@ -0,0 +1,197 @@
+import unittest
+
+from backend.opt.inliner import Inliner
+from backend.reg.graphregalloc import GraphRegAlloc
+from tests import rvsim
+from tests.helpers import FuncBuilder, compileProg, lines
+from utils.label.funclabel import FuncLabel
+from utils.tac.tacfunc import TACFunc
+from utils.tac.tacinstr import Assign, Call
+from utils.tac.tacop import TacBinaryOp
+from utils.tac.tacprog import TACProg
+
+"""
+Inliner on hand-built TAC (TACGen emits no calls yet)
+
+add(a, b) = a + b is 2 instrs long, abs(a) (with a branch and two returns) 7 instrs long.
+"""
+
+
+def addFunc() -> TACFunc:
+    f = FuncBuilder("add", 2)
+    a, b = f.params
+    f.ret(f.binary(TacBinaryOp.ADD, a, b))
+    return f.end()
+
+
+def absFunc() -> TACFunc:
+    f = FuncBuilder("abs", 1)
+    (a,) = f.params
+    positive = f.label()
+    f.branchIfZero(f.binary(TacBinaryOp.SLT, a, f.load(0)), positive)
+    f.ret(f.binary(TacBinaryOp.SUB, f.load(0), a))
+    f.mark(positive)
+    f.ret(a)
+    return f.end()
+
+
+# f(n) calls g(n - 1) and g(n) calls f(n - 1) (or f calls itself, without g), main calls f(3)
+def recursiveProg(withG: bool) -> TACProg:
+    funcs = []
+    for name, callee in [("f", "g"), ("g", "f")] if withG else [("f", "f")]:
+        f = FuncBuilder(name, 1)
+        f.ret(f.call(callee, [f.binary(TacBinaryOp.SUB, f.params[0], f.load(1))]))
+        funcs.append(f.end())
+    main = FuncBuilder("main")
+    main.ret(main.call("f", [main.load(3)]))
+    return TACProg(funcs + [main.end()])
+
+
+def calls(func: TACFunc) -> list[str]:
+    return [instr.func.func for instr in func.instrSeq if isinstance(instr, Call)]
+
+
+class InlinerTest(unittest.TestCase):
+    def testInlinedSequence(self):
+        main = FuncBuilder("main")
+        x, y = main.load(1), main.load(2)
+        main.ret(main.call("add", [x, y]))
+        prog = Inliner().transform(TACProg([addFunc(), main.end()]))
+        # the args are copied to new temps for the params, the return becomes a copy and a jump to the end
+        self.assertEqual(
+            lines(prog.funcs[1]),
+            [
+                "FUNCTION<main>:",
+                "_T0 = 1",
+                "_T1 = 2",
+                "_T3 = _T0",
+                "_T4 = _T1",
+                "_T5 = (_T3 + _T4)",
+                "_T2 = _T5",
+                "branch _Lmain_1",
+                "_Lmain_1:",
+                "return _T2",
+            ],
+        )
+        self.assertEqual(prog.funcs[1].tempUsed, 6)
+
+    def testLabelsRenamed(self):
+        main = FuncBuilder("main")
+        first = main.call("abs", [main.load(-3)])
+        main.ret(main.call("abs", [first]))
+        callee = absFunc()
+        prog = Inliner().transform(TACProg([callee, main.end()]))
+        # each copy has labels of its own and one for its end, the returns of abs jump to the end
+        self.assertEqual(
+            lines(prog.funcs[1]),
+            [
+                "FUNCTION<main>:",
+                "_T0 = -3",
+                "_T3 = _T0",
+                "_T4 = 0",
+                "_T5 = (_T3 < _T4)",
+                "if (_T5 == 0) branch _Lmain_2",
+                "_T6 = 0",
+                "_T7 = (_T6 - _T3)",
+                "_T1 = _T7",
+                "branch _Lmain_1",
+                "_Lmain_2:",
+                "_T1 = _T3",
+                "branch _Lmain_1",
+                "_Lmain_1:",
+                "_T8 = _T1",
+                "_T9 = 0",
+                "_T10 = (_T8 < _T9)",
+                "if (_T10 == 0) branch _Lmain_4",
+                "_T11 = 0",
+                "_T12 = (_T11 - _T8)",
+                "_T2 = _T12",
+                "branch _Lmain_3",
+                "_Lmain_4:",
+                "_T2 = _T8",
+                "branch _Lmain_3",
+                "_Lmain_3:",
+                "return _T2",
+            ],
+        )
+        # no call is left, so the backend can compile it: abs(abs(-3)) = 3
+        self.assertEqual(rvsim.run(compileProg(prog, GraphRegAlloc))[0], 3)
+
+    def testSelfRecursion(self):
+        prog = Inliner().transform(recursiveProg(False))
+        f, main = prog.funcs
+        # f is not inlined into itself, but it is inlined (once) into main
+        self.assertEqual(lines(f), ["FUNCTION<f>:", "_T1 = 1", "_T2 = (_T0 - _T1)", "_T3 = call f(_T2)", "return _T3"])
+        self.assertEqual(
+            lines(main),
+            [
+                "FUNCTION<main>:",
+                "_T0 = 3",
+                "_T2 = _T0",
+                "_T3 = 1",
+                "_T4 = (_T2 - _T3)",
+                "_T5 = call f(_T4)",
+                "_T1 = _T5",
+                "branch _Lmain_1",
+                "_Lmain_1:",
+                "return _T1",
+            ],
+        )
+
+    def testRecursiveSCC(self):
+        prog = Inliner().transform(recursiveProg(True))
+        f, g, main = prog.funcs
+        # f and g call each other, so neither is inlined into the other
+        self.assertEqual(calls(f), ["g"])
+        self.assertEqual(calls(g), ["f"])
+        self.assertEqual(len(f.instrSeq), 5)
+        self.assertEqual(len(g.instrSeq), 5)
+        # main is not in their SCC, so f is inlined into it, leaving the call of g
+        self.assertEqual(calls(main), ["g"])
+
+    def testZeroThreshold(self):
+        main = FuncBuilder("main")
+        main.ret(main.call("add", [main.load(1), main.load(2)]))
+        prog = TACProg([addFunc(), main.end()])
+        before = lines(prog.funcs[1])
+        Inliner(0).transform(prog)
+        self.assertEqual(lines(prog.funcs[1]), before)
+
+    def testLoopBonus(self):
+        # add is 2 instrs long: over the threshold 1 outside the loop, within 1 * LOOP_BONUS inside it
+        main = FuncBuilder("main")
+        outside = main.call("add", [main.load(1), main.load(2)])
+        i = main.temp()
+        main.add(Assign(i, main.load(0)))
+        loop, done = main.label(), main.label()
+        main.mark(loop)
+        main.branchIfZero(main.binary(TacBinaryOp.SLT, i, main.load(4)), done)
+        main.add(Call(i, FuncLabel("add"), [i, outside]))
+        main.branch(loop)
+        main.mark(done)
+        main.ret(i)
+        prog = Inliner(1).transform(TACProg([addFunc(), main.end()]))
+        seq = lines(prog.funcs[1])
+        self.assertEqual(calls(prog.funcs[1]), ["add"])
+        self.assertIn("_T2 = call add(_T0, _T1)", seq)
+        self.assertEqual(
+            seq[seq.index("%s:" % loop) :],
+            [
+                "%s:" % loop,
+                "_T5 = 4",
+                "_T6 = (_T3 < _T5)",
+                "if (_T6 == 0) branch %s" % done,
+                "_T7 = _T3",
+                "_T8 = _T2",
+                "_T9 = (_T7 + _T8)",
+                "_T3 = _T9",
+                "branch _Lmain_1",
+                "_Lmain_1:",
+                "branch %s" % loop,
+                "%s:" % done,
+                "return _T3",
+            ],
+        )
+
+if __name__ == "__main__":
+    unittest.main()
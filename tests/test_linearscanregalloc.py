@@ -0,0 +1,82 @@
+import unittest
+
+from backend.reg.linearscanregalloc import LinearScanRegAlloc
+from backend.riscv.riscvasmemitter import RiscvAsmEmitter
+from tests.helpers import PressureTests, recording
+from utils.riscv import Riscv
+
+"""
+LinearScanRegAlloc under register pressure (PressureTests), and the checks of its intervals
+"""
+
+
+class RecordingLinearScanRegAlloc(recording(LinearScanRegAlloc)):
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.rounds = []
+
+    # every round of scan: the intervals, the fixed ranges, the regs given and the temps spilled
+    def scan(self, intervals, fixed, hints, spillTemps):
+        regs, spilled = super().scan(intervals, fixed, hints, spillTemps)
+        self.rounds.append((intervals, fixed, regs, spilled))
+        return regs, spilled
+
+
+class LinearScanRegAllocTest(PressureTests, unittest.TestCase):
+    regAlloc = RecordingLinearScanRegAlloc
+
+    def spilled(self, alloc: RecordingLinearScanRegAlloc) -> bool:
+        return len(alloc.rounds) > 1
+
+    # no two overlapping intervals share a reg, and no interval overlaps a fixed range of its reg
+    def assertValidAllocation(self, alloc: RecordingLinearScanRegAlloc) -> None:
+        intervals, fixed, regs, spilled = alloc.rounds[-1]
+        self.assertFalse(spilled)
+        for i, (start, end, index) in enumerate(intervals):
+            reg = regs[index]
+            for fixedStart, fixedEnd in fixed.get(reg.index, ()):
+                self.assertFalse(fixedStart <= end and start <= fixedEnd, "_T%d overlaps %s" % (index, reg))
+            for otherStart, otherEnd, other in intervals[i + 1 :]:
+                if otherStart > end:
+                    break
+                self.assertIsNot(reg, regs[other], "_T%d and _T%d overlap" % (index, other))
+
+    def testHintedMoves(self):
+        # the copy w_i = v_i gets the reg of v_i when it is free, so most of the mv are gone
+        asm, _ = self.compile(5)
+        self.assertLess(asm.count("mv "), 5)
+
+
+# scan on hand-made intervals, with only t0 and a0 to give
+class ScanTest(unittest.TestCase):
+    def scan(self, intervals, fixed=None, spillTemps=()):
+        alloc = LinearScanRegAlloc(RiscvAsmEmitter(Riscv.AllocatableRegs, Riscv.CallerSaved))
+        alloc.colors = [Riscv.T0, Riscv.A0]
+        return alloc.scan(intervals, fixed or {}, {}, set(spillTemps))
+
+    def testSpillLast(self):
+        # _T3 ends after the active _T1 and _T2, so it is the one spilled
+        regs, spilled = self.scan([[0, 6, 1], [1, 6, 2], [4, 8, 3]])
+        self.assertEqual(spilled, {3})
+        self.assertEqual((regs[1], regs[2]), (Riscv.T0, Riscv.A0))
+
+    def testSpillTempEvicts(self):
+        # the spill temp _T3 takes the reg of the active _T2, though _T2 ends first
+        regs, spilled = self.scan([[0, 6, 1], [1, 6, 2], [4, 8, 3]], spillTemps=[3])
+        self.assertEqual(spilled, {2})
+        self.assertIs(regs[3], Riscv.A0)
+
+    def testSpillTempAvoidsFixed(self):
+        # a0 is written at 7, so the spill temp _T3 takes t0 from _T1 instead
+        regs, spilled = self.scan([[0, 6, 1], [1, 6, 2], [4, 8, 3]], {Riscv.A0.index: [(7, 7)]}, spillTemps=[3])
+        self.assertEqual(spilled, {1})
+        self.assertIs(regs[3], Riscv.T0)
+
+    def testSpillTempsOnly(self):
+        # all the active intervals are spill temps too, so no reg can be given to _T3
+        with self.assertRaises(AssertionError):
+            self.scan([[0, 6, 1], [1, 6, 2], [4, 8, 3]], spillTemps=[1, 2, 3])
+
+
+if __name__ == "__main__":
+    unittest.main()
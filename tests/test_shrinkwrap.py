@@ -0,0 +1,66 @@
+import unittest
+
+from tests import rvsim
+from tests.helpers import addi, asmLines, emitNative, li, nativeLabel
+from utils.riscv import Riscv, RvBranchOp
+from utils.stats import stats
+
+"""
+ShrinkWrap on hand-built native instrs, through RiscvSubroutineEmitter.emitEnd
+
+    li t1, 7; li a0, 0; li t0, n
+    bne t0, x0, _L1            the entry does not need the frame
+    sw t1, 0(sp); lw a0, 0(sp) only this block needs it (its slot)
+    j main_exit
+_L1:
+    addi a0, a0, 1; addi t0, t0, -1
+    bne t0, x0, _L1            the last block loops without the frame, then falls through to the epilogue
+main returns 7 if n == 0, n otherwise.
+"""
+
+
+def loopBuf(n: int) -> list:
+    loop, loopLabel = nativeLabel("_L1")
+    _, exitLabel = nativeLabel("main_exit")
+    return [
+        li(Riscv.T1, 7),
+        li(Riscv.A0, 0),
+        li(Riscv.T0, n),
+        Riscv.NativeBranch(RvBranchOp.BNE, Riscv.T0, Riscv.ZERO, loopLabel),
+        Riscv.NativeStoreWord(Riscv.T1, Riscv.SP, 0),
+        Riscv.NativeLoadWord(Riscv.A0, Riscv.SP, 0),
+        Riscv.NativeJump(exitLabel),
+        loop,
+        addi(Riscv.A0, Riscv.A0, 1),
+        addi(Riscv.T0, Riscv.T0, -1),
+        Riscv.NativeBranch(RvBranchOp.BNE, Riscv.T0, Riscv.ZERO, loopLabel),
+    ]
+
+
+class ShrinkWrapTest(unittest.TestCase):
+    def testCondJumpFallingIntoEpilogue(self):
+        lines = asmLines(emitNative(loopBuf(3), shrinkWrap=True))
+        self.assertEqual(stats.get("shrinkwrap", "prologues moved off the entry"), 1)
+        # the prologue is moved to the block using sp, and the loop returns without going through the epilogue
+        self.assertEqual(lines[lines.index("bne t0, x0, _L1") + 1], "addi sp, sp, -4")
+        end = lines.index("main_exit:")
+        self.assertEqual(lines[end - 2 : end], ["bne t0, x0, _L1", "ret"])
+
+    def testRuns(self):
+        for shrinkWrap in (False, True):
+            for n, expected in [(0, 7), (3, 3)]:
+                with self.subTest(shrinkWrap=shrinkWrap, n=n):
+                    self.assertEqual(rvsim.run(emitNative(loopBuf(n), shrinkWrap))[0], expected)
+
+    def testCondJumpToEpilogue(self):
+        # a block without the frame can not branch to the epilogue, so the prologue stays at the start
+        _, exitLabel = nativeLabel("main_exit")
+        buf = loopBuf(0)
+        buf[3] = Riscv.NativeBranch(RvBranchOp.BNE, Riscv.T0, Riscv.ZERO, exitLabel)
+        lines = asmLines(emitNative(buf, shrinkWrap=True))
+        self.assertEqual(lines[1], "addi sp, sp, -4")
+        self.assertEqual(rvsim.run(emitNative(buf, shrinkWrap=True))[0], 7)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,123 @@
+import unittest
+
+from backend.riscv.slotcoloring import StackSlotColoring
+from tests import rvsim
+from tests.helpers import addi, asmLines, emitNative, li, nativeLabel
+from utils.riscv import Riscv, RvBinaryOp, RvBranchOp
+from utils.stats import stats
+
+"""
+StackSlotColoring and the frame of RiscvSubroutineEmitter.emitEnd on hand-built native instrs
+
+The offsets of the slots in a buf are only their names (RiscvSubroutineEmitter.offsetOf), run gives the real ones.
+"""
+
+
+def add(dst, src0, src1):
+    return Riscv.Binary(RvBinaryOp.ADD, dst, src0, src1).toNative([dst], [src0, src1])
+
+
+# store 0 .. n - 1 to n slots, then load and add them all (so all the slots are live at once), and s1 = 5
+def manySlots(n: int) -> list:
+    buf = []
+    for i in range(n):
+        buf += [li(Riscv.T0, i), Riscv.NativeStoreWord(Riscv.T0, Riscv.SP, 4 * i)]
+    buf += [li(Riscv.S1, 5), Riscv.NativeMove(Riscv.A0, Riscv.S1)]
+    for i in range(n):
+        buf += [Riscv.NativeLoadWord(Riscv.T0, Riscv.SP, 4 * i), add(Riscv.A0, Riscv.A0, Riscv.T0)]
+    return buf
+
+
+def manySlotsResult(n: int) -> int:
+    return n * (n - 1) // 2 + 5
+
+
+# the offsets of the slot accesses (through sp) in buf
+def offsets(buf: list) -> list[int]:
+    return [instr.offset for instr in buf if StackSlotColoring.isSlotAccess(instr)]
+
+
+class SlotColoringTest(unittest.TestCase):
+    def testShared(self):
+        # slots 0 and 4 are live at once, slot 8 is stored after both are dead, slot 12 is never loaded
+        buf = [
+            li(Riscv.T0, 1),
+            Riscv.NativeStoreWord(Riscv.T0, Riscv.SP, 0),
+            Riscv.NativeStoreWord(Riscv.T0, Riscv.SP, 4),
+            Riscv.NativeLoadWord(Riscv.T1, Riscv.SP, 0),
+            Riscv.NativeLoadWord(Riscv.T2, Riscv.SP, 4),
+            Riscv.NativeStoreWord(Riscv.T1, Riscv.SP, 8),
+            Riscv.NativeStoreWord(Riscv.T1, Riscv.SP, 12),
+            Riscv.NativeLoadWord(Riscv.T2, Riscv.SP, 8),
+        ]
+        out, size = StackSlotColoring().run(buf)
+        a, b, a1, b1, c, d, c1 = offsets(out)
+        self.assertEqual(size, 8)
+        self.assertNotEqual(a, b)
+        self.assertEqual((a1, b1, c1), (a, b, c))
+        self.assertIn(c, (0, 4))
+        self.assertIn(d, (0, 4))
+        self.assertEqual(stats.get("slots", "stack slots shared"), 2)
+
+    def testLiveAcrossLoop(self):
+        # slot 0 is stored before the loop and loaded after it, slot 4 is stored and loaded in the loop
+        loop, loopLabel = nativeLabel("_L1")
+        buf = [
+            li(Riscv.T0, 3),
+            Riscv.NativeStoreWord(Riscv.T0, Riscv.SP, 0),
+            loop,
+            Riscv.NativeStoreWord(Riscv.T0, Riscv.SP, 4),
+            Riscv.NativeLoadWord(Riscv.T1, Riscv.SP, 4),
+            addi(Riscv.T0, Riscv.T0, -1),
+            Riscv.NativeBranch(RvBranchOp.BNE, Riscv.T0, Riscv.ZERO, loopLabel),
+            Riscv.NativeLoadWord(Riscv.A0, Riscv.SP, 0),
+        ]
+        out, size = StackSlotColoring().run(buf)
+        a, b, b1, a1 = offsets(out)
+        self.assertEqual(size, 8)
+        self.assertNotEqual(a, b)
+        self.assertEqual((a1, b1), (a, b))
+        self.assertEqual(rvsim.run(emitNative(buf))[0], 3)
+
+    def testFarSlots(self):
+        n = 600
+        out, size = StackSlotColoring().run(manySlots(n))
+        self.assertEqual(size, 4 * n)
+        # the slots near sp are still reached from sp
+        near = offsets(out)
+        self.assertEqual(len(near), 2 * 512)
+        self.assertTrue(all(Riscv.fitsImm(offset) for offset in near))
+        # the others through fp: li fp, offset; add fp, fp, sp; sw / lw r, 0(fp)
+        far = [i for i, instr in enumerate(out) if instr.srcs[-1:] == [Riscv.FP] and instr.dsts[:1] != [Riscv.FP]]
+        self.assertEqual(len(far), 2 * (n - 512))
+        seen = set()
+        for i in far:
+            self.assertEqual(out[i].offset, 0)
+            self.assertEqual(str(out[i - 2]).split(", ")[0], "li fp")
+            self.assertEqual(str(out[i - 1]), "add fp, fp, sp")
+            offset = int(str(out[i - 2]).split(", ")[1])
+            self.assertGreater(offset, 2047)
+            seen.add(offset)
+        # every slot has an offset of its own, since all of them are live at once
+        self.assertEqual(len(seen | set(near)), n)
+
+    def testLargeFrame(self):
+        n = 600
+        lines = asmLines(emitNative(manySlots(n)))
+        self.assertEqual(stats.get("frame", "large frames"), 1)
+        # fp (used for the far slots) and s1 are saved next to the old sp, then sp is moved by the slots through fp
+        prologue = ["addi sp, sp, -8", "sw fp, 0(sp)", "sw s1, 4(sp)", "li fp, %d" % (4 * n), "sub sp, sp, fp"]
+        epilogue = ["li fp, %d" % (4 * n), "add sp, sp, fp", "lw fp, 0(sp)", "lw s1, 4(sp)", "addi sp, sp, 8", "ret"]
+        self.assertEqual(lines[1:6], prologue)
+        self.assertEqual(lines[lines.index("main_exit:") + 1 :], epilogue)
+        self.assertEqual(rvsim.run(emitNative(manySlots(n)))[0], manySlotsResult(n))
+
+    def testSmallFrame(self):
+        lines = asmLines(emitNative(manySlots(3)))
+        self.assertEqual(lines[1:3], ["addi sp, sp, -16", "sw s1, 12(sp)"])
+        self.assertEqual(lines[lines.index("main_exit:") + 1 :], ["lw s1, 12(sp)", "addi sp, sp, 16", "ret"])
+        self.assertEqual(rvsim.run(emitNative(manySlots(3)))[0], manySlotsResult(3))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,154 @@
+import unittest
+from functools import partial
+
+from backend.dataflow.cfg import CFG
+from backend.dataflow.dominators import DominatorTree
+from backend.opt.ssapass import SSAPass
+from backend.reg.bruteregalloc import BruteRegAlloc
+from backend.reg.graphregalloc import GraphRegAlloc
+from backend.reg.linearscanregalloc import LinearScanRegAlloc
+from tests import rvsim
+from tests.helpers import FuncBuilder, compileProg
+from utils.tac.tacfunc import TACFunc
+from utils.tac.tacinstr import *
+from utils.tac.tacop import TacBinaryOp
+from utils.tac.tacprog import TACProg
+
+"""
+SSABuilder and SSADestructor on a real CFG, through the instr selector and the register allocators
+
+swapProg(n):
+    a = 1; b = 2; i = 0
+    L:  t = a; a = b; b = t; i = i + 1
+        if (i < n) branch L        the back edge is critical (L has two preds, the block two succs)
+        x = a * 10 + b; y = 100
+        if (x > 20) branch T       the fall-through to J is critical
+    J:  return x + y
+    T:  y = 200; branch J
+Once the copies are propagated in SSA form, the phis of a and b at L read each other on the back edge,
+so SSADestructor has to break the cycle of the swap.
+"""
+
+
+def swapProg(n: int) -> TACProg:
+    f = FuncBuilder("main")
+    a, b = f.load(1), f.load(2)
+    i = f.load(0)
+    loop, join, then = f.label(), f.label(), f.label()
+    f.mark(loop)
+    t = f.temp()
+    f.add(Assign(t, a))
+    f.add(Assign(a, b))
+    f.add(Assign(b, t))
+    f.add(Binary(TacBinaryOp.ADD, i, i, f.load(1)))
+    f.branchIfNonZero(f.binary(TacBinaryOp.SLT, i, f.load(n)), loop)
+    x = f.binary(TacBinaryOp.ADD, f.binary(TacBinaryOp.MUL, a, f.load(10)), b)
+    y = f.load(100)
+    f.branchIfNonZero(f.binary(TacBinaryOp.SGT, x, f.load(20)), then)
+    f.mark(join)
+    f.ret(f.binary(TacBinaryOp.ADD, x, y))
+    f.mark(then)
+    f.add(LoadImm4(y, 200))
+    f.branch(join)
+    return TACProg([f.end()])
+
+
+# after 4 swaps x = 12 (falls through to J), after 5 swaps x = 21 (goes through T)
+def swapResult(n: int) -> int:
+    return 112 if n % 2 == 0 else 221
+
+
+# the SSA form as it is, or with the copies propagated (every read of the dst of an Assign reads its src)
+class SSARoundTrip(SSAPass):
+    name = "ssa"
+
+    def __init__(self, propagate: bool) -> None:
+        self.propagate = propagate
+        self.phis: list[list[Phi]] = []
+
+    def transformSSA(self, func: TACFunc, graph: CFG, domTree: DominatorTree) -> None:
+        if self.propagate:
+            copies = {}
+            for bb in graph.iterator():
+                for loc in bb.iterator():
+                    if isinstance(loc.instr, Assign):
+                        copies[loc.instr.dst.index] = loc.instr.src
+            subst = {}
+            for index, src in copies.items():
+                while src.index in copies:
+                    src = copies[src.index]
+                subst[index] = src
+            for bb in graph.iterator():
+                bb.locs = [loc for loc in bb.locs if not isinstance(loc.instr, Assign)]
+                for loc in bb.iterator():
+                    loc.instr.replaceSrcs(subst)
+        for bb in graph.iterator():
+            phis = [loc.instr for loc in bb.iterator() if isinstance(loc.instr, Phi)]
+            if phis:
+                self.phis.append(phis)
+
+
+ALLOCS = [BruteRegAlloc, partial(BruteRegAlloc, globalAlloc=True), GraphRegAlloc, LinearScanRegAlloc]
+
+
+class SSATest(unittest.TestCase):
+    def assertRuns(self, prog: TACProg, expected: int) -> None:
+        for alloc in ALLOCS:
+            with self.subTest(alloc=alloc):
+                asm = compileProg(prog, alloc)
+                self.assertEqual(rvsim.run(asm)[0], expected)
+
+    def roundTrip(self, n: int, propagate: bool) -> tuple[TACProg, SSARoundTrip]:
+        ssa = SSARoundTrip(propagate)
+        return ssa.transform(swapProg(n)), ssa
+
+    def testNoPhisLeft(self):
+        for propagate in (False, True):
+            prog, _ = self.roundTrip(5, propagate)
+            seq = prog.funcs[0].instrSeq
+            self.assertFalse(any(isinstance(instr, Phi) for instr in seq))
+            written = {index for instr in seq for index in instr.getWritten()}
+            for instr in seq:
+                self.assertTrue(set(instr.getRead()) <= written, str(instr))
+
+    def testPhis(self):
+        _, ssa = self.roundTrip(5, False)
+        # the phis of a, b and i at L (t is dead there), and of y at J
+        self.assertEqual([len(phis) for phis in ssa.phis], [3, 1])
+
+    def testSwapCycle(self):
+        prog, ssa = self.roundTrip(5, True)
+        phis = ssa.phis[0]
+        back = max(phis[0].preds)
+        dsts = {phi.dst.index for phi in phis}
+        a, b = [phi for phi in phis if phi.srcFrom(back).index in dsts]
+        self.assertIs(a.srcFrom(back), b.dst)
+        self.assertIs(b.srcFrom(back), a.dst)
+
+        seq = prog.funcs[0].instrSeq
+        # the back edge is split: the CondBranch goes to a new block (after the function) with the copies
+        split = [i for i, instr in enumerate(seq) if isinstance(instr, Mark) and instr.label.name.startswith("_Lmain_")]
+        self.assertEqual(len(split), 1)
+        block = seq[split[0] + 1 :]
+        self.assertIsInstance(block[-1], Branch)
+        header = [instr.label for instr in seq if isinstance(instr, Mark)][1]
+        self.assertIs(block[-1].target, header)
+        # the swap takes three copies through a new temp, and i one more
+        copies = [instr for instr in block if isinstance(instr, Assign)]
+        self.assertEqual(len(copies), 4)
+        self.assertEqual(len({copy.dst.index for copy in copies}), 4)
+
+    def testRoundTripRuns(self):
+        for n in (4, 5):
+            for propagate in (False, True):
+                with self.subTest(n=n, propagate=propagate):
+                    prog, _ = self.roundTrip(n, propagate)
+                    self.assertRuns(prog, swapResult(n))
+
+    def testWithoutSSA(self):
+        for n in (4, 5):
+            self.assertRuns(swapProg(n), swapResult(n))
+
+
+if __name__ == "__main__":
+    unittest.main()
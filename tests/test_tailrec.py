@@ -0,0 +1,119 @@
+import unittest
+
+from backend.opt.optimizer import Optimizer
+from backend.opt.tailrec import TailRecursion
+from backend.reg.graphregalloc import GraphRegAlloc
+from tests import rvsim
+from tests.helpers import FuncBuilder, compileProg, lines
+from utils.tac.tacinstr import Assign, Call, Memo
+from utils.tac.tacop import TacBinaryOp
+from utils.tac.tacprog import TACProg
+
+"""
+TailRecursion on hand-built TAC (TACGen emits no calls yet)
+
+Every f(a, b) here returns b if a == 0, and otherwise calls itself in the way given by tail.
+"""
+
+
+# tail(f, a, b) adds the recursive call of f and what follows it
+def recursive(tail) -> TACProg:
+    f = FuncBuilder("f", 2)
+    a, b = f.params
+    done = f.label()
+    f.branchIfZero(a, done)
+    tail(f, a, b)
+    f.mark(done)
+    f.ret(b)
+    return TACProg([f.end()])
+
+
+class TailRecursionTest(unittest.TestCase):
+    def transform(self, prog: TACProg) -> list[str]:
+        TailRecursion().transform(prog)
+        return lines(prog.funcs[0])
+
+    def testCopiedValue(self):
+        # d = call f(a - 1, b); x = d; memo; return x
+        def tail(f, a, b):
+            d = f.call("f", [f.binary(TacBinaryOp.SUB, a, f.load(1)), b])
+            x = f.temp()
+            f.add(Assign(x, d))
+            f.add(Memo("x is d"))
+            f.ret(x)
+
+        self.assertEqual(
+            self.transform(recursive(tail)),
+            [
+                "FUNCTION<f>:",
+                "_Lf_1:",
+                "if (_T0 == 0) branch _L%d" % FuncBuilder.labelUsed,
+                "_T2 = 1",
+                "_T3 = (_T0 - _T2)",
+                "_T6 = _T3",
+                "_T7 = _T1",
+                "_T0 = _T6",
+                "_T1 = _T7",
+                "branch _Lf_1",
+                "_L%d:" % FuncBuilder.labelUsed,
+                "return _T1",
+            ],
+        )
+
+    def testBareReturn(self):
+        # call f(a - 1, b); return
+        def tail(f, a, b):
+            f.call("f", [f.binary(TacBinaryOp.SUB, a, f.load(1)), b], result=False)
+            f.ret()
+
+        seq = self.transform(recursive(tail))
+        self.assertEqual(seq[:2], ["FUNCTION<f>:", "_Lf_1:"])
+        self.assertEqual(seq[5:10], ["_T4 = _T3", "_T5 = _T1", "_T0 = _T4", "_T1 = _T5", "branch _Lf_1"])
+        self.assertNotIn("return", seq[:-1])
+
+    def testUnusedResult(self):
+        # d = call f(a - 1, b); return (the value of the call is dropped)
+        def tail(f, a, b):
+            f.call("f", [f.binary(TacBinaryOp.SUB, a, f.load(1)), b])
+            f.ret()
+
+        seq = self.transform(recursive(tail))
+        self.assertEqual(seq[5:10], ["_T5 = _T3", "_T6 = _T1", "_T0 = _T5", "_T1 = _T6", "branch _Lf_1"])
+        self.assertFalse(any("call" in line for line in seq))
+
+    def testSwappedArgs(self):
+        # d = call f(b, a); return d: the params are swapped through new temps
+        def tail(f, a, b):
+            f.ret(f.call("f", [b, a]))
+
+        seq = self.transform(recursive(tail))
+        self.assertEqual(seq[3:8], ["_T3 = _T1", "_T4 = _T0", "_T0 = _T3", "_T1 = _T4", "branch _Lf_1"])
+
+    def testNotTail(self):
+        # d = call f(a - 1, b); x = d + 1; return x is not a tail call
+        def tail(f, a, b):
+            d = f.call("f", [f.binary(TacBinaryOp.SUB, a, f.load(1)), b])
+            f.ret(f.binary(TacBinaryOp.ADD, d, f.load(1)))
+
+        prog = recursive(tail)
+        before = lines(prog.funcs[0])
+        self.assertEqual(self.transform(prog), before)
+
+    def testConstantStack(self):
+        # sum(n, acc): if (n == 0) return acc; return sum(n - 1, acc + n), called by main as sum(100000, 0)
+        def tail(f, a, b):
+            f.ret(f.call("f", [f.binary(TacBinaryOp.SUB, a, f.load(1)), f.binary(TacBinaryOp.ADD, b, a)]))
+
+        prog = recursive(tail)
+        main = FuncBuilder("main")
+        main.ret(main.call("f", [main.load(100000), main.load(0)]))
+        prog.funcs.append(main.end())
+        # the loop is no longer recursive, so it is inlined into main, and the backend can compile the program
+        Optimizer.default().transform(prog)
+        self.assertFalse(any(isinstance(instr, Call) for func in prog.funcs for instr in func.instrSeq))
+        expected = (100000 * 100001 // 2) & 0xFFFFFFFF
+        self.assertEqual(rvsim.run(compileProg(TACProg(prog.funcs[1:]), GraphRegAlloc), 10_000_000)[0], expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,33 +1,54 @@
+from typing import Optional, TextIO
+
 from utils.label.label import Label
 from utils.tac.nativeinstr import NativeInstr
 from utils.tac.tacinstr import TACInstr
 
+"""
+AsmCodePrinter: collect the asm code as a list of chunks
+
+If a sink (a file object) is given, the finished code is written to it every time flush is called
+(e.g. at the end of each function), otherwise all the chunks are joined only once by close.
+"""
+
 
 class AsmCodePrinter:
     INDENTS = "    "
     COMMENT_PROMPT = "#"
 
-    def __init__(self) -> None:
-        self.buffer = ""
+    def __init__(self, sink: Optional[TextIO] = None) -> None:
+        self.sink = sink
+        self.chunks: list[str] = []
 
     def printf(self, fmt: str, **args):
-        self.buffer += self.INDENTS + fmt.format(**args)
+        self.chunks.append(self.INDENTS + fmt.format(**args))
 
     def println(self, fmt: str, **args):
-        self.buffer += self.INDENTS + fmt.format(**args) + "\n"
+        self.chunks.append(self.INDENTS + fmt.format(**args) + "\n")
 
     def printLabel(self, label: Label):
-        self.buffer += str(label.name) + ":\n"
+        self.chunks.append(str(label.name) + ":\n")
 
     def printInstr(self, instr: NativeInstr):
         if instr.isLabel():
-            self.buffer += str(instr.label) + ":"
+            self.chunks.append(str(instr.label) + ":\n")
         else:
-            self.buffer += self.INDENTS + str(instr)
-        self.buffer += "\n"
+            self.chunks.append(self.INDENTS + str(instr) + "\n")
 
     def printComment(self, comment: str):
-        self.buffer += self.INDENTS + self.COMMENT_PROMPT + " " + comment + "\n"
-
-    def close(self) -> str:
-        return self.buffer
+        self.chunks.append(self.INDENTS + self.COMMENT_PROMPT + " " + comment + "\n")
+
+    # write the code printed so far to the sink
+    def flush(self) -> None:
+        if self.sink is not None:
+            self.sink.write("".join(self.chunks))
+            self.chunks.clear()
+
+    # return all the code, or None if it has been written to the sink
+    def close(self) -> Optional[str]:
+        if self.sink is not None:
+            self.flush()
+            return None
+        code = "".join(self.chunks)
+        self.chunks = [code]
+        return code
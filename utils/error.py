@@ -24,6 +24,12 @@ class DecafSyntaxError(Exception):
         self.token = t
 
 
+class DecafSyntaxErrors(Exception):
+    def __init__(self, errors: list[DecafSyntaxError]) -> None:
+        super().__init__("\n".join(map(str, errors)))
+        self.errors = errors
+
+
 class DecafNoMainFuncError(Exception):
     def __init__(self) -> None:
         super().__init__("Semantic error: can not find 'main' function")
@@ -0,0 +1,100 @@
+import json
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from typing import Optional, TextIO
+
+"""
+PassTimer: measure the wall time, the CPU time and the peak of allocated memory (by tracemalloc) of each phase
+
+The phases are flat (they must not be nested), the backend phases are recorded once per function.
+When it is disabled (the default), phase returns a shared no-op context manager and nothing is measured.
+
+records: list of (phase, function name or None, wall seconds, CPU seconds, peak bytes)
+"""
+
+
+class PassTimer:
+    _NOOP = nullcontext()
+
+    def __init__(self) -> None:
+        self.enabled = False
+        self.records: list[tuple[str, Optional[str], float, float, int]] = []
+        # whether start turned tracemalloc on (then stop turns it off, else it is left to whoever started it)
+        self.startedTracing = False
+
+    def start(self) -> None:
+        self.enabled = True
+        self.records = []
+        self.startedTracing = not tracemalloc.is_tracing()
+        if self.startedTracing:
+            tracemalloc.start()
+
+    def stop(self) -> None:
+        self.enabled = False
+        if self.startedTracing:
+            tracemalloc.stop()
+            self.startedTracing = False
+
+    def phase(self, name: str, func: Optional[str] = None):
+        if not self.enabled:
+            return self._NOOP
+        return self._measure(name, func)
+
+    @contextmanager
+    def _measure(self, name: str, func: Optional[str]):
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+        wall = time.perf_counter()
+        cpu = time.process_time()
+        try:
+            yield
+        finally:
+            cpu = time.process_time() - cpu
+            wall = time.perf_counter() - wall
+            peak = tracemalloc.get_traced_memory()[1] - base
+            self.records.append((name, func, wall, cpu, max(peak, 0)))
+
+    # the records summed up by phase (in the order the phases first ran), each with its per-function rows
+    def summary(self) -> list[dict]:
+        phases: dict[str, dict] = {}
+        for name, func, wall, cpu, peak in self.records:
+            row = phases.setdefault(
+                name, {"phase": name, "wall": 0.0, "cpu": 0.0, "peak": 0, "functions": []}
+            )
+            row["wall"] += wall
+            row["cpu"] += cpu
+            row["peak"] = max(row["peak"], peak)
+            if func is not None:
+                row["functions"].append({"function": func, "wall": wall, "cpu": cpu, "peak": peak})
+        return list(phases.values())
+
+    def report(self, out: TextIO, format: str = "table") -> None:
+        phases = self.summary()
+        if format == "json":
+            print(json.dumps({"passes": phases}), file=out)
+            return
+
+        totalWall = sum(row["wall"] for row in phases) or 1.0
+        print("{:<28} {:>10} {:>10} {:>7} {:>12}".format("phase", "wall(ms)", "cpu(ms)", "wall%", "peak(KiB)"), file=out)
+        for row in phases:
+            print(self._line(row["phase"], row, totalWall), file=out)
+            for funcRow in row["functions"]:
+                print(self._line("  " + funcRow["function"], funcRow, totalWall), file=out)
+        print(
+            "{:<28} {:>10.3f} {:>10.3f} {:>7.1f}".format(
+                "total",
+                sum(row["wall"] for row in phases) * 1000,
+                sum(row["cpu"] for row in phases) * 1000,
+                100.0,
+            ),
+            file=out,
+        )
+
+    def _line(self, name: str, row: dict, totalWall: float) -> str:
+        return "{:<28} {:>10.3f} {:>10.3f} {:>7.1f} {:>12.1f}".format(
+            name, row["wall"] * 1000, row["cpu"] * 1000, row["wall"] / totalWall * 100, row["peak"] / 1024
+        )
+
+
+timer = PassTimer()
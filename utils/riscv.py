@@ -12,6 +12,9 @@ from enum import Enum, auto, unique
 
 WORD_SIZE: Final[int] = 4  # in bytes
 MAX_INT: Final[int] = 0x7FFF_FFFF
+# the range of the 12-bit signed immediates of the I-type instrs
+IMM_MIN: Final[int] = -2048
+IMM_MAX: Final[int] = 2047
 
 
 @unique
@@ -27,6 +30,7 @@ class RvBinaryOp(Enum):
     ADD = auto()
     SUB = auto()
     MUL = auto()
+    MULH = auto()
     DIV = auto()
     REM = auto()
 
@@ -34,6 +38,36 @@ class RvBinaryOp(Enum):
     AND = auto()
     OR = auto()
 
+@unique
+class RvBinaryImmOp(Enum):
+    ADDI = auto()
+    SLTI = auto()
+    ANDI = auto()
+    ORI = auto()
+    XORI = auto()
+    SLLI = auto()
+    SRLI = auto()
+    SRAI = auto()
+
+@unique
+class RvBranchOp(Enum):
+    BEQ = auto()
+    BNE = auto()
+    BLT = auto()
+    BGE = auto()
+    BLTU = auto()
+    BGEU = auto()
+
+# the branch taken exactly when the other one is not taken
+INVERTED_BRANCH: Final[dict] = {
+    RvBranchOp.BEQ: RvBranchOp.BNE,
+    RvBranchOp.BNE: RvBranchOp.BEQ,
+    RvBranchOp.BLT: RvBranchOp.BGE,
+    RvBranchOp.BGE: RvBranchOp.BLT,
+    RvBranchOp.BLTU: RvBranchOp.BGEU,
+    RvBranchOp.BGEU: RvBranchOp.BLTU,
+}
+
 class Riscv:
 
     ZERO = Reg(0, "x0")  # always zero
@@ -97,6 +131,9 @@ class Riscv:
         def __str__(self) -> str:
             return "j " + str(self.label)
 
+        def toNative(self, dstRegs: list[Reg], srcRegs: list[Reg]) -> NativeInstr:
+            return Riscv.NativeJump(self.label)
+
     class RiscvLabel(TACInstr):
         def __init__(self, label: Label) -> None:
             super().__init__(InstrKind.LABEL, [], [], label)
@@ -122,6 +159,9 @@ class Riscv:
         def __str__(self) -> str:
             return "mv " + Riscv.FMT2.format(str(self.dsts[0]), str(self.srcs[0]))
 
+        def toNative(self, dstRegs: list[Reg], srcRegs: list[Reg]) -> NativeInstr:
+            return Riscv.NativeMove(dstRegs[0], srcRegs[0])
+
     class Unary(TACInstr):
         def __init__(self, op: RvUnaryOp, dst: Temp, src: Temp) -> None:
             super().__init__(InstrKind.SEQ, [dst], [src], None)
@@ -141,14 +181,45 @@ class Riscv:
             return "{} ".format(self.op) + Riscv.FMT3.format(
                 str(self.dsts[0]), str(self.srcs[0]), str(self.srcs[1])
             )
-    
+
+    # dst = src op imm, the imm must fit in 12 bits (see fitsImm)
+    class BinaryImm(TACInstr):
+        def __init__(self, op: RvBinaryImmOp, dst: Temp, src: Temp, imm: int) -> None:
+            super().__init__(InstrKind.SEQ, [dst], [src], None)
+            self.op = op.name.lower()
+            self.imm = imm
+
+        def __str__(self) -> str:
+            return "{} ".format(self.op) + Riscv.FMT3.format(
+                str(self.dsts[0]), str(self.srcs[0]), str(self.imm)
+            )
+
+    @staticmethod
+    def fitsImm(value: int) -> bool:
+        return IMM_MIN <= value <= IMM_MAX
+
+    # reg = sp + offset, for an offset which does not fit in 12 bits
+    @staticmethod
+    def spOffset(reg: Reg, offset: int) -> list[NativeInstr]:
+        return [
+            Riscv.LoadImm(reg, offset).toNative([reg], []),
+            Riscv.Binary(RvBinaryOp.ADD, reg, reg, Riscv.SP).toNative([reg], [reg, Riscv.SP]),
+        ]
+
+    # branch to target if (src0 op src1), src0 is ZERO to test a single temp
     class Branch(TACInstr):
-        def __init__(self, cond: Temp, target: Label) -> None:
-            super().__init__(InstrKind.COND_JMP, [], [cond], target)
+        def __init__(self, op: RvBranchOp, src0: Temp, src1: Temp, target: Label) -> None:
+            super().__init__(InstrKind.COND_JMP, [], [src0, src1], target)
+            self.op = op
             self.target = target
         
         def __str__(self) -> str:
-            return "beq " + Riscv.FMT3.format(str(Riscv.ZERO), str(self.srcs[0]), str(self.target))
+            return "{} ".format(self.op.name.lower()) + Riscv.FMT3.format(
+                str(self.srcs[0]), str(self.srcs[1]), str(self.target)
+            )
+
+        def toNative(self, dstRegs: list[Reg], srcRegs: list[Reg]) -> NativeInstr:
+            return Riscv.NativeBranch(self.op, srcRegs[0], srcRegs[1], self.target)
 
     class Jump(TACInstr):
         def __init__(self, target: Label) -> None:
@@ -158,6 +229,9 @@ class Riscv:
         def __str__(self) -> str:
             return "j " + str(self.target)
 
+        def toNative(self, dstRegs: list[Reg], srcRegs: list[Reg]) -> NativeInstr:
+            return Riscv.NativeJump(self.target)
+
     class SPAdd(NativeInstr):
         def __init__(self, offset: int) -> None:
             super().__init__(InstrKind.SEQ, [Riscv.SP], [Riscv.SP], None)
@@ -191,6 +265,34 @@ class Riscv:
                 str(self.dsts[0]), str(self.offset), str(self.srcs[0])
             )
 
+    class NativeMove(NativeInstr):
+        def __init__(self, dst: Reg, src: Reg) -> None:
+            super().__init__(InstrKind.SEQ, [dst], [src], None)
+
+        def __str__(self) -> str:
+            return "mv " + Riscv.FMT2.format(str(self.dsts[0]), str(self.srcs[0]))
+
+    class NativeJump(NativeInstr):
+        def __init__(self, target: Label) -> None:
+            super().__init__(InstrKind.JMP, [], [], target)
+
+        def __str__(self) -> str:
+            return "j " + str(self.label)
+
+    class NativeBranch(NativeInstr):
+        def __init__(self, op: RvBranchOp, src0: Reg, src1: Reg, target: Label) -> None:
+            super().__init__(InstrKind.COND_JMP, [], [src0, src1], target)
+            self.op = op
+
+        def __str__(self) -> str:
+            return "{} ".format(self.op.name.lower()) + Riscv.FMT3.format(
+                str(self.srcs[0]), str(self.srcs[1]), str(self.label)
+            )
+
+        # the branch to target taken exactly when this one is not taken
+        def inverted(self, target: Label) -> "Riscv.NativeBranch":
+            return Riscv.NativeBranch(INVERTED_BRANCH[self.op], self.srcs[0], self.srcs[1], target)
+
     class NativeReturn(NativeInstr):
         def __init__(self) -> None:
             super().__init__(InstrKind.RET, [Riscv.RA], [], None)
@@ -0,0 +1,32 @@
+from typing import TextIO
+
+"""
+Statistics: counters of what the passes did (e.g. how many instrs were removed), printed by --stats
+
+The counters are cleared before each compilation.
+counts: map from (pass name, description) to count
+"""
+
+
+class Statistics:
+    def __init__(self) -> None:
+        self.counts: dict[tuple[str, str], int] = {}
+
+    def add(self, passName: str, description: str, n: int = 1) -> None:
+        key = (passName, description)
+        self.counts[key] = self.counts.get(key, 0) + n
+
+    def get(self, passName: str, description: str) -> int:
+        return self.counts.get((passName, description), 0)
+
+    def clear(self) -> None:
+        self.counts.clear()
+
+    def report(self, out: TextIO) -> None:
+        for (passName, description), count in self.counts.items():
+            if count == 0:
+                continue
+            print("{:>8} {:<12} - {}".format(count, passName, description), file=out)
+
+
+stats = Statistics()
@@ -1,6 +1,8 @@
+from utils.label.blocklabel import BlockLabel
 from utils.label.funclabel import FuncLabel
 
 from .tacinstr import TACInstr
+from .temp import Temp
 
 
 class TACFunc:
@@ -9,6 +11,7 @@ class TACFunc:
         self.numArgs = numArgs
         self.instrSeq = []
         self.tempUsed = 0
+        self.labelUsed = 0
 
     def getInstrSeq(self) -> list[TACInstr]:
         return self.instrSeq
@@ -16,6 +19,18 @@ class TACFunc:
     def getUsedTempCount(self) -> int:
         return self.tempUsed
 
+    # a new temp for the optimizations, after the temps given by TACGen
+    def freshTemp(self) -> Temp:
+        temp = Temp(self.tempUsed)
+        self.tempUsed += 1
+        return temp
+
+    # a new block label for the optimizations, named after the function so that it never
+    # clashes with the labels of TACGen (which are numbers) or of the other functions
+    def freshLabel(self) -> BlockLabel:
+        self.labelUsed += 1
+        return BlockLabel("%s_%d" % (self.entry.func, self.labelUsed))
+
     def add(self, instr: TACInstr) -> None:
         self.instrSeq.append(instr)
 
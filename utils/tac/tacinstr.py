@@ -1,6 +1,7 @@
 from enum import Enum, auto, unique
 from typing import Any, Optional, Union
 
+from utils.label.funclabel import FuncLabel
 from utils.label.label import Label
 from utils.tac.nativeinstr import NativeInstr
 from utils.tac.reg import Reg
@@ -29,6 +30,15 @@ class TACInstr:
     def getWritten(self) -> list[int]:
         return [dst.index for dst in self.dsts]
 
+    # replace the srcs by subst (map from temp.index to the new Temp)
+    # the subclasses also update their named operands (e.g. lhs and rhs of Binary)
+    def replaceSrcs(self, subst: dict[int, Temp]) -> None:
+        self.srcs = [subst.get(src.index, src) for src in self.srcs]
+
+    # replace the dsts by subst, like replaceSrcs
+    def replaceDsts(self, subst: dict[int, Temp]) -> None:
+        self.dsts = [subst.get(dst.index, dst) for dst in self.dsts]
+
     def isLabel(self) -> bool:
         return self.kind is InstrKind.LABEL
 
@@ -63,6 +73,14 @@ class Assign(TACInstr):
     def __str__(self) -> str:
         return "%s = %s" % (self.dst, self.src)
 
+    def replaceSrcs(self, subst: dict[int, Temp]) -> None:
+        super().replaceSrcs(subst)
+        self.src = self.srcs[0]
+
+    def replaceDsts(self, subst: dict[int, Temp]) -> None:
+        super().replaceDsts(subst)
+        self.dst = self.dsts[0]
+
     def accept(self, v: TACVisitor) -> None:
         v.visitAssign(self)
 
@@ -77,6 +95,10 @@ class LoadImm4(TACInstr):
     def __str__(self) -> str:
         return "%s = %d" % (self.dst, self.value)
 
+    def replaceDsts(self, subst: dict[int, Temp]) -> None:
+        super().replaceDsts(subst)
+        self.dst = self.dsts[0]
+
     def accept(self, v: TACVisitor) -> None:
         v.visitLoadImm4(self)
 
@@ -96,6 +118,14 @@ class Unary(TACInstr):
             self.operand,
         )
 
+    def replaceSrcs(self, subst: dict[int, Temp]) -> None:
+        super().replaceSrcs(subst)
+        self.operand = self.srcs[0]
+
+    def replaceDsts(self, subst: dict[int, Temp]) -> None:
+        super().replaceDsts(subst)
+        self.dst = self.dsts[0]
+
     def accept(self, v: TACVisitor) -> None:
         v.visitUnary(self)
 
@@ -127,6 +157,14 @@ class Binary(TACInstr):
         }[self.op]
         return "%s = (%s %s %s)" % (self.dst, self.lhs, opStr, self.rhs)
 
+    def replaceSrcs(self, subst: dict[int, Temp]) -> None:
+        super().replaceSrcs(subst)
+        self.lhs, self.rhs = self.srcs
+
+    def replaceDsts(self, subst: dict[int, Temp]) -> None:
+        super().replaceDsts(subst)
+        self.dst = self.dsts[0]
+
     def accept(self, v: TACVisitor) -> None:
         v.visitBinary(self)
 
@@ -159,6 +197,10 @@ class CondBranch(TACInstr):
             str(self.target),
         )
 
+    def replaceSrcs(self, subst: dict[int, Temp]) -> None:
+        super().replaceSrcs(subst)
+        self.cond = self.srcs[0]
+
     def accept(self, v: TACVisitor) -> None:
         v.visitCondBranch(self)
 
@@ -175,10 +217,68 @@ class Return(TACInstr):
     def __str__(self) -> str:
         return "return" if (self.value is None) else ("return " + str(self.value))
 
+    def replaceSrcs(self, subst: dict[int, Temp]) -> None:
+        super().replaceSrcs(subst)
+        if self.value is not None:
+            self.value = self.srcs[0]
+
     def accept(self, v: TACVisitor) -> None:
         v.visitReturn(self)
 
 
+# Call instruction: dst = func(args), dst is None if the value is not used.
+# The callee sees the args in its first temps (_T0, _T1, ... up to its numArgs).
+# The RISC-V backend does not pass parameters yet, so the calls must be inlined (-O) before Asm.
+class Call(TACInstr):
+    def __init__(self, dst: Optional[Temp], func: FuncLabel, args: list[Temp]) -> None:
+        super().__init__(InstrKind.SEQ, [] if dst is None else [dst], args, func)
+        self.dst = dst
+        self.func = func
+        self.args = args.copy()
+
+    def __str__(self) -> str:
+        call = "call %s(%s)" % (self.func.func, ", ".join(map(str, self.args)))
+        return call if self.dst is None else "%s = %s" % (self.dst, call)
+
+    def replaceSrcs(self, subst: dict[int, Temp]) -> None:
+        super().replaceSrcs(subst)
+        self.args = self.srcs.copy()
+
+    def replaceDsts(self, subst: dict[int, Temp]) -> None:
+        super().replaceDsts(subst)
+        if self.dst is not None:
+            self.dst = self.dsts[0]
+
+    def accept(self, v: TACVisitor) -> None:
+        v.visitCall(self)
+
+
+# Phi function of SSA form: dst = srcs[i] when the control comes from the block preds[i].
+# It only exists between SSABuilder and SSADestructor, since the block ids are those of one CFG.
+class Phi(TACInstr):
+    def __init__(self, dst: Temp, srcs: list[Temp], preds: list[int]) -> None:
+        super().__init__(InstrKind.SEQ, [dst], srcs, None)
+        self.dst = dst
+        self.preds = preds.copy()
+
+    def __str__(self) -> str:
+        return "%s = phi(%s)" % (
+            self.dst,
+            ", ".join("%s from B%d" % (src, pred) for src, pred in zip(self.srcs, self.preds)),
+        )
+
+    def replaceDsts(self, subst: dict[int, Temp]) -> None:
+        super().replaceDsts(subst)
+        self.dst = self.dsts[0]
+
+    # the src for the edge from block pred
+    def srcFrom(self, pred: int) -> Temp:
+        return self.srcs[self.preds.index(pred)]
+
+    def accept(self, v: TACVisitor) -> None:
+        v.visitPhi(self)
+
+
 # Annotation (used for debugging).
 class Memo(TACInstr):
     def __init__(self, msg: str) -> None:
@@ -28,6 +28,12 @@ class TACVisitor:
    def visitReturn(self, instr: Return) -> None:
         self.visitOther(instr)
 
+   def visitCall(self, instr: Call) -> None:
+        self.visitOther(instr)
+
+   def visitPhi(self, instr: Phi) -> None:
+        self.visitOther(instr)
+
    def visitMemo(self, instr: Memo) -> None:
         self.visitOther(instr)
 